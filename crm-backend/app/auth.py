@@ -1,5 +1,6 @@
 """Authentication logic and dependencies."""
 
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -9,7 +10,9 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from app.cache import cached_role
 from app.database import get_db
+from app.metrics import record_auth_failure
 from app.models import User, Role
 
 # Configuration
@@ -17,6 +20,9 @@ SECRET_KEY = "CHANGE_ME_IN_PRODUCTION_SECRET_KEY"  # TODO: Move to env var
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Set by ``POST /api/batch``: its sub-requests reuse the batch's authenticated user
+shared_user: ContextVar = ContextVar("shared_user", default=None)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -41,7 +47,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# Plain ``def`` so FastAPI runs these in the threadpool: the user and role
+# lookups block, and blocking the event loop while waiting for a pooled
+# connection deadlocks the requests that hold the other connections.
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    shared = shared_user.get()
+    if shared is not None:
+        return shared
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -51,31 +64,52 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
+            record_auth_failure("invalid_token")
             raise credentials_exception
     except JWTError:
+        record_auth_failure("invalid_token")
         raise credentials_exception
         
     user = db.query(User).filter(User.email == email).first()
     if user is None:
+        record_auth_failure("unknown_user")
         raise credentials_exception
     return user
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
+        record_auth_failure("inactive_user")
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role.name != "Admin":
+def is_admin(user: User) -> bool:
+    return user.is_active and cached_role(user).name == "Admin"
+
+
+def is_admin_token(token: str, db: Session) -> bool:
+    """Whether ``token`` is valid and belongs to an active admin, for checks made outside a route."""
+    try:
+        email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return False
+    if email is None:
+        return False
+    user = db.query(User).filter(User.email == email).first()
+    return user is not None and is_admin(user)
+
+
+def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+    if not is_admin(current_user):
         raise HTTPException(status_code=403, detail="Not enough privileges")
     return current_user
 
 
 def check_permissions(user: User, required_permission: str) -> bool:
     """Check if user has a specific permission."""
+    permissions = cached_role(user).permissions
     # Admin has all permissions
-    if "*" in user.role.permissions:
+    if "*" in permissions:
         return True
-    return required_permission in user.role.permissions
+    return required_permission in permissions
@@ -0,0 +1,351 @@
+"""Shared cache for reference data, roles, dashboard aggregates and search suggestions.
+
+``Cache.get_or_set`` serves a value from the backend (``app.cache_backends``)
+or computes it with a loader and stores it. Values round-trip through JSON,
+so the local LRU and Redis return the same types. Every entry carries:
+
+- a TTL (``None`` keeps it until it is evicted or invalidated);
+- tags, normally the names of the tables it was computed from. Each tag has
+  a version counter in the backend, and an entry stores the versions it was
+  loaded under. ``invalidate(tag)`` bumps the counter, so every entry
+  carrying that tag misses from then on, on every instance that shares the
+  backend. The versions are read before the loader runs, so a load that
+  races a write is never served afterwards.
+
+Tags are invalidated by writes. Session hooks collect the tables each session
+flushes (or bulk-updates), and invalidate them after the commit. Routers need
+no cache calls of their own.
+
+Stampede protection: concurrent misses for one key in a process queue behind
+a per-key lock, and the first caller's result serves the rest. With a
+shared backend, the first instance also takes a short ``SET NX`` fill lock.
+Other instances poll for its result for up to ``CACHE_LOCK_SECONDS`` before
+computing it themselves. Backend errors are counted and treated as misses,
+so an unreachable Redis degrades to uncached reads.
+
+Reference data (pipelines, stages, products, roles) keeps its write-time
+invalidation through ``reference_cache``. With a local backend and several
+instances (``CACHE_MULTI_INSTANCE``), ``invalidate`` also bumps a counter
+row in ``cache_versions``. Each instance reads that row (a primary key
+lookup) at most every ``REFERENCE_CACHE_CHECK_SECONDS`` and drops its
+reference entries when the counter has moved. A shared backend needs no
+such row: its tags already reach every instance.
+
+Configuration (environment):
+    CACHE_PREFIX                   prefix for every backend key (default "crm:")
+    CACHE_LOCK_SECONDS             longest wait for another instance's fill (default 5)
+    CACHE_MULTI_INSTANCE           "true" coordinates reference invalidation through the database (default false)
+    REFERENCE_CACHE_CHECK_SECONDS  how often the shared version is read (default 1.0)
+    REFERENCE_CACHE_SECONDS        TTL of reference entries (default 300)
+    DASHBOARD_CACHE_SECONDS        TTL of dashboard aggregates (default 30)
+    SEARCH_CACHE_SECONDS           TTL of search suggestions (default 30)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import chain
+from typing import Optional
+
+import orjson
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from app.cache_backends import CacheBackendError, LocalBackend, backend_from_env
+from app.etags import etag_for
+from app.metrics import record_cache, record_cache_event
+from app.models import CacheVersion, Pipeline, Product, Role, Stage
+from app.schemas import PipelineResponse, ProductResponse, StageResponse
+
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "crm:")
+CACHE_LOCK_SECONDS = float(os.getenv("CACHE_LOCK_SECONDS", "5"))
+CACHE_MULTI_INSTANCE = os.getenv("CACHE_MULTI_INSTANCE", "false").lower() == "true"
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", "1.0"))
+REFERENCE_CACHE_SECONDS = float(os.getenv("REFERENCE_CACHE_SECONDS", "300"))
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "30"))
+SEARCH_CACHE_SECONDS = float(os.getenv("SEARCH_CACHE_SECONDS", "30"))
+
+VERSION_NAME = "reference"
+FILL_POLL_SECONDS = 0.05
+
+
+class Cache:
+    """Get-or-compute over a backend, with TTLs, tag invalidation and fill locks."""
+
+    def __init__(self, backend=None, prefix: str = CACHE_PREFIX, lock_seconds: float = CACHE_LOCK_SECONDS):
+        self.backend = backend if backend is not None else backend_from_env()
+        self.prefix = prefix
+        self.lock_seconds = lock_seconds
+        self._lock = threading.Lock()
+        self._fills = {}  # key -> [lock, callers using it]
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _seed(self, tag_keys) -> None:
+        # A missing counter (new, or evicted) starts at the clock, never at a
+        # value an existing entry might have been stored under
+        seed = str(time.time_ns()).encode()
+        for tag_key in tag_keys:
+            self.backend.set(tag_key, seed, only_if_absent=True)
+
+    def _lookup(self, key: str, tag_keys: list):
+        """``(found, value, current tag versions)`` in one round trip when the tags exist."""
+        entry, *versions = self.backend.get_many([key, *tag_keys])
+        if any(version is None for version in versions):
+            self._seed([k for k, version in zip(tag_keys, versions) if version is None])
+            versions = self.backend.get_many(tag_keys)
+        versions = [version.decode() for version in versions]
+        if entry is not None:
+            stored_versions, value = orjson.loads(entry)
+            if stored_versions == versions:
+                return True, value, versions
+        return False, None, versions
+
+    @contextmanager
+    def _filling(self, key: str):
+        with self._lock:
+            fill = self._fills.setdefault(key, [threading.Lock(), 0])
+            fill[1] += 1
+        try:
+            with fill[0]:
+                yield
+        finally:
+            with self._lock:
+                fill[1] -= 1
+                if fill[1] == 0:
+                    del self._fills[key]
+
+    def _wait_for_fill(self, key: str, tag_keys: list):
+        """Poll for another instance's fill; ``found`` stays False if it never lands."""
+        deadline = time.monotonic() + self.lock_seconds
+        found, value, versions = False, None, None
+        while not found and time.monotonic() < deadline:
+            time.sleep(FILL_POLL_SECONDS)
+            found, value, versions = self._lookup(key, tag_keys)
+        return found, value, versions
+
+    def get_or_set(self, name: str, key: str, loader, ttl: Optional[float] = None, tags=()):
+        """The cached ``name:key`` value, computed by ``loader()`` on a miss.
+
+        ``name`` also labels the hit/miss metrics.
+        """
+        full_key = f"{self.prefix}{name}:{key}"
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            found, value, versions = self._lookup(full_key, tag_keys)
+        except CacheBackendError:
+            record_cache_event(name, "error")
+            return loader()
+        record_cache(name, found)
+        if found:
+            return value
+
+        with self._filling(full_key):
+            lock_key = None
+            try:
+                # Another caller in this process may have filled it meanwhile
+                found, value, versions = self._lookup(full_key, tag_keys)
+                if not found and self.backend.shared:
+                    if self.backend.set(full_key + ":lock", b"1", self.lock_seconds, only_if_absent=True):
+                        lock_key = full_key + ":lock"
+                    else:
+                        found, value, fresher = self._wait_for_fill(full_key, tag_keys)
+                        versions = fresher or versions
+            except CacheBackendError:
+                record_cache_event(name, "error")
+                return loader()
+            if found:
+                record_cache_event(name, "waited")
+                return value
+
+            value = loader()
+            record_cache_event(name, "fill")
+            try:
+                self.backend.set(full_key, orjson.dumps([versions, value]), ttl)
+                if lock_key:
+                    self.backend.delete(lock_key)
+            except CacheBackendError:
+                record_cache_event(name, "error")
+            return value
+
+    def invalidate(self, *tags: str) -> None:
+        """Make every entry carrying any of ``tags`` miss."""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            self._seed(tag_keys)
+            for tag_key in tag_keys:
+                self.backend.incr(tag_key)
+        except CacheBackendError:
+            record_cache_event("tags", "error")
+
+
+cache = Cache()
+
+
+# ── Write invalidation ───────────────────────────────────────────────────────
+
+WRITTEN_TABLES = "cache_written_tables"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    written = session.info.setdefault(WRITTEN_TABLES, set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        written.add(instance.__tablename__)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(execute_state):
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        table = getattr(execute_state.statement, "table", None)
+        if table is not None:
+            execute_state.session.info.setdefault(WRITTEN_TABLES, set()).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session):
+    # Tables from a rolled-back transaction stay collected and are invalidated
+    # with the next commit: an extra miss rather than a stale hit
+    written = session.info.pop(WRITTEN_TABLES, None)
+    if written:
+        cache.invalidate(*sorted(written))
+
+
+# ── Reference data ───────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class RoleInfo:
+    id: int
+    name: str
+    permissions: object  # as stored: a list of permission names (or a legacy dict)
+
+
+@dataclass(frozen=True)
+class CachedRows:
+    """JSON rows for a list endpoint, with the ETag of the rows they came from."""
+
+    rows: list
+    etag: str
+
+
+class ReferenceCache:
+    def __init__(self, store: Optional[Cache] = None, multi_instance: bool = CACHE_MULTI_INSTANCE,
+                 check_seconds: float = REFERENCE_CACHE_CHECK_SECONDS):
+        self.store = store if store is not None else Cache(LocalBackend())
+        self.multi_instance = multi_instance
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._version = 0  # the last shared version seen
+        self._checked_at = float("-inf")
+
+    @property
+    def _uses_version_row(self) -> bool:
+        return self.multi_instance and not self.store.backend.shared
+
+    def clear(self) -> None:
+        self.store.invalidate(VERSION_NAME)
+        with self._lock:
+            self._checked_at = float("-inf")
+
+    def _check_version(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return
+        shared = db.execute(select(CacheVersion.version).where(CacheVersion.name == VERSION_NAME)).scalar() or 0
+        with self._lock:
+            changed = shared != self._version
+            self._version = shared
+            self._checked_at = now
+        if changed:
+            self.store.invalidate(VERSION_NAME)
+
+    def get(self, db: Session, key: str, loader, tables=()):
+        """The cached value for ``key``, computed by ``loader(db)`` on a miss."""
+        if self._uses_version_row:
+            self._check_version(db)
+        return self.store.get_or_set(
+            "reference", key, lambda: loader(db), ttl=REFERENCE_CACHE_SECONDS, tags=(*tables, VERSION_NAME)
+        )
+
+    def invalidate(self, db: Session) -> None:
+        """Drop every entry here and, with several instances, everywhere else too."""
+        if self._uses_version_row:
+            bump = update(CacheVersion).where(CacheVersion.name == VERSION_NAME).values(version=CacheVersion.version + 1)
+            if db.execute(bump).rowcount == 0:
+                try:
+                    with db.begin_nested():
+                        db.add(CacheVersion(name=VERSION_NAME, version=1))
+                except IntegrityError:  # another instance created it first
+                    db.execute(bump)
+            db.commit()
+        self.clear()
+
+
+reference_cache = ReferenceCache(cache)
+
+
+def _cached_rows(schema, rows) -> dict:
+    return {"rows": [schema.model_validate(row).model_dump(mode="json") for row in rows], "etag": etag_for(rows)}
+
+
+def cached_role(user) -> RoleInfo:
+    """The user's role, from the cache when the user is attached to a session."""
+    db = object_session(user)
+    if db is None or user.role_id is None:
+        return RoleInfo(user.role.id, user.role.name, user.role.permissions)
+
+    def load(db):
+        row = db.get(Role, user.role_id)
+        return {"id": row.id, "name": row.name, "permissions": row.permissions}
+
+    return RoleInfo(**reference_cache.get(db, f"role:{user.role_id}", load, tables=("roles",)))
+
+
+def cached_pipelines(db: Session) -> CachedRows:
+    def load(db):
+        return _cached_rows(PipelineResponse, db.query(Pipeline).order_by(Pipeline.name).all())
+
+    return CachedRows(**reference_cache.get(db, "pipelines", load, tables=("pipelines",)))
+
+
+def cached_stages(db: Session, pipeline_id: int) -> CachedRows:
+    def load(db):
+        return _cached_rows(
+            StageResponse, db.query(Stage).filter(Stage.pipeline_id == pipeline_id).order_by(Stage.order).all()
+        )
+
+    return CachedRows(**reference_cache.get(db, f"stages:{pipeline_id}", load, tables=("stages",)))
+
+
+def cached_products(db: Session, active_only: bool) -> CachedRows:
+    def load(db):
+        query = db.query(Product)
+        if active_only:
+            query = query.filter(Product.is_active == True)
+        return _cached_rows(ProductResponse, query.order_by(Product.name).all())
+
+    return CachedRows(**reference_cache.get(db, f"products:{active_only}", load, tables=("products",)))
+
+
+def default_stage(db: Session) -> tuple[Optional[int], Optional[int]]:
+    """``(pipeline_id, stage_id)`` for new deals: the default pipeline (else the first) and its first stage."""
+
+    def load(db):
+        pipeline = db.query(Pipeline).filter(Pipeline.is_default == True).first()
+        if not pipeline:
+            pipeline = db.query(Pipeline).order_by(Pipeline.id).first()
+        if not pipeline:
+            return None, None
+        stage = db.query(Stage).filter(Stage.pipeline_id == pipeline.id).order_by(Stage.order).first()
+        return pipeline.id, stage.id if stage else None
+
+    pipeline_id, stage_id = reference_cache.get(db, "default_stage", load, tables=("pipelines", "stages"))
+    return pipeline_id, stage_id
@@ -0,0 +1,253 @@
+"""Storage backends for ``app.cache``: an in-process LRU and a Redis-protocol client.
+
+Both store opaque byte strings under string keys and implement the same
+five operations:
+
+    get_many(keys)                       values in key order, None where missing or expired
+    set(key, value, ttl, only_if_absent) store (SET ... PX ... NX); False if NX found a key
+    delete(key)
+    incr(key)                            atomic counter, created at 1
+    clear()
+
+``LocalBackend`` is private to the process. Use it for a single instance and
+for development. ``RedisBackend`` is shared by every instance. It speaks the
+RESP protocol over plain sockets, so it works with Redis, Valkey, Memorystore
+or a test double without a client library. Connection and protocol failures
+are raised as ``CacheBackendError``; callers treat them as misses.
+
+Configuration (environment):
+    CACHE_BACKEND          "local" (default) or "redis"
+    CACHE_URL              redis://[:password@]host[:port][/db] (default redis://localhost:6379/0)
+    CACHE_MAX_ENTRIES      capacity of the local LRU (default 10000)
+    CACHE_TIMEOUT_SECONDS  connect and read timeout for the redis backend (default 0.25)
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local").lower()
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TIMEOUT_SECONDS = float(os.getenv("CACHE_TIMEOUT_SECONDS", "0.25"))
+
+
+class CacheBackendError(Exception):
+    """The backend could not be reached or answered with an error."""
+
+
+class LocalBackend:
+    """A thread-safe LRU of byte strings with per-entry expiry."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: bytes, ttl: Optional[float], now: float) -> None:
+        self._entries[key] = (value, now + ttl if ttl else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: list) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(key, now) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if only_if_absent and self._live(key, now) is not None:
+                return False
+            self._store(key, value, ttl, now)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        now = time.monotonic()
+        with self._lock:
+            value = int(self._live(key, now) or 0) + 1
+            self._store(key, str(value).encode(), None, now)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ── RESP ─────────────────────────────────────────────────────────────────────
+
+
+class _ErrorReply:
+    def __init__(self, message: str):
+        self.message = message
+
+
+def _encode(args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, (int, float)):
+            arg = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+def _read_reply(stream):
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by the cache server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body
+    if kind == b"-":
+        # Returned, not raised, so the rest of an array reply is still consumed
+        return _ErrorReply(body.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("connection closed by the cache server")
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [_read_reply(stream) for _ in range(length)]
+    raise ConnectionError(f"unexpected reply from the cache server: {line[:20]!r}")
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile("rb")
+
+    def command(self, *args):
+        self.sock.sendall(_encode(args))
+        reply = _read_reply(self.stream)
+        if isinstance(reply, _ErrorReply):
+            raise CacheBackendError(reply.message)
+        return reply
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend:
+    """A pooled RESP client for the handful of commands the cache needs."""
+
+    shared = True
+
+    def __init__(self, url: str = CACHE_URL, timeout: float = CACHE_TIMEOUT_SECONDS, max_idle: int = 8):
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"unsupported cache URL scheme: {parts.scheme!r}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> _Connection:
+        connection = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.command("AUTH", self.password)
+            if self.db:
+                connection.command("SELECT", self.db)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _command(self, *args):
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        try:
+            if connection is None:
+                connection = self._connect()
+            reply = connection.command(*args)
+        except CacheBackendError:
+            self._release(connection)  # an error reply leaves the connection usable
+            raise
+        except (OSError, ValueError) as exc:
+            if connection is not None:
+                connection.close()
+            raise CacheBackendError(f"cache server {self.host}:{self.port}: {exc}") from exc
+        self._release(connection)
+        return reply
+
+    def _release(self, connection) -> None:
+        if connection is None:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def get_many(self, keys: list) -> list:
+        return self._command("MGET", *keys) if keys else []
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        args = ["SET", key, value]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        if only_if_absent:
+            args.append("NX")
+        return self._command(*args) is not None
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def incr(self, key: str) -> int:
+        return self._command("INCR", key)
+
+    def clear(self) -> None:
+        self._command("FLUSHDB")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def backend_from_env():
+    if CACHE_BACKEND == "redis":
+        return RedisBackend()
+    if CACHE_BACKEND != "local":
+        raise ValueError(f"unknown CACHE_BACKEND: {CACHE_BACKEND!r}")
+    return LocalBackend()
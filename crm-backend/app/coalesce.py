@@ -0,0 +1,147 @@
+"""Single-flight coalescing for expensive read handlers.
+
+When identical requests arrive while one is still being computed, only the
+first (the leader) runs the handler. The others (followers) wait for its
+result, or its exception. "Identical" means the same handler, the same
+arguments, and the same permission scope. The scope is the caller's role by
+default. Use ``scope="user"`` for handlers whose result depends on who is
+asking. Sessions, requests and responses are not part of the key.
+
+    @router.get("/summary")
+    @coalesce()
+    def get_summary(db: Session = Depends(get_db), current_user: User = Depends(...)):
+        ...
+
+Nothing is kept once the leader finishes; caching is ``app.cache``'s job.
+Coalescing covers the window before the first result exists, e.g. a burst
+of dashboard loads when a meeting starts. Calls in flight are tracked in
+``concurrent.futures.Future`` objects, which are thread-safe. Plain ``def``
+handlers (threadpool) wait on them directly, and ``async def`` handlers
+wait through ``asyncio.wrap_future``. Either kind of caller can follow
+either kind of leader.
+
+Configuration (environment):
+    COALESCING_ENABLED   "false" runs every call on its own (default true)
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import Future
+
+from fastapi import BackgroundTasks, Request, Response
+from sqlalchemy.orm import Session
+
+from app.metrics import record_coalesced
+from app.models import User
+
+COALESCING_ENABLED = os.getenv("COALESCING_ENABLED", "true").lower() == "true"
+
+_UNKEYED = (Session, Request, Response, BackgroundTasks)
+
+
+class SingleFlight:
+    """Calls in flight by key; the first caller for a key runs, the rest share its outcome.
+
+    Keys are tuples whose first item names the call; it labels the metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key):
+        """``(future, leader)``: a new future if this caller leads, else the leader's."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        record_coalesced(key[0], not leader)
+        return future, leader
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None) -> None:
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, function, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, function, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await function(*args, **kwargs)
+        except BaseException as exc:
+            self._finish(key, future, error=exc)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+single_flight = SingleFlight()
+
+
+def _key_part(value, scope: str):
+    if isinstance(value, User):
+        return ("user", value.id) if scope == "user" else ("role", value.role_id)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def coalesce(scope: str = "role", flights: SingleFlight = None):
+    """Decorate a route handler so concurrent identical calls share one computation."""
+    if scope not in ("role", "user"):
+        raise ValueError(f"unknown coalescing scope: {scope!r}")
+
+    def decorator(function):
+        route = f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+        def key_for(kwargs) -> tuple:
+            return (route, *sorted(
+                (name, _key_part(value, scope)) for name, value in kwargs.items()
+                if not isinstance(value, _UNKEYED)
+            ))
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(**kwargs):
+                if not COALESCING_ENABLED:
+                    return await function(**kwargs)
+                key = key_for(kwargs)
+                return await (flights or single_flight).do_async(key, function, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(**kwargs):
+            if not COALESCING_ENABLED:
+                return function(**kwargs)
+            key = key_for(kwargs)
+            return (flights or single_flight).do(key, function, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,171 @@
+"""Response compression (brotli when installed, else gzip).
+
+Only responses whose content type is in the allowlist and whose body reaches
+``COMPRESSION_MIN_SIZE`` are compressed; the first body chunks are held back
+until the threshold is reached, so small streamed responses go out untouched.
+Once compressing, every chunk of a streamed response is flushed on its own
+(``Z_SYNC_FLUSH`` / brotli ``flush``), so streamed data reaches the client as
+it is produced rather than when the compressor's buffer fills.
+
+``brotli`` is an optional dependency; without it only gzip is offered.
+
+Configuration (environment):
+    COMPRESSION_ENABLED    "false" disables the middleware (default true)
+    COMPRESSION_MIN_SIZE   smallest body in bytes worth compressing (default 1024)
+    COMPRESSION_LEVEL      gzip level 1-9; lower costs less CPU for larger output (default 5)
+    BROTLI_QUALITY         brotli quality 0-11 (default 4)
+    COMPRESSION_TYPES      comma-separated content-type prefixes to compress
+                           (default application/json,text/,application/x-ndjson)
+"""
+
+import os
+import zlib
+
+from app.metrics import record_compression
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+COMPRESSION_TYPES = tuple(
+    t.strip() for t in os.getenv("COMPRESSION_TYPES", "application/json,text/,application/x-ndjson").split(",")
+    if t.strip()
+)
+
+
+def accepted_encodings(header: str) -> set:
+    """Codings the client accepts from an ``Accept-Encoding`` header (``q=0`` excluded)."""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding.strip() and q > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def choose_encoding(header: str):
+    accepted = accepted_encodings(header)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+
+def _compressor(encoding: str):
+    return _Brotli(BROTLI_QUALITY) if encoding == "br" else _Gzip(COMPRESSION_LEVEL)
+
+
+def _compressible(headers: dict) -> bool:
+    if b"content-encoding" in headers or b"no-transform" in headers.get(b"cache-control", b""):
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    return content_type.startswith(COMPRESSION_TYPES)
+
+
+def _add_vary(raw_headers: list) -> list:
+    for i, (name, value) in enumerate(raw_headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                raw_headers[i] = (name, value + b", Accept-Encoding")
+            return raw_headers
+    return raw_headers + [(b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    """Compresses eligible responses, streaming-safe, once the body reaches the size threshold."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((v for k, v in scope["headers"] if k == b"accept-encoding"), b"").decode("latin-1")
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None  # held http.response.start while deciding
+        pending = []  # body chunks held back while under the threshold
+        compressor = None
+
+        async def start_compressed(first_body: bytes, final: bool):
+            nonlocal compressor
+            compressor = _compressor(encoding)
+            raw = [(k, v) for k, v in start["headers"] if k.lower() != b"content-length"]
+            raw = [(k, b"W/" + v if k.lower() == b"etag" and not v.startswith(b"W/") else v) for k, v in raw]
+            raw = _add_vary(raw) + [(b"content-encoding", encoding.encode())]
+            compressed = compressor.compress(first_body, final)
+            if final:
+                raw.append((b"content-length", str(len(compressed)).encode()))
+            record_compression(encoding, len(first_body), len(compressed))
+            await send({**start, "headers": raw})
+            await send({"type": "http.response.body", "body": compressed, "more_body": not final})
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                if message["status"] in (204, 304) or scope["method"] == "HEAD" or not _compressible(headers):
+                    await send(message)
+                    return
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                compressed = compressor.compress(body, not more_body)
+                record_compression(encoding, len(body), len(compressed))
+                await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+                return
+
+            pending.append(body)
+            buffered = sum(len(chunk) for chunk in pending)
+            if buffered >= self.minimum_size:
+                await start_compressed(b"".join(pending), not more_body)
+                pending.clear()
+            elif not more_body:
+                # The whole body is under the threshold: send it as it was
+                await send({**start, "headers": _add_vary(list(start["headers"]))})
+                await send({"type": "http.response.body", "body": b"".join(pending), "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,11 @@
 """Database configuration and session management."""
 
 import os
-from sqlalchemy import create_engine
+import sqlite3
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Use env var if available, otherwise default to local file
@@ -14,15 +18,38 @@ if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
 
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores ON DELETE rules unless foreign keys are switched on per connection."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency that provides a database session per request."""
-    db = SessionLocal()
+# Set by ``POST /api/batch`` so that its sub-requests share the batch's session
+shared_session: ContextVar = ContextVar("shared_session", default=None)
+
+
+def request_session(factory):
+    """Yield the batch's shared session if there is one, else a new session from ``factory``."""
+    shared = shared_session.get()
+    if shared is not None:
+        yield shared  # closed by the batch request that owns it
+        return
+    db = factory()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_db():
+    """Dependency that provides a database session per request."""
+    yield from request_session(SessionLocal)
@@ -0,0 +1,71 @@
+"""Weak ETags and conditional GET for entity reads.
+
+An ETag is a hash of the ``(table, id, updated_at)`` versions of the rows a
+response is built from. It also covers the related rows that contribute
+fields to the response (a deal's ``contact_name``, a user's ``role``...). It is
+computed from loaded rows, so a handler can answer ``If-None-Match`` with
+``304 Not Modified`` before serializing anything:
+
+    etag = etag_for(deals)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return rows_response(DealResponse, deals, headers=cache_headers(etag))
+
+Response-model handlers set ``response.headers.update(cache_headers(etag))``
+on the injected ``Response`` instead.
+
+ETags are weak: two responses with the same tag are equivalent, though not
+necessarily byte-identical (compression, key order).
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# Relationships whose rows contribute fields to a model's response schema
+RELATED = {
+    "Contact": ("account",),
+    "Deal": ("contact", "account", "stage_rel"),
+    "User": ("role",),
+}
+
+
+def _versions(row, out: list) -> None:
+    name = type(row).__name__
+    out.append((row.__tablename__, row.id, row.updated_at))
+    for attribute in RELATED.get(name, ()):
+        related = getattr(row, attribute)
+        if related is not None:
+            _versions(related, out)
+
+
+def etag_for(rows) -> str:
+    """A weak ETag for one row, or for a list of rows in response order."""
+    versions = []
+    for row in rows if isinstance(rows, list) else [rows]:
+        _versions(row, versions)
+    digest = hashlib.blake2b(repr(versions).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` lists ``etag`` (weak comparison) or is ``*``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def cache_headers(etag: str) -> dict:
+    # Browsers may keep the response, but must revalidate it before every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def body_etag(body: bytes) -> str:
+    """A weak ETag for a rendered body, for responses built from rows that aren't versioned."""
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
@@ -0,0 +1,224 @@
+"""Columnar (Parquet / Arrow IPC) export of the CRM dataset for analytics.
+
+Rows are streamed from the database in batches, projected to the columns
+analysts need, and written into date-partitioned files::
+
+    <out_dir>/<table>/date=YYYY-MM-DD/part-<run_id>.parquet
+
+Incremental runs read rows whose watermark column (``updated_at`` or the
+table's creation timestamp) is newer than the value recorded by the previous
+run in ``<out_dir>/_watermarks.json``, minus an overlap window. Timestamps are
+set by the application before commit, so a transaction that stamped its rows
+before the previous run's watermark may only have committed after that run
+read; re-reading the last ``EXPORT_LAG_SECONDS`` picks those rows up. Rows in
+the window are exported again, and updated rows are written again into the
+partition of their new timestamp, so consumers should keep the latest row per
+``id``.
+
+``pyarrow`` is an optional dependency and is only imported when an export runs.
+
+Configuration (environment):
+    EXPORT_LAG_SECONDS   overlap re-read before the stored watermark; keep it
+                         above the longest write transaction (default 300)
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+
+from app.models import Account, Activity, Contact, Deal, Lead, StageChange
+
+EXPORT_LAG_SECONDS = int(os.getenv("EXPORT_LAG_SECONDS", "300"))
+
+WATERMARK_FILE = "_watermarks.json"
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# table name -> (model, projected columns, watermark column)
+EXPORT_TABLES = {
+    "deals": (
+        Deal,
+        ["id", "title", "value", "stage", "contact_id", "account_id", "pipeline_id",
+         "stage_id", "owner_id", "close_date", "probability_override", "loss_reason",
+         "created_at", "updated_at", "deleted_at"],
+        "updated_at",
+    ),
+    "stage_changes": (
+        StageChange,
+        ["id", "deal_id", "from_stage_id", "to_stage_id", "changed_at", "changed_by"],
+        "changed_at",
+    ),
+    "activities": (
+        Activity,
+        ["id", "type", "subject", "outcome", "date", "contact_id", "deal_id", "lead_id",
+         "account_id", "is_task", "due_date", "completed_at", "assigned_to_id", "created_at",
+         "updated_at"],
+        "updated_at",
+    ),
+    "leads": (
+        Lead,
+        ["id", "status", "source", "lead_score", "company", "industry", "company_size",
+         "owner_id", "converted_at", "converted_to_contact_id", "converted_to_account_id",
+         "converted_to_deal_id", "created_at", "updated_at", "deleted_at"],
+        "updated_at",
+    ),
+    "accounts": (
+        Account,
+        ["id", "name", "industry", "account_type", "annual_revenue", "employee_count",
+         "owner_id", "created_at", "updated_at", "deleted_at"],
+        "updated_at",
+    ),
+    "contacts": (
+        Contact,
+        ["id", "name", "company", "account_id", "owner_id", "created_at", "updated_at", "deleted_at"],
+        "updated_at",
+    ),
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError("pyarrow is required for analytics exports (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def _arrow_type(pa, column):
+    """Map a SQLAlchemy column type to an Arrow type."""
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def load_watermarks(out_dir: str) -> dict:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: datetime.fromisoformat(value) for name, value in json.load(f).items()}
+
+
+def save_watermarks(out_dir: str, watermarks: dict) -> None:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({name: value.isoformat() for name, value in watermarks.items()}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class _PartitionWriters:
+    """Lazily opened writer per date partition of one table."""
+
+    def __init__(self, pa, schema, table_dir, run_id, fmt):
+        self.pa = pa
+        self.schema = schema
+        self.table_dir = table_dir
+        self.filename = f"part-{run_id}{FORMATS[fmt]}"
+        self.fmt = fmt
+        self.writers = {}
+        self.files = []
+
+    def write(self, partition: str, columns: dict) -> None:
+        writer = self.writers.get(partition)
+        if writer is None:
+            partition_dir = os.path.join(self.table_dir, f"date={partition}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, self.filename)
+            if self.fmt == "parquet":
+                writer = self.pa.parquet.ParquetWriter(path, self.schema)
+            else:
+                writer = self.pa.ipc.new_file(path, self.schema)
+            self.writers[partition] = writer
+            self.files.append(path)
+        writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+
+
+def export_table(conn, name: str, out_dir: str, since=None, fmt: str = "parquet",
+                 batch_size: int = 10000, run_id: str = None, lag_seconds: int = EXPORT_LAG_SECONDS) -> dict:
+    """
+    Export one table: the rows stamped at or after ``since - lag_seconds``.
+    Returns the number of rows written, the files touched and the new
+    watermark (unchanged when no rows were newer than ``since``).
+    """
+    pa = _require_pyarrow()
+    model, column_names, watermark_name = EXPORT_TABLES[name]
+    columns = [model.__table__.c[c] for c in column_names]
+    watermark_col = model.__table__.c[watermark_name]
+    schema = pa.schema([(c.name, _arrow_type(pa, c)) for c in columns])
+    watermark_idx = column_names.index(watermark_name)
+    run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+    stmt = select(*columns).order_by(watermark_col, model.__table__.c.id)
+    if since is not None:
+        stmt = stmt.where(watermark_col >= since - timedelta(seconds=lag_seconds))
+
+    writers = _PartitionWriters(pa, schema, os.path.join(out_dir, name), run_id, fmt)
+    rows_written = 0
+    watermark = since
+    try:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        for batch in result.partitions():
+            # Group the batch by the date of its watermark column
+            by_partition = {}
+            for row in batch:
+                stamp = row[watermark_idx]
+                partition = stamp.date().isoformat() if stamp else "unknown"
+                by_partition.setdefault(partition, []).append(row)
+                if stamp and (watermark is None or stamp > watermark):
+                    watermark = stamp
+            for partition, rows in by_partition.items():
+                writers.write(partition, {
+                    c: [row[i] for row in rows] for i, c in enumerate(column_names)
+                })
+            rows_written += len(batch)
+    finally:
+        writers.close()
+
+    return {"rows": rows_written, "files": writers.files, "watermark": watermark}
+
+
+def run_export(engine, out_dir: str, tables=None, fmt: str = "parquet",
+               full: bool = False, batch_size: int = 10000, lag_seconds: int = EXPORT_LAG_SECONDS) -> dict:
+    """
+    Export the selected tables (all by default) and advance their watermarks.
+    Pass ``full=True`` to ignore stored watermarks and rescan everything.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    tables = tables or list(EXPORT_TABLES)
+    unknown = set(tables) - set(EXPORT_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    watermarks = load_watermarks(out_dir)
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+    summary = {}
+    with engine.connect() as conn:
+        for name in tables:
+            stats = export_table(
+                conn, name, out_dir,
+                since=None if full else watermarks.get(name), fmt=fmt, batch_size=batch_size, run_id=run_id,
+                lag_seconds=lag_seconds,
+            )
+            if stats["watermark"] is not None:
+                watermarks[name] = stats["watermark"]
+            summary[name] = stats
+
+    save_watermarks(out_dir, watermarks)
+    return summary
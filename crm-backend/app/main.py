@@ -2,21 +2,33 @@ from dotenv import load_dotenv
 load_dotenv()
 
 """FastAPI application entry point for the CRM system."""
+import asyncio
+import os
+import secrets
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.database import engine, Base
-from app.routers import contacts, deals, activities, accounts, leads, pipelines, notes, auth, users, roles, dashboard, search, products
+from app.database import engine, Base, SessionLocal
+from app.purge import PURGE_ENABLED, purge_worker
+from app.metrics import METRICS_ENABLED, MetricsMiddleware, render as render_metrics
+from app.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.memory import MemoryMiddleware
+from app.profiling import ProfilingMiddleware
+from app.query_stats import QueryStatsMiddleware
+from app.routers import contacts, deals, activities, accounts, leads, pipelines, notes, auth, users, roles, dashboard, search, products, sync, ownership, trash, debug, batch
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create database tables on startup."""
+    """Create database tables on startup and run the trash purge worker if enabled."""
     Base.metadata.create_all(bind=engine)
+    purge_task = asyncio.create_task(purge_worker(SessionLocal)) if PURGE_ENABLED else None
     yield
+    if purge_task:
+        purge_task.cancel()
 
 
 app = FastAPI(
@@ -37,8 +49,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Queries", "X-Profile-Id"],
 )
 
+# ── Query stats, profiling & memory ─────────────────────────────────────────────────
+
+# Profiling sits inside the query stats so its report can read the exact SQL time
+app.add_middleware(MemoryMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+
+# ── Compression ──────────────────────────────────────────────────────────────
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# ── Metrics ──────────────────────────────────────────────────────────────────
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # ── Routers ──────────────────────────────────────────────────────────────────
 
 app.include_router(auth.router)
@@ -54,6 +84,11 @@ app.include_router(leads.router)
 app.include_router(pipelines.router)
 app.include_router(notes.router)
 app.include_router(products.router)
+app.include_router(sync.router)
+app.include_router(ownership.router)
+app.include_router(trash.router)
+app.include_router(debug.router)
+app.include_router(batch.router)
 
 
 # ── Global exception handler ────────────────────────────────────────────────
@@ -75,3 +110,18 @@ app.include_router(products.router)
 def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """
+    Prometheus metrics in the text exposition format. Scrapes need a bearer
+    METRICS_TOKEN; only development serves them without one.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        if os.getenv("ENVIRONMENT", "development") != "development":
+            return PlainTextResponse("Unauthorized", status_code=401)
+    elif not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}"):
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
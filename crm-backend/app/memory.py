@@ -0,0 +1,225 @@
+"""Allocation tracking with tracemalloc.
+
+Tracing is off by default: an admin starts it through ``/api/debug/memory``
+(or the process is launched with ``PYTHONTRACEMALLOC=<frames>``). While it is
+on:
+
+* snapshots can be taken, listed and diffed, keeping the last ``MAX_SNAPSHOTS``;
+* the process-wide traced memory peak while a request runs, above the level
+  it started at, is observed into the ``http_request_peak_memory_bytes``
+  histogram. tracemalloc has a single peak for the whole process, so the value
+  includes whatever concurrent requests and threads allocated meanwhile; it is
+  an upper bound for the request, exact only when it ran alone. One request at
+  a time resets and reads the peak, and requests that start while another is
+  measured are not observed;
+* a sample of requests (``MEMORY_ROUTE_SAMPLE_RATE``) is snapshotted before the
+  handler runs and again when the response starts. The growth is aggregated
+  into the top allocation sites per route.
+
+Configuration (environment):
+    MEMORY_ROUTE_SAMPLE_RATE  fraction of requests attributed per route while tracing (default 0.05)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from app.metrics import REQUEST_PEAK_MEMORY
+
+MEMORY_ROUTE_SAMPLE_RATE = float(os.getenv("MEMORY_ROUTE_SAMPLE_RATE", "0.05"))
+MAX_SNAPSHOTS = 10
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+_lock = threading.Lock()
+_snapshots = OrderedDict()  # id -> (created_at, Snapshot)
+_next_snapshot_id = 1
+_route_sites = {}  # route -> {"requests": int, "sites": Counter(site -> bytes)}
+_peak_lock = threading.Lock()
+
+
+class TracingNotStarted(Exception):
+    pass
+
+
+def _site(frame) -> str:
+    filename = frame.filename
+    for marker in ("site-packages/", "crm-backend/", f"python{sys.version_info[0]}.{sys.version_info[1]}/"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+    return f"{filename}:{frame.lineno}"
+
+
+def _require_tracing() -> None:
+    if not tracemalloc.is_tracing():
+        raise TracingNotStarted()
+
+
+def status() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    return {
+        "tracing": tracing,
+        "frames": tracemalloc.get_traceback_limit() if tracing else None,
+        "current_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+        "snapshots": list_snapshots(),
+    }
+
+
+def start(frames: int = 1) -> dict:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return status()
+
+
+def stop() -> dict:
+    """Stop tracing and drop everything collected (snapshots hold a lot of memory)."""
+    tracemalloc.stop()
+    with _lock:
+        _snapshots.clear()
+        _route_sites.clear()
+    return status()
+
+
+def take_snapshot() -> dict:
+    global _next_snapshot_id
+    _require_tracing()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    created_at = datetime.now(timezone.utc)
+    with _lock:
+        snapshot_id = _next_snapshot_id
+        _next_snapshot_id += 1
+        _snapshots[snapshot_id] = (created_at, snapshot)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return _describe(snapshot_id, created_at, snapshot)
+
+
+def _describe(snapshot_id, created_at, snapshot) -> dict:
+    return {
+        "id": snapshot_id,
+        "created_at": created_at.isoformat(),
+        "total_kb": round(sum(trace.size for trace in snapshot.traces) / 1024, 1),
+    }
+
+
+def list_snapshots() -> list:
+    with _lock:
+        items = list(_snapshots.items())
+    return [_describe(snapshot_id, created_at, snapshot) for snapshot_id, (created_at, snapshot) in items]
+
+
+def get_snapshot(snapshot_id: int):
+    entry = _snapshots.get(snapshot_id)
+    return entry[1] if entry else None
+
+
+def _format_traceback(stat) -> list:
+    return [_site(frame) for frame in stat.traceback]
+
+
+def top_allocations(snapshot, key_type: str = "lineno", limit: int = 25) -> list:
+    return [
+        {
+            "site": _site(stat.traceback[0]),
+            "traceback": _format_traceback(stat) if key_type == "traceback" else None,
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics(key_type)[:limit]
+    ]
+
+
+def diff(older, newer, key_type: str = "lineno", limit: int = 25) -> list:
+    """Sites ordered by how much they grew between the two snapshots."""
+    return [
+        {
+            "site": _site(stat.traceback[0]),
+            "traceback": _format_traceback(stat) if key_type == "traceback" else None,
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+            "size_kb": round(stat.size / 1024, 1),
+        }
+        for stat in newer.compare_to(older, key_type)[:limit]
+    ]
+
+
+def route_report(limit: int = 10) -> dict:
+    with _lock:
+        routes = {route: (data["requests"], data["sites"].copy()) for route, data in _route_sites.items()}
+    return {
+        route: {
+            "sampled_requests": requests,
+            "top_sites": [
+                {"site": site, "avg_kb": round(size / requests / 1024, 1)}
+                for site, size in sites.most_common(limit)
+            ],
+        }
+        for route, (requests, sites) in sorted(routes.items())
+    }
+
+
+def _record_route(route: str, before, after) -> None:
+    growth = Counter()
+    for stat in after.compare_to(before, "lineno"):
+        if stat.size_diff > 0:
+            growth[_site(stat.traceback[0])] += stat.size_diff
+    with _lock:
+        data = _route_sites.setdefault(route, {"requests": 0, "sites": Counter()})
+        data["requests"] += 1
+        data["sites"].update(growth)
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+class MemoryMiddleware:
+    """Process peak memory during requests and sampled per-route allocation sites, active only while tracing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        measure_peak = _peak_lock.acquire(blocking=False)
+        if measure_peak:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        before = await asyncio.to_thread(_snapshot) if random.random() < MEMORY_ROUTE_SAMPLE_RATE else None
+        after = None
+
+        async def send_with_snapshot(message):
+            nonlocal after
+            if message["type"] == "http.response.start" and before is not None and tracemalloc.is_tracing():
+                after = await asyncio.to_thread(_snapshot)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_snapshot)
+        finally:
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            if measure_peak:
+                if tracemalloc.is_tracing():
+                    peak = tracemalloc.get_traced_memory()[1] - baseline
+                    REQUEST_PEAK_MEMORY.observe(max(peak, 0), scope["method"], route)
+                _peak_lock.release()
+            if after is not None:
+                # Comparing two snapshots walks every trace; keep it off the event loop
+                await asyncio.to_thread(_record_route, f"{scope['method']} {route}", before, after)
@@ -0,0 +1,259 @@
+"""In-process Prometheus metrics.
+
+Minimal counter, gauge and histogram collectors rendered in the Prometheus
+text exposition format on ``/metrics``. Updates are a dict lookup plus an
+add under a per-metric lock, so the request path stays cheap; values that
+are expensive or already tracked elsewhere (the DB pool) are read at scrape
+time through callbacks.
+
+Configuration (environment):
+    METRICS_ENABLED          "false" disables the middleware and query hooks (default true)
+"""
+
+import bisect
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Seconds; spans fast cached reads up to slow report endpoints
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Bytes; 64 KiB up to half of a 512Mi Cloud Run instance
+MEMORY_BUCKETS = tuple(2 ** n for n in range(16, 29, 2))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        lines = self.header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or read from ``callback`` (returning ``{labels: value}``) at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._callback = callback
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        values = self._callback() if self._callback else self._values
+        lines = self.header()
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def collect(self):
+        lines = self.header()
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = _labels(self.labelnames, labels, [f'le="{_number(bound)}"'])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.collect()) + "\n"
+
+
+def _pool_stats():
+    from app.database import engine
+
+    pool = engine.pool
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            stats[(name,)] = reader()
+    return stats
+
+
+# ── Collectors ───────────────────────────────────────────────────────────────
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+DB_POOL = Gauge("db_pool_connections", "Database connection pool state", ("state",), callback=_pool_stats)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed")
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", buckets=QUERY_BUCKETS
+)
+REQUEST_PEAK_MEMORY = Histogram(
+    "http_request_peak_memory_bytes", "Process-wide peak traced memory growth while a request ran (only while tracemalloc is on)",
+    ("method", "route"), buckets=MEMORY_BUCKETS,
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+CACHE_EVENTS = Counter(
+    "cache_events_total", "Cache fills, lookups served by another caller's fill, and backend errors",
+    ("cache", "event"),
+)
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total", "Single-flight calls by route and role (leader ran it, follower shared it)",
+    ("route", "role"),
+)
+AUTH_FAILURES = Counter("auth_failures_total", "Rejected authentication attempts by reason", ("reason",))
+COMPRESSION_BYTES = Counter(
+    "http_compression_bytes_total", "Compressed response body bytes before and after compression",
+    ("encoding", "stage"),
+)
+
+
+def record_query(duration: float) -> None:
+    if METRICS_ENABLED:
+        DB_QUERIES.inc()
+        DB_QUERY_DURATION.observe(duration)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    if METRICS_ENABLED:
+        CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def record_cache_event(cache: str, event: str) -> None:
+    if METRICS_ENABLED:
+        CACHE_EVENTS.inc(cache, event)
+
+
+def record_coalesced(route: str, follower: bool) -> None:
+    if METRICS_ENABLED:
+        COALESCED_CALLS.inc(route, "follower" if follower else "leader")
+
+
+def record_auth_failure(reason: str) -> None:
+    if METRICS_ENABLED:
+        AUTH_FAILURES.inc(reason)
+
+
+def record_compression(encoding: str, original: int, compressed: int) -> None:
+    if METRICS_ENABLED:
+        COMPRESSION_BYTES.inc(encoding, "original", amount=original)
+        COMPRESSION_BYTES.inc(encoding, "compressed", amount=compressed)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and in-flight requests per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Unmatched paths share one label so 404 scans cannot blow up cardinality
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - started, scope["method"], route)
@@ -2,8 +2,11 @@
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, Boolean, JSON, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, Boolean, JSON, Table, Index,
+    and_, delete, event, insert, inspect, literal, or_, select, update,
+)
+from sqlalchemy.orm import Session, relationship, with_loader_criteria
 
 from app.database import Base
 
@@ -12,12 +15,29 @@ from app.database import Base
 deal_contacts = Table(
     "deal_contacts",
     Base.metadata,
-    Column("deal_id", Integer, ForeignKey("deals.id"), primary_key=True),
-    Column("contact_id", Integer, ForeignKey("contacts.id"), primary_key=True),
+    Column("deal_id", Integer, ForeignKey("deals.id", ondelete="CASCADE"), primary_key=True),
+    Column("contact_id", Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True),
     Column("role", String(100), nullable=True),
 )
 
 
+def _soft_delete_indexes(table_name, created_at, deleted_at):
+    """
+    Partial indexes for soft-deletable tables: live rows in list order, and
+    trashed rows by deletion time for the trash view and the purge job.
+    """
+    return (
+        Index(
+            f"ix_{table_name}_live_created_at", created_at,
+            postgresql_where=deleted_at.is_(None), sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            f"ix_{table_name}_deleted_at", deleted_at,
+            postgresql_where=deleted_at.isnot(None), sqlite_where=deleted_at.isnot(None),
+        ),
+    )
+
+
 class Role(Base):
     """User role with permissions."""
 
@@ -58,10 +78,11 @@ class User(Base):
     )
 
     role = relationship("Role", back_populates="users")
-    contacts = relationship("Contact", back_populates="owner")
-    deals = relationship("Deal", back_populates="owner")
-    accounts = relationship("Account", back_populates="owner")
-    leads = relationship("Lead", back_populates="owner")
+    # Passive: the database clears owner_id, also on trashed rows the ORM cannot see
+    contacts = relationship("Contact", back_populates="owner", passive_deletes=True)
+    deals = relationship("Deal", back_populates="owner", passive_deletes=True)
+    accounts = relationship("Account", back_populates="owner", passive_deletes=True)
+    leads = relationship("Lead", back_populates="owner", passive_deletes=True)
 
 
 class Account(Base):
@@ -79,18 +100,22 @@ class Account(Base):
     account_type = Column(String(50), nullable=True, default="Prospect")
     annual_revenue = Column(Float, nullable=True)
     employee_count = Column(Integer, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
     )
+    deleted_at = Column(DateTime, nullable=True)
+
+    __table_args__ = _soft_delete_indexes("accounts", created_at, deleted_at)
 
     owner = relationship("User", back_populates="accounts")
-    contacts = relationship("Contact", back_populates="account")
-    deals = relationship("Deal", back_populates="account")
-    activities = relationship("Activity", back_populates="account", cascade="all, delete-orphan")
+    contacts = relationship("Contact", back_populates="account", passive_deletes=True)
+    deals = relationship("Deal", back_populates="account", passive_deletes=True)
+    activities = relationship("Activity", back_populates="account", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Contact(Base):
@@ -104,20 +129,24 @@ class Contact(Base):
     phone = Column(String(50), nullable=True)
     company = Column(String(255), nullable=True, index=True)
     notes = Column(Text, nullable=True)
-    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="SET NULL"), nullable=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
     )
+    deleted_at = Column(DateTime, nullable=True)
+
+    __table_args__ = _soft_delete_indexes("contacts", created_at, deleted_at)
 
     owner = relationship("User", back_populates="contacts")
     account = relationship("Account", back_populates="contacts")
-    deals = relationship("Deal", back_populates="contact", cascade="all, delete-orphan")
+    deals = relationship("Deal", back_populates="contact", cascade="all, delete-orphan", passive_deletes=True)
     activities = relationship(
-        "Activity", back_populates="contact", cascade="all, delete-orphan"
+        "Activity", back_populates="contact", cascade="all, delete-orphan", passive_deletes=True
     )
 
     @property
@@ -146,11 +175,11 @@ class Deal(Base):
         nullable=False,
         default="prospecting",
     )
-    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
-    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
-    pipeline_id = Column(Integer, ForeignKey("pipelines.id"), nullable=True)
-    stage_id = Column(Integer, ForeignKey("stages.id"), nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="SET NULL"), nullable=True, index=True)
+    pipeline_id = Column(Integer, ForeignKey("pipelines.id", ondelete="SET NULL"), nullable=True, index=True)
+    stage_id = Column(Integer, ForeignKey("stages.id", ondelete="SET NULL"), nullable=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     close_date = Column(DateTime, nullable=True)
     probability_override = Column(Integer, nullable=True)
     loss_reason = Column(String(255), nullable=True)
@@ -160,17 +189,21 @@ class Deal(Base):
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
     )
+    deleted_at = Column(DateTime, nullable=True)
+
+    __table_args__ = _soft_delete_indexes("deals", created_at, deleted_at)
 
     owner = relationship("User", back_populates="deals")
     contact = relationship("Contact", back_populates="deals")
     account = relationship("Account", back_populates="deals")
     pipeline = relationship("Pipeline", back_populates="deals")
     stage_rel = relationship("Stage", back_populates="deals", foreign_keys=[stage_id])
-    stage_history = relationship("StageChange", back_populates="deal", cascade="all, delete-orphan")
-    activities = relationship("Activity", back_populates="deal", cascade="all, delete-orphan")
-    related_contacts = relationship("Contact", secondary="deal_contacts", lazy="select")
-    line_items = relationship("DealLineItem", back_populates="deal", cascade="all, delete-orphan")
+    stage_history = relationship("StageChange", back_populates="deal", cascade="all, delete-orphan", passive_deletes=True)
+    activities = relationship("Activity", back_populates="deal", cascade="all, delete-orphan", passive_deletes=True)
+    related_contacts = relationship("Contact", secondary="deal_contacts", lazy="select", passive_deletes=True)
+    line_items = relationship("DealLineItem", back_populates="deal", cascade="all, delete-orphan", passive_deletes=True)
 
     @property
     def effective_probability(self):
@@ -212,15 +245,21 @@ class Activity(Base):
     description = Column(Text, nullable=True)
     outcome = Column(Text, nullable=True)
     date = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
-    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=True)
-    lead_id = Column(Integer, ForeignKey("leads.id"), nullable=True)
-    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=True, index=True)
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=True, index=True)
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), nullable=True, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True, index=True)
     is_task = Column(Boolean, nullable=False, default=False)
     due_date = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
-    assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    assigned_to_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
 
     contact = relationship("Contact", back_populates="activities")
     deal = relationship("Deal", back_populates="activities")
@@ -263,23 +302,27 @@ class Lead(Base):
     job_title = Column(String(255), nullable=True)
     industry = Column(String(255), nullable=True)
     company_size = Column(String(50), nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     converted_at = Column(DateTime, nullable=True)
-    converted_to_contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True)
-    converted_to_account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
-    converted_to_deal_id = Column(Integer, ForeignKey("deals.id"), nullable=True)
+    converted_to_contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="SET NULL"), nullable=True)
+    converted_to_account_id = Column(Integer, ForeignKey("accounts.id", ondelete="SET NULL"), nullable=True)
+    converted_to_deal_id = Column(Integer, ForeignKey("deals.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
     )
+    deleted_at = Column(DateTime, nullable=True)
+
+    __table_args__ = _soft_delete_indexes("leads", created_at, deleted_at)
 
     owner = relationship("User", back_populates="leads")
     contact = relationship("Contact", foreign_keys=[converted_to_contact_id])
     account = relationship("Account", foreign_keys=[converted_to_account_id])
     deal = relationship("Deal", foreign_keys=[converted_to_deal_id])
-    activities = relationship("Activity", back_populates="lead", cascade="all, delete-orphan")
+    activities = relationship("Activity", back_populates="lead", cascade="all, delete-orphan", passive_deletes=True)
 
     @property
     def lead_grade(self) -> str:
@@ -307,7 +350,7 @@ class Pipeline(Base):
     )
 
     stages = relationship("Stage", back_populates="pipeline", order_by="Stage.order", cascade="all, delete-orphan")
-    deals = relationship("Deal", back_populates="pipeline")
+    deals = relationship("Deal", back_populates="pipeline", passive_deletes=True)
 
 
 class Stage(Base):
@@ -328,7 +371,7 @@ class Stage(Base):
     )
 
     pipeline = relationship("Pipeline", back_populates="stages")
-    deals = relationship("Deal", back_populates="stage_rel")
+    deals = relationship("Deal", back_populates="stage_rel", passive_deletes=True)
 
 
 class StageChange(Base):
@@ -337,9 +380,10 @@ class StageChange(Base):
     __tablename__ = "stage_changes"
 
     id = Column(Integer, primary_key=True, index=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False)
-    from_stage_id = Column(Integer, ForeignKey("stages.id"), nullable=True)
-    to_stage_id = Column(Integer, ForeignKey("stages.id"), nullable=False)
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=False, index=True)
+    from_stage_id = Column(Integer, ForeignKey("stages.id", ondelete="SET NULL"), nullable=True, index=True)
+    # No ON DELETE: a stage that deals moved into keeps its history (the routers answer 409)
+    to_stage_id = Column(Integer, ForeignKey("stages.id"), nullable=False, index=True)
     changed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     changed_by = Column(Integer, nullable=True)
 
@@ -383,7 +427,7 @@ class DealLineItem(Base):
     __tablename__ = "deal_line_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False)
+    deal_id = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Float, nullable=False, default=1.0)
     unit_price_override = Column(Float, nullable=True)
@@ -422,4 +466,160 @@ class Note(Base):
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
+        index=True,
     )
+
+
+class Deletion(Base):
+    """Tombstone left behind when a synced entity is deleted."""
+
+    __tablename__ = "deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+
+class CacheVersion(Base):
+    """Invalidation counter for an in-process cache shared by several instances."""
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# Entities exposed through the delta-sync feed, keyed by model
+SYNCED_ENTITY_TYPES = {
+    Account: "account",
+    Contact: "contact",
+    Deal: "deal",
+    Lead: "lead",
+    Note: "note",
+}
+
+
+# Entities that are moved to the trash (``deleted_at`` set) instead of being deleted outright
+SOFT_DELETE_MODELS = (Account, Contact, Deal, Lead)
+
+
+@event.listens_for(Session, "before_flush")
+def record_deletions(session, flush_context, instances):
+    """
+    Write a tombstone for every synced entity deleted in this flush (including
+    ORM cascades) or moved to the trash.
+    """
+    for obj in list(session.deleted):
+        entity_type = SYNCED_ENTITY_TYPES.get(type(obj))
+        if entity_type and obj.id is not None:
+            session.add(Deletion(entity_type=entity_type, entity_id=obj.id))
+
+    for obj in list(session.dirty):
+        if not isinstance(obj, SOFT_DELETE_MODELS) or obj.deleted_at is None:
+            continue
+        if inspect(obj).attrs.deleted_at.history.added:
+            session.add(Deletion(entity_type=SYNCED_ENTITY_TYPES[type(obj)], entity_id=obj.id))
+
+
+def _trashed_ids(model):
+    # Core columns, so the soft-delete criteria below don't rewrite this subquery
+    table = model.__table__
+    return select(table.c.id).where(table.c.deleted_at.isnot(None))
+
+
+def _live_activity(cls):
+    """Activities whose contact, deal, lead and account (where set) are not in the trash."""
+    return and_(*[
+        or_(column.is_(None), column.not_in(_trashed_ids(model)))
+        for column, model in (
+            (cls.contact_id, Contact), (cls.deal_id, Deal), (cls.lead_id, Lead), (cls.account_id, Account),
+        )
+    ])
+
+
+def _live_note(cls):
+    """Notes whose related record is not in the trash."""
+    return and_(*[
+        or_(cls.related_to_type != entity_type, cls.related_to_id.not_in(_trashed_ids(model)))
+        for model, entity_type in SYNCED_ENTITY_TYPES.items()
+        if model in SOFT_DELETE_MODELS
+    ])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def hide_soft_deleted(execute_state):
+    """
+    Scope ORM SELECTs to live rows, and to activities and notes of live rows.
+    The criteria propagate to lazy and eager relationship loads; pass
+    ``execution_options(include_deleted=True)`` to see the trash. Because the ORM never sees trashed children, parents with
+    soft-deletable children leave them to ``ON DELETE`` and ``passive_deletes``.
+    """
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("include_deleted", False)
+    ):
+        return
+    execute_state.statement = execute_state.statement.options(
+        *[
+            with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+            for model in SOFT_DELETE_MODELS
+        ],
+        # Children of trashed records go with them
+        with_loader_criteria(Activity, lambda cls: _live_activity(cls), include_aliases=True),
+        with_loader_criteria(Note, lambda cls: _live_note(cls), include_aliases=True),
+    )
+
+
+def record_bulk_deletions(session, entity_type: str, ids) -> None:
+    """
+    Write tombstones for rows removed by a bulk statement or a database-level
+    cascade, which the flush hook above never sees. ``ids`` is a select of ids.
+    """
+    session.execute(
+        insert(Deletion).from_select(["entity_id", "entity_type"], ids.add_columns(literal(entity_type)))
+    )
+
+
+def delete_related_notes(session, targets) -> None:
+    """
+    Delete the polymorphic notes attached to ``(related_to_type, ids)`` targets
+    with one statement. ``ids`` may be a list or a select of ids.
+    """
+    condition = or_(*[
+        and_(Note.related_to_type == related_to_type, Note.related_to_id.in_(ids))
+        for related_to_type, ids in targets
+    ])
+    record_bulk_deletions(session, "note", select(Note.id).where(condition))
+    session.execute(delete(Note).where(condition), execution_options={"synchronize_session": False})
+
+
+def soft_delete(session, obj) -> None:
+    """
+    Move ``obj`` to the trash. A contact takes its live deals with it, stamped
+    with the same ``deleted_at`` so that restoring the contact brings them back.
+    """
+    deleted_at = datetime.now(timezone.utc)
+    if isinstance(obj, Contact):
+        live_deals = and_(Deal.contact_id == obj.id, Deal.deleted_at.is_(None))
+        record_bulk_deletions(session, "deal", select(Deal.id).where(live_deals))
+        session.execute(
+            update(Deal).where(live_deals).values(deleted_at=deleted_at),
+            execution_options={"synchronize_session": False},
+        )
+    obj.deleted_at = deleted_at
+
+
+def restore(session, obj) -> None:
+    """Take ``obj`` (and anything trashed along with it) back out of the trash."""
+    if isinstance(obj, Contact):
+        session.execute(
+            update(Deal)
+            .where(Deal.contact_id == obj.id, Deal.deleted_at == obj.deleted_at)
+            .values(deleted_at=None),
+            execution_options={"synchronize_session": False},
+        )
+    obj.deleted_at = None
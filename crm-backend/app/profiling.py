@@ -0,0 +1,279 @@
+"""On-demand request profiling via the ``X-Profile: 1`` header.
+
+cProfile only sees the thread that enabled it, while FastAPI runs sync
+handlers, dependencies and serialization on threadpool workers. This module
+therefore uses a statistical profiler instead: while a profiled request is in
+flight, a background thread samples the Python stacks of every busy
+request-serving thread every ``PROFILE_INTERVAL_MS``.
+
+Each sample is attributed to one category: ``sql`` (inside the DBAPI call),
+``orm_hydration`` (building objects from rows), ``serialization`` (Pydantic
+validation and JSON rendering) or ``handler`` (everything else). Exact SQL
+time comes from the query-stats hooks. Sampling starts only once the bearer
+token has been verified to belong to an admin (the same rule as
+``get_current_admin_user``); other callers are served unprofiled. The report is
+stored in memory under the id returned in ``X-Profile-Id`` and served by
+``/api/debug/profiles/{id}``. The category totals are also returned inline as
+``Server-Timing`` entries.
+
+Samples come from every busy thread, so concurrent requests on the same
+instance show up in the report; ``in_flight`` records how many there were.
+
+Configuration (environment):
+    PROFILE_INTERVAL_MS      sampling interval (default 1)
+    PROFILE_MAX_STORED       reports kept in memory (default 50)
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+
+from starlette.concurrency import run_in_threadpool
+
+from app.auth import is_admin_token
+from app.database import get_db
+from app.metrics import HTTP_IN_FLIGHT
+from app.query_stats import current_query_stats
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "50"))
+
+CATEGORIES = ("sql", "orm_hydration", "serialization", "handler")
+
+# Innermost frames of threads that are parked rather than working
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("base_events.py", "_run_once"),
+}
+_SQL_FUNCTIONS = {"do_execute", "do_execute_no_params", "do_executemany"}
+_SERIALIZATION_FUNCTIONS = {"serialize_response", "_prepare_response_content", "jsonable_encoder", "render"}
+
+
+def _frame_key(code) -> tuple:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _categorize(stack) -> str:
+    """``stack`` is outermost-first ``(filename, line, function)`` tuples."""
+    category = "handler"
+    for filename, _, function in stack:
+        path = filename.replace("\\", "/")
+        if function in _SQL_FUNCTIONS and "sqlalchemy/engine" in path:
+            return "sql"
+        if "sqlalchemy/orm/loading.py" in path:
+            category = "orm_hydration"
+        elif category == "handler" and (
+            "/pydantic" in path
+            or (function in _SERIALIZATION_FUNCTIONS and ("fastapi/" in path or "starlette/responses.py" in path))
+        ):
+            category = "serialization"
+    return category
+
+
+class ProfileSession:
+    """Samples collected for one profiled request."""
+
+    def __init__(self, scope):
+        self.id = uuid.uuid4().hex
+        self.scope = scope
+        self.created_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.ticks = 0
+        self.in_flight = HTTP_IN_FLIGHT.value()
+
+    def add(self, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(_frame_key(frame.f_code))
+            frame = frame.f_back
+        innermost = stack[0]
+        if (os.path.basename(innermost[0]), innermost[2]) in _IDLE_FRAMES:
+            return
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+
+    def tick_ms(self) -> float:
+        elapsed = (time.perf_counter() - self.started) * 1000
+        return elapsed / self.ticks if self.ticks else PROFILE_INTERVAL_MS
+
+    def breakdown(self) -> dict:
+        """Estimated milliseconds per category (SQL is exact when query stats are available)."""
+        samples = Counter()
+        for stack, n in dict(self.stacks).items():
+            samples[_categorize(stack)] += n
+        tick = self.tick_ms()
+        result = {category: round(samples[category] * tick, 2) for category in CATEGORIES}
+        stats = current_query_stats()
+        if stats is not None:
+            result["sql"] = round(stats.duration * 1000, 2)
+        return result
+
+
+class _Sampler:
+    """One background thread shared by every in-flight profile; it exits when none are left."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = set()
+        self._thread = None
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            frames.pop(me, None)
+            for session in sessions:
+                session.ticks += 1
+                for frame in frames.values():
+                    session.add(frame)
+            del frames
+            time.sleep(interval)
+
+
+_sampler = _Sampler()
+_store = OrderedDict()
+_store_lock = threading.Lock()
+
+
+def _location(key) -> str:
+    filename, line, function = key
+    for marker in ("site-packages/", "crm-backend/", f"python{sys.version_info[0]}.{sys.version_info[1]}/"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+    return f"{filename}:{line}({function})"
+
+
+def build_report(session: ProfileSession, status: int, breakdown: dict) -> dict:
+    stacks = Counter(dict(session.stacks))  # the sampler may still be writing
+    self_counts, total_counts = Counter(), Counter()
+    for stack, n in stacks.items():
+        self_counts[stack[-1]] += n
+        for key in set(stack):
+            total_counts[key] += n
+    tick = session.tick_ms()
+    scope = session.scope
+    route = scope.get("route")
+    return {
+        "id": session.id,
+        "method": scope["method"],
+        "route": route.path if route is not None else scope["path"],
+        "path": scope["path"],
+        "status": status,
+        "created_at": session.created_at.isoformat(),
+        "wall_ms": round((time.perf_counter() - session.started) * 1000, 2),
+        "interval_ms": round(tick, 3),
+        "samples": sum(stacks.values()),
+        "in_flight": session.in_flight,
+        "breakdown_ms": breakdown,
+        "top_functions": [
+            {
+                "function": _location(key),
+                "self_ms": round(self_counts[key] * tick, 2),
+                "total_ms": round(n * tick, 2),
+            }
+            for key, n in total_counts.most_common(40)
+        ],
+        "stacks": [
+            {"stack": ";".join(_location(key) for key in stack), "samples": n}
+            for stack, n in stacks.most_common(100)
+        ],
+    }
+
+
+def store_report(report: dict) -> None:
+    with _store_lock:
+        _store[report["id"]] = report
+        while len(_store) > PROFILE_MAX_STORED:
+            _store.popitem(last=False)
+
+
+def get_report(profile_id: str):
+    return _store.get(profile_id)
+
+
+def list_reports() -> list:
+    with _store_lock:
+        reports = list(_store.values())
+    return [
+        {key: r[key] for key in ("id", "method", "route", "status", "created_at", "wall_ms")}
+        for r in reversed(reports)
+    ]
+
+
+def _requested_token(scope):
+    """The bearer token of a request asking to be profiled, else ``None``."""
+    headers = dict(scope.get("headers", []))
+    if headers.get(b"x-profile") != b"1":
+        return None
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def _caller_is_admin(app, token: str) -> bool:
+    # Through get_db (and its overrides) so the check reads the same database as the routes
+    sessions = app.dependency_overrides.get(get_db, get_db)()
+    try:
+        return is_admin_token(token, next(sessions))
+    finally:
+        sessions.close()
+
+
+class ProfilingMiddleware:
+    """Profile requests carrying ``X-Profile: 1`` from admins."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        token = _requested_token(scope) if scope["type"] == "http" else None
+        # The user lookup blocks, so run it off the event loop like the auth dependencies
+        if token is None or not await run_in_threadpool(_caller_is_admin, scope["app"], token):
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(scope)
+        status = 500
+        breakdown = None
+
+        async def send_with_profile(message):
+            nonlocal status, breakdown
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                breakdown = session.breakdown()
+                timing = ", ".join(f"prof-{name};dur={ms}" for name, ms in breakdown.items())
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.id.encode()))
+                headers.append((b"server-timing", timing.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        _sampler.add(session)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _sampler.remove(session)
+            store_report(build_report(session, status, breakdown or session.breakdown()))
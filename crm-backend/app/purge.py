@@ -0,0 +1,124 @@
+"""Background purge of soft-deleted records.
+
+Deletes move rows to the trash by setting ``deleted_at``. This module removes
+trashed rows for good once they are older than the retention period, in
+bounded batches with one short transaction each, so no single statement holds
+locks across a large cascade. The database's ON DELETE rules remove
+activities, stage history, line items and deal links.
+
+Configuration (environment):
+    PURGE_ENABLED            run the worker inside the API process ("true"/"false", default false)
+    PURGE_RETENTION_DAYS     how long trashed rows stay restorable (default 30)
+    PURGE_BATCH_SIZE         rows per transaction (default 500)
+    PURGE_WINDOW             off-peak window in UTC, "HH:MM-HH:MM" (default 02:00-05:00)
+    PURGE_INTERVAL_SECONDS   how often the worker wakes up (default 900)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from app.models import Account, Contact, Deal, Lead, SYNCED_ENTITY_TYPES, delete_related_notes
+
+logger = logging.getLogger(__name__)
+
+PURGE_ENABLED = os.getenv("PURGE_ENABLED", "false").lower() == "true"
+PURGE_RETENTION_DAYS = int(os.getenv("PURGE_RETENTION_DAYS", "30"))
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+PURGE_WINDOW = os.getenv("PURGE_WINDOW", "02:00-05:00")
+PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", "900"))
+
+# Children before parents, so a contact's cascade never has live work left to do
+PURGE_ORDER = (Deal, Lead, Contact, Account)
+
+
+def purge_rows(session, model, ids) -> None:
+    """Hard-delete the given rows of ``model`` (tombstones were written when they were trashed)."""
+    targets = [(SYNCED_ENTITY_TYPES[model], ids)]
+    if model is Contact:
+        targets.append(("deal", select(Deal.id).where(Deal.contact_id.in_(ids))))
+    delete_related_notes(session, targets)
+
+    if model is Account:
+        # ON DELETE SET NULL would do this too, but without bumping updated_at for sync clients
+        for child in (Contact, Deal):
+            session.execute(
+                update(child).where(child.account_id.in_(ids)).values(account_id=None),
+                execution_options={"synchronize_session": False},
+            )
+
+    session.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False})
+
+
+def purge_deleted(
+    session_factory,
+    retention: timedelta = timedelta(days=PURGE_RETENTION_DAYS),
+    batch_size: int = PURGE_BATCH_SIZE,
+    stop_at: datetime = None,
+    pause: float = 0.0,
+) -> dict:
+    """
+    Purge rows trashed before ``now - retention``, committing after every batch.
+    Stops early once ``stop_at`` has passed. Returns the number of rows purged per entity.
+    """
+    cutoff = datetime.now(timezone.utc) - retention
+    purged = {}
+    for model in PURGE_ORDER:
+        entity_type = SYNCED_ENTITY_TYPES[model]
+        purged[entity_type] = 0
+        while stop_at is None or datetime.now(timezone.utc) < stop_at:
+            with session_factory() as session:
+                ids = session.scalars(
+                    select(model.id)
+                    .where(model.deleted_at < cutoff)
+                    .order_by(model.id)
+                    .limit(batch_size)
+                    .execution_options(include_deleted=True)
+                ).all()
+                if not ids:
+                    break
+                purge_rows(session, model, ids)
+                session.commit()
+            purged[entity_type] += len(ids)
+            if pause:
+                time.sleep(pause)
+    return purged
+
+
+def parse_window(window: str) -> tuple[dt_time, dt_time]:
+    """Parse ``"HH:MM-HH:MM"`` into start and end times."""
+    start, end = window.split("-")
+    return dt_time.fromisoformat(start.strip()), dt_time.fromisoformat(end.strip())
+
+
+def window_end(now: datetime, window: str):
+    """Return when the current purge window closes, or None if ``now`` is outside it."""
+    start, end = parse_window(window)
+    current = now.time().replace(tzinfo=None)
+    if start <= end:
+        inside = start <= current < end
+    else:  # window wraps past midnight
+        inside = current >= start or current < end
+    if not inside:
+        return None
+    closes = now.replace(hour=end.hour, minute=end.minute, second=0, microsecond=0)
+    return closes if closes > now else closes + timedelta(days=1)
+
+
+async def purge_worker(session_factory):
+    """Wake up periodically and purge the trash while inside the off-peak window."""
+    while True:
+        now = datetime.now(timezone.utc)
+        closes = window_end(now, PURGE_WINDOW)
+        if closes is not None:
+            try:
+                purged = await asyncio.to_thread(purge_deleted, session_factory, stop_at=closes, pause=0.1)
+                if any(purged.values()):
+                    logger.info("Purged trashed records: %s", purged)
+            except Exception:
+                logger.exception("Trash purge failed")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
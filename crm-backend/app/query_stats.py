@@ -0,0 +1,154 @@
+"""Per-request SQL statement counting and N+1 detection.
+
+Engine-level cursor hooks time every statement (feeding the ``db_query_*``
+metrics) and record it into the ``QueryStats``
+of the request currently being served (held in a context variable, which
+FastAPI copies into the threadpool that runs sync handlers). The middleware
+reports the totals as ``Server-Timing`` / ``X-DB-Queries`` headers outside
+production and logs a warning naming the route when a request runs too many
+statements or repeats the same statement shape (the N+1 signature). Requests
+over the slow threshold are handed to ``app.slow_log`` once the response is sent.
+
+Configuration (environment):
+    ENVIRONMENT              headers are omitted when set to "production"
+    QUERY_COUNT_WARN         warn when a request runs more statements than this (default 30)
+    QUERY_REPEAT_WARN        warn when one statement shape repeats more than this (default 10)
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import record_query
+from app.slow_log import log_if_slow
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "30"))
+QUERY_REPEAT_WARN = int(os.getenv("QUERY_REPEAT_WARN", "10"))
+
+
+# Per-statement detail kept for the slow request log; counts keep going past this
+MAX_RECORDED_STATEMENTS = 200
+
+
+class QueryStats:
+    """Statements executed within one request (or one ``count_queries`` block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.statements = []  # (statement, parameters, duration, engine)
+
+    def record(self, statement: str, duration: float, parameters=None, engine=None) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((statement, parameters, duration, engine))
+
+    def repeated(self, threshold: int):
+        """Statement shapes executed more than ``threshold`` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+def current_query_stats():
+    """The ``QueryStats`` of the request being served, or None outside a request."""
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    duration = time.perf_counter() - started if started else 0.0
+    record_query(duration)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration, parameters, conn.engine)
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect every statement run on ``engine`` inside the block, from any thread."""
+    stats = QueryStats()
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._counted_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_counted_started", None)
+        stats.record(statement, time.perf_counter() - started if started else 0.0)
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route else scope['path']}"
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that attaches a fresh ``QueryStats`` to every HTTP request."""
+
+    def __init__(self, app, expose_headers: bool = ENVIRONMENT != "production"):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            route = _route_name(scope)
+            _warn_if_excessive(route, stats)
+            await log_if_slow(scope, route, time.perf_counter() - started, stats)
+
+
+def _warn_if_excessive(route: str, stats: QueryStats) -> None:
+    if stats.count > QUERY_COUNT_WARN:
+        logger.warning("%s ran %d queries (%.1f ms in the database)", route, stats.count, stats.duration * 1000)
+    for shape, n in stats.repeated(QUERY_REPEAT_WARN):
+        logger.warning("Possible N+1 on %s: statement ran %d times: %s", route, n, " ".join(shape.split())[:200])
@@ -1,16 +1,19 @@
 """Accounts CRUD router."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import Account, Contact, Deal, User, Note, Activity
+from app.models import Account, User, Note, Activity, soft_delete
 from app.schemas import (
     AccountCreate, AccountUpdate, AccountResponse,
     ContactResponse, DealResponse, AssignOwner,
     TimelineEvent, TimelineEventType, NoteResponse, ActivityResponse
 )
 from app.auth import get_current_active_user, check_permissions
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
+from app.includes import include_description, included_response, parse_includes
+from app.serialization import JSONResponse, row_dict, rows_response
 
 router = APIRouter(prefix="/api/accounts", tags=["Accounts"])
 
@@ -34,15 +37,18 @@ def create_account(
 
 @router.get("/", response_model=list[AccountResponse])
 def list_accounts(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: str = Query(None, description="Search by name or industry"),
+    include: str = Query(None, description=include_description("account")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all accounts with optional search and pagination."""
     if not check_permissions(current_user, "accounts.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("account", include, current_user)
 
     query = db.query(Account)
     if search:
@@ -51,22 +57,38 @@ def list_accounts(
             Account.name.ilike(pattern)
             | Account.industry.ilike(pattern)
         )
-    return query.order_by(Account.created_at.desc()).offset(skip).limit(limit).all()
+    accounts = query.order_by(Account.created_at.desc()).offset(skip).limit(limit).all()
+    if includes:
+        return included_response(request, db, "account", AccountResponse, accounts, includes)
+    etag = etag_for(accounts)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return rows_response(AccountResponse, accounts, headers=cache_headers(etag))
 
 
 @router.get("/{account_id}", response_model=AccountResponse)
 def get_account(
     account_id: int, 
+    request: Request,
+    response: Response,
+    include: str = Query(None, description=include_description("account")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a single account by ID."""
     if not check_permissions(current_user, "accounts.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("account", include, current_user)
 
     account = db.query(Account).filter(Account.id == account_id).first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
+    if includes:
+        return included_response(request, db, "account", AccountResponse, account, includes)
+    etag = etag_for(account)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return account
 
 
@@ -101,7 +123,7 @@ def delete_account(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete an account and cascade delete logic (if configured)."""
+    """Move an account to the trash; its contacts and deals are detached when it is purged."""
     if not check_permissions(current_user, "accounts.delete"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
@@ -109,7 +131,7 @@ def delete_account(
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
-    db.delete(account)
+    soft_delete(db, account)
     db.commit()
 
 
@@ -209,7 +231,7 @@ def get_account_timeline(
             "id": note.id,
             "type": TimelineEventType.note,
             "timestamp": note.created_at,
-            "data": NoteResponse.model_validate(note).model_dump()
+            "data": row_dict(NoteResponse, note)
         })
 
     # 2. Activities
@@ -219,10 +241,10 @@ def get_account_timeline(
             "id": activity.id,
             "type": TimelineEventType.activity,
             "timestamp": activity.date,
-            "data": ActivityResponse.model_validate(activity).model_dump()
+            "data": row_dict(ActivityResponse, activity)
         })
 
     # Sort by timestamp descending
     events.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    return events
+
+    return JSONResponse(events)
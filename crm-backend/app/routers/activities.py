@@ -4,12 +4,13 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
 from app.models import Activity, Contact, Lead, Deal, Account, User
 from app.schemas import ActivityCreate, ActivityUpdate, ActivityResponse
 from app.auth import get_current_active_user, check_permissions
+from app.serialization import rows_response
 
 router = APIRouter(prefix="/api/activities", tags=["Activities"])
 
@@ -72,7 +73,7 @@ def list_tasks(
     if not check_permissions(current_user, "activities.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
-    query = db.query(Activity).filter(Activity.is_task == True)
+    query = db.query(Activity).options(selectinload(Activity.assigned_to)).filter(Activity.is_task == True)
     if assigned_to_id:
         query = query.filter(Activity.assigned_to_id == assigned_to_id)
     if completed is True:
@@ -80,7 +81,7 @@ def list_tasks(
     elif completed is False:
         query = query.filter(Activity.completed_at == None)
 
-    return query.order_by(Activity.due_date.asc().nulls_last()).offset(skip).limit(limit).all()
+    return rows_response(ActivityResponse, query.order_by(Activity.due_date.asc().nulls_last()).offset(skip).limit(limit).all())
 
 
 @router.get("/", response_model=list[ActivityResponse])
@@ -98,7 +99,7 @@ def list_activities(
     if not check_permissions(current_user, "activities.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
-    query = db.query(Activity)
+    query = db.query(Activity).options(selectinload(Activity.assigned_to))
     if contact_id:
         query = query.filter(Activity.contact_id == contact_id)
     if lead_id:
@@ -108,7 +109,7 @@ def list_activities(
     if account_id:
         query = query.filter(Activity.account_id == account_id)
         
-    return query.order_by(Activity.date.desc()).offset(skip).limit(limit).all()
+    return rows_response(ActivityResponse, query.order_by(Activity.date.desc()).offset(skip).limit(limit).all())
 
 
 @router.get("/{activity_id}", response_model=ActivityResponse)
@@ -13,6 +13,7 @@ from app.auth import (
     verify_password, create_access_token, get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from app.metrics import record_auth_failure
 
 import os
 import secrets
@@ -34,6 +35,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     user = db.query(User).filter(User.email == form_data.username).first()
     
     if not user or not verify_password(form_data.password, user.password_hash):
+        record_auth_failure("bad_credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -41,6 +43,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
 
     if not user.is_active:
+        record_auth_failure("inactive_user")
         raise HTTPException(status_code=400, detail="Inactive user")
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -0,0 +1,139 @@
+"""Batch router: several API calls in one round trip.
+
+``POST /api/batch`` runs each sub-request through the application in process,
+one after another, and returns their responses in order. Sub-requests share
+the batch's authenticated user and database session, so the whole batch
+costs one token check, one user lookup and one connection checkout. A
+read-only batch on PostgreSQL also runs in one ``REPEATABLE READ``
+transaction, so every response sees the same snapshot.
+
+Sub-requests are not atomic together: a write commits (or fails) on its own,
+as it would have as a separate call. A failing sub-request gets its status in
+its slot and does not stop the rest.
+
+Configuration (environment):
+    BATCH_MAX_REQUESTS   most sub-requests in one batch (default 20)
+"""
+
+import asyncio
+import logging
+import os
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_active_user, shared_user
+from app.database import get_db, shared_session
+from app.models import User
+from app.schemas import BatchMethod, BatchRequest, BatchSubRequest, BatchSubResponse
+from app.serialization import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+router = APIRouter(prefix="/api/batch", tags=["Batch"])
+
+
+def _check(sub: BatchSubRequest) -> None:
+    path = sub.path.partition("?")[0]
+    if not path.startswith("/api/") or path.startswith("/api/batch"):
+        raise HTTPException(status_code=400, detail=f"Unsupported batch path: {sub.path}")
+
+
+async def _dispatch(request: Request, sub: BatchSubRequest) -> dict:
+    """Run one sub-request through the application and collect its response."""
+    path, _, query = sub.path.partition("?")
+    body = orjson.dumps(sub.body) if sub.body is not None else b""
+    headers = [
+        (b"authorization", request.headers.get("authorization", "").encode("latin-1")),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method.value,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": {},
+    }
+    body_sent = False
+    never = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await never.wait()  # the client of a sub-request never disconnects
+
+    response = {"status": 500, "headers": {}}
+    chunks = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response_headers = response["headers"] = {}
+            for name, value in message.get("headers", []):
+                name, value = name.decode("latin-1"), value.decode("latin-1")
+                response_headers[name] = f"{response_headers[name]}, {value}" if name in response_headers else value
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:  # already answered with a 500 by the error middleware
+        logger.exception("Batch sub-request %s %s failed", sub.method.value, sub.path)
+
+    content = b"".join(chunks)
+    if not content:
+        response["body"] = None
+    elif response["headers"].get("content-type", "").startswith("application/json"):
+        response["body"] = orjson.loads(content)
+    else:
+        response["body"] = content.decode("utf-8", "replace")
+    return response
+
+
+def _begin_snapshot(db: Session) -> None:
+    # End the transaction of the user lookup so the snapshot covers every sub-request
+    db.commit()
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+@router.post("", response_model=list[BatchSubResponse])
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Run several API requests in one round trip and return their responses in order."""
+    if len(batch.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"A batch may hold at most {BATCH_MAX_REQUESTS} requests")
+    for sub in batch.requests:
+        _check(sub)
+
+    if all(sub.method == BatchMethod.GET for sub in batch.requests) and db.get_bind().dialect.name == "postgresql":
+        await asyncio.to_thread(_begin_snapshot, db)
+
+    user_token, session_token = shared_user.set(current_user), shared_session.set(db)
+    try:
+        responses = []
+        for sub in batch.requests:
+            responses.append(await _dispatch(request, sub))
+            if not db.is_active:  # a failed flush: reset the session for the next sub-request
+                await asyncio.to_thread(db.rollback)
+    finally:
+        shared_user.reset(user_token)
+        shared_session.reset(session_token)
+    return JSONResponse(responses)
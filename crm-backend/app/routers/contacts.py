@@ -1,20 +1,37 @@
 """Contacts CRUD router."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
-from app.models import Contact, Note, Activity, Deal, StageChange, User
+from app.models import Contact, Note, Activity, Deal, StageChange, User, soft_delete
 from app.schemas import (
     ContactCreate, ContactUpdate, ContactResponse,
     TimelineEvent, TimelineEventType, NoteResponse,
     ActivityResponse, StageChangeResponse, AssignOwner
 )
 from app.auth import get_current_active_user, check_permissions
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
+from app.includes import include_description, included_response, parse_includes
+from app.serialization import JSONResponse, row_dict, rows_response
 
 router = APIRouter(prefix="/api/contacts", tags=["Contacts"])
 
 
+def _check_email_available(db: Session, email: str):
+    """Emails stay unique across trashed contacts too, so a restore can never collide."""
+    existing = (
+        db.query(Contact)
+        .execution_options(include_deleted=True)
+        .filter(Contact.email == email)
+        .first()
+    )
+    if existing and existing.deleted_at is not None:
+        raise HTTPException(status_code=400, detail="A contact with this email is in the trash")
+    if existing:
+        raise HTTPException(status_code=400, detail="A contact with this email already exists")
+
+
 @router.post("/", response_model=ContactResponse, status_code=201)
 def create_contact(
     contact: ContactCreate, 
@@ -25,9 +42,7 @@ def create_contact(
     if not check_permissions(current_user, "contacts.create"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
-    existing = db.query(Contact).filter(Contact.email == contact.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="A contact with this email already exists")
+    _check_email_available(db, contact.email)
 
     # Fixed: exclude owner_id from model_dump to avoid multiple values error
     contact_data = contact.model_dump(exclude={"owner_id"})
@@ -41,17 +56,20 @@ def create_contact(
 
 @router.get("/", response_model=list[ContactResponse])
 def list_contacts(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     search: str = Query(None, description="Search by name, email, or company"),
+    include: str = Query(None, description=include_description("contact")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all contacts with optional search and pagination."""
     if not check_permissions(current_user, "contacts.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("contact", include, current_user)
 
-    query = db.query(Contact)
+    query = db.query(Contact).options(selectinload(Contact.account))
     if search:
         pattern = f"%{search}%"
         query = query.filter(
@@ -59,22 +77,38 @@ def list_contacts(
             | Contact.email.ilike(pattern)
             | Contact.company.ilike(pattern)
         )
-    return query.order_by(Contact.created_at.desc()).offset(skip).limit(limit).all()
+    contacts = query.order_by(Contact.created_at.desc()).offset(skip).limit(limit).all()
+    if includes:
+        return included_response(request, db, "contact", ContactResponse, contacts, includes)
+    etag = etag_for(contacts)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return rows_response(ContactResponse, contacts, headers=cache_headers(etag))
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 def get_contact(
     contact_id: int, 
+    request: Request,
+    response: Response,
+    include: str = Query(None, description=include_description("contact")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a single contact by ID."""
     if not check_permissions(current_user, "contacts.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("contact", include, current_user)
 
     contact = db.query(Contact).filter(Contact.id == contact_id).first()
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
+    if includes:
+        return included_response(request, db, "contact", ContactResponse, contact, includes)
+    etag = etag_for(contact)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return contact
 
 
@@ -97,9 +131,7 @@ def update_contact(
 
     # Check email uniqueness if email is being changed
     if "email" in update_data and update_data["email"] != contact.email:
-        existing = db.query(Contact).filter(Contact.email == update_data["email"]).first()
-        if existing:
-            raise HTTPException(status_code=400, detail="A contact with this email already exists")
+        _check_email_available(db, update_data["email"])
 
     for field, value in update_data.items():
         setattr(contact, field, value)
@@ -115,7 +147,7 @@ def delete_contact(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete a contact and all associated deals and activities."""
+    """Move a contact and its deals to the trash; the purge job removes them for good."""
     # Assuming delete permission is needed. Admin has '*', Sales Rep usually doesn't have delete in seed.
     # I'll check for 'contacts.delete' explicitly.
     # Note: Admin's '*' check in auth.py handles this if I require 'contacts.delete'.
@@ -126,7 +158,7 @@ def delete_contact(
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    db.delete(contact)
+    soft_delete(db, contact)
     db.commit()
 
 
@@ -192,7 +224,7 @@ def get_contact_timeline(
             "id": note.id,
             "type": TimelineEventType.note,
             "timestamp": note.created_at,
-            "data": NoteResponse.model_validate(note).model_dump()
+            "data": row_dict(NoteResponse, note)
         })
 
     # 2. Activities
@@ -202,7 +234,7 @@ def get_contact_timeline(
             "id": activity.id,
             "type": TimelineEventType.activity,
             "timestamp": activity.date,
-            "data": ActivityResponse.model_validate(activity).model_dump()
+            "data": row_dict(ActivityResponse, activity)
         })
 
     # 3. Stage Changes (via Deals)
@@ -215,10 +247,10 @@ def get_contact_timeline(
                 "id": change.id,
                 "type": TimelineEventType.stage_change,
                 "timestamp": change.changed_at,
-                "data": StageChangeResponse.model_validate(change).model_dump()
+                "data": row_dict(StageChangeResponse, change)
             })
 
     # Sort by timestamp descending
     events.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    return events
+
+    return JSONResponse(events)
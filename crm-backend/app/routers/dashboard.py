@@ -1,35 +1,105 @@
-"""Dashboard analytics router."""
+"""Dashboard analytics router.
 
-from fastapi import APIRouter, Depends
+Aggregates are served from the shared cache for ``DASHBOARD_CACHE_SECONDS``
+and dropped as soon as one of the tables they read is written. Concurrent
+identical requests share one computation (``app.coalesce``), so a burst of
+dashboard loads after a write runs the queries once.
+
+``GET /api/dashboard`` returns every widget (or a ``widgets=`` selection) in
+one response. That is one authentication and one connection checkout per
+page view instead of one per widget. Each widget shares its cache entry with
+its own endpoint.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
+from typing import Optional
 
 from app.database import get_db
 from app.models import Lead, Contact, Account, Deal, Activity, User
 from app.auth import get_current_active_user
+from app.cache import DASHBOARD_CACHE_SECONDS, cache
+from app.coalesce import coalesce
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+SUMMARY_TAGS = ("leads", "contacts", "accounts", "deals")
+
+
+def _cached_summary(db: Session) -> dict:
+    return cache.get_or_set("dashboard", "summary", lambda: _summary(db), ttl=DASHBOARD_CACHE_SECONDS, tags=SUMMARY_TAGS)
+
+
+def _cached_funnel(db: Session) -> list:
+    return cache.get_or_set("dashboard", "funnel", lambda: _funnel(db), ttl=DASHBOARD_CACHE_SECONDS, tags=("deals",))
+
+
+def _cached_activity_stats(db: Session) -> dict:
+    today = datetime.now()
+    return cache.get_or_set(
+        "dashboard", f"activity-stats:{today.date()}", lambda: _activity_stats(db, today),
+        # Trashing a parent hides its activities, so parent writes invalidate too
+        ttl=DASHBOARD_CACHE_SECONDS, tags=("activities", "contacts", "deals", "leads", "accounts"),
+    )
+
+
+# Widgets of the combined payload, in response order
+WIDGETS = {
+    "summary": _cached_summary,
+    "funnel": _cached_funnel,
+    "activity_stats": _cached_activity_stats,
+}
+
+
+@router.get("")
+@coalesce()
+def get_dashboard(
+    widgets: Optional[str] = Query(None, description="Comma-separated subset of summary, funnel, activity_stats"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get every dashboard widget (or the ``widgets`` selected) in one response."""
+    names = list(WIDGETS) if widgets is None else [name.strip() for name in widgets.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WIDGETS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown widgets: {', '.join(unknown)}" if unknown else "No widgets selected"
+        )
+    return {name: WIDGETS[name](db) for name in WIDGETS if name in names}
+
+
 @router.get("/summary")
+@coalesce()
 def get_summary(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Get high-level counts and totals."""
-    leads_count = db.query(Lead).count()
-    contacts_count = db.query(Contact).count()
-    accounts_count = db.query(Account).count()
-    deals_count = db.query(Deal).count()
-    
-    total_value = db.query(func.sum(Deal.value)).scalar() or 0
+    return _cached_summary(db)
+
+
+def _count(model):
+    return select(func.count(model.id)).scalar_subquery()
+
+
+def _summary(db: Session) -> dict:
+    # All counts and the pipeline total in one statement
+    totals = db.execute(select(
+        _count(Lead).label("leads"),
+        _count(Contact).label("contacts"),
+        _count(Account).label("accounts"),
+        _count(Deal).label("deals"),
+        select(func.sum(Deal.value)).scalar_subquery().label("total_value"),
+    )).one()
     
     # Recent deals
     recent_deals = db.query(Deal).order_by(Deal.created_at.desc()).limit(5).all()
     
     return {
-        "leads": leads_count,
-        "contacts": contacts_count,
-        "accounts": accounts_count,
-        "deals": deals_count,
-        "total_value": total_value,
+        "leads": totals.leads,
+        "contacts": totals.contacts,
+        "accounts": totals.accounts,
+        "deals": totals.deals,
+        "total_value": totals.total_value or 0,
         "recent_deals": [
             {"id": d.id, "title": d.title, "value": d.value, "stage": d.stage} 
             for d in recent_deals
@@ -37,8 +107,13 @@ def get_summary(db: Session = Depends(get_db), current_user: User = Depends(get_
     }
 
 @router.get("/funnel")
+@coalesce()
 def get_funnel(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Get deal distribution by stage."""
+    return _cached_funnel(db)
+
+
+def _funnel(db: Session) -> list:
     # Group deals by stage
     stats = db.query(
         Deal.stage,
@@ -55,25 +130,27 @@ def get_funnel(db: Session = Depends(get_db), current_user: User = Depends(get_c
     ]
 
 @router.get("/activity-stats")
+@coalesce()
 def get_activity_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
     """Get activity counts by type and recent trend."""
+    return _cached_activity_stats(db)
+
+
+def _activity_stats(db: Session, today: datetime) -> dict:
     # Type distribution
     type_stats = db.query(
         Activity.type,
         func.count(Activity.id).label("count")
     ).group_by(Activity.type).all()
     
-    # Last 7 days trend
-    today = datetime.now()
+    # Last 7 days trend, counted in one grouped query
     dates = [(today - timedelta(days=i)).date() for i in range(6, -1, -1)]
+    day = func.date(Activity.date)
+    per_day = db.query(day, func.count(Activity.id)).filter(day >= dates[0], day <= dates[-1]).group_by(day).all()
+    # SQLite returns the day as text, PostgreSQL as a date
+    counts = {str(d)[:10]: count for d, count in per_day}
     
-    trend = []
-    for d in dates:
-        count = db.query(Activity).filter(func.date(Activity.date) == d).count()
-        trend.append({
-            "date": d.strftime("%b %d"),
-            "count": count
-        })
+    trend = [{"date": d.strftime("%b %d"), "count": counts.get(d.isoformat(), 0)} for d in dates]
         
     return {
         "types": [{"type": s.type, "count": s.count} for s in type_stats],
@@ -2,19 +2,27 @@
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, insert, literal, update
+from sqlalchemy.orm import Session, selectinload
 
 from app.database import get_db
-from app.models import Deal, Contact, Pipeline, Stage, StageChange, Note, Activity, User, deal_contacts, DealLineItem, Product
+from app.models import (
+    Deal, Contact, Stage, StageChange, Note, Activity, User, deal_contacts, DealLineItem, Product,
+    soft_delete,
+)
 from app.schemas import (
     DealCreate, DealUpdate, DealResponse,
-    DealMove, StageChangeResponse, TimelineEvent, TimelineEventType,
+    DealMove, DealMoveBatch, DealStage, StageChangeResponse, TimelineEvent, TimelineEventType,
     NoteResponse, ActivityResponse, AssignOwner,
     DealContactAdd, DealContactResponse,
     DealLineItemCreate, DealLineItemUpdate, DealLineItemResponse,
 )
 from app.auth import get_current_active_user, check_permissions
+from app.cache import default_stage
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
+from app.includes import include_description, included_response, parse_includes
+from app.serialization import JSONResponse, row_dict, rows_response
 
 router = APIRouter(prefix="/api/deals", tags=["Deals"])
 
@@ -40,17 +48,12 @@ def create_deal(
 
     # Assign default pipeline/stage if not provided
     if not deal_data.get("pipeline_id") or not deal_data.get("stage_id"):
-        default_pipeline = db.query(Pipeline).filter(Pipeline.is_default == True).first()
-        # Fallback to first pipeline if no default
-        if not default_pipeline:
-            default_pipeline = db.query(Pipeline).order_by(Pipeline.id).first()
-        
-        if default_pipeline:
-            deal_data["pipeline_id"] = default_pipeline.id
-            if not deal_data.get("stage_id"):
-                first_stage = db.query(Stage).filter(Stage.pipeline_id == default_pipeline.id).order_by(Stage.order).first()
-                if first_stage:
-                    deal_data["stage_id"] = first_stage.id
+        # The default pipeline (or the first one) and its first stage
+        pipeline_id, stage_id = default_stage(db)
+        if pipeline_id:
+            deal_data["pipeline_id"] = pipeline_id
+            if not deal_data.get("stage_id") and stage_id:
+                deal_data["stage_id"] = stage_id
 
     db_deal = Deal(**deal_data, owner_id=current_user.id)
     db.add(db_deal)
@@ -61,41 +64,64 @@ def create_deal(
 
 @router.get("/", response_model=list[DealResponse])
 def list_deals(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     stage: str = Query(None, description="Filter by deal stage (enum or ID logic tbd)"),
     contact_id: int = Query(None, description="Filter by contact ID"),
     search: str = Query(None, description="Search by title"),
+    include: str = Query(None, description=include_description("deal")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all deals with optional filtering."""
     if not check_permissions(current_user, "deals.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("deal", include, current_user)
 
-    query = db.query(Deal).join(Contact, isouter=True)
+    query = (
+        db.query(Deal)
+        .join(Contact, isouter=True)
+        .options(selectinload(Deal.contact), selectinload(Deal.account), selectinload(Deal.stage_rel))
+    )
     if stage:
         query = query.filter(Deal.stage == stage)
     if contact_id:
         query = query.filter(Deal.contact_id == contact_id)
     if search:
         query = query.filter(Deal.title.ilike(f"%{search}%"))
-    return query.order_by(Deal.created_at.desc()).offset(skip).limit(limit).all()
+    deals = query.order_by(Deal.created_at.desc()).offset(skip).limit(limit).all()
+    if includes:
+        return included_response(request, db, "deal", DealResponse, deals, includes)
+    etag = etag_for(deals)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return rows_response(DealResponse, deals, headers=cache_headers(etag))
 
 
 @router.get("/{deal_id}", response_model=DealResponse)
 def get_deal(
     deal_id: int, 
+    request: Request,
+    response: Response,
+    include: str = Query(None, description=include_description("deal")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a single deal by ID."""
     if not check_permissions(current_user, "deals.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("deal", include, current_user)
 
     deal = db.query(Deal).filter(Deal.id == deal_id).first()
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
+    if includes:
+        return included_response(request, db, "deal", DealResponse, deal, includes)
+    etag = etag_for(deal)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return deal
 
 
@@ -140,7 +166,7 @@ def delete_deal(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete a deal."""
+    """Move a deal to the trash."""
     # Check for specific delete permission
     if not check_permissions(current_user, "deals.delete"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
@@ -149,8 +175,108 @@ def delete_deal(
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
 
-    db.delete(deal)
+    soft_delete(db, deal)
+    db.commit()
+
+
+# Default probabilities of the open legacy stages, for stages named otherwise
+_OPEN_STAGE_PROBABILITIES = {"prospecting": 10, "qualification": 25, "proposal": 50, "negotiation": 75}
+
+
+def _legacy_stage(stage) -> str:
+    """
+    Map a pipeline stage onto the legacy Deal.stage enum. A stage named after a
+    legacy value maps to it; any other stage maps by probability, 100 to
+    closed_won and otherwise to the open stage with the nearest default.
+    """
+    value = stage.name.strip().lower().replace(" ", "_")
+    if value in {s.value for s in DealStage}:
+        return value
+    if stage.probability >= 100:
+        return DealStage.closed_won.value
+    return min(_OPEN_STAGE_PROBABILITIES, key=lambda s: abs(_OPEN_STAGE_PROBABILITIES[s] - stage.probability))
+
+
+@router.post("/move:batch", status_code=200)
+def move_deals_batch(
+    payload: DealMoveBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Move many deals to new stages in one pass and record history for each.
+    Deals and stages are loaded with one query each, the deals are updated with a
+    single statement and the StageChange rows are bulk-inserted.
+    """
+    if not check_permissions(current_user, "deals.move"):
+        raise HTTPException(status_code=403, detail="Not enough privileges")
+
+    targets = {move.deal_id: move.stage_id for move in payload.moves}
+    if len(targets) != len(payload.moves):
+        raise HTTPException(status_code=422, detail="Each deal can only be moved once per batch")
+
+    current = {deal.id: deal for deal in db.query(Deal.id, Deal.stage_id, Deal.loss_reason).filter(Deal.id.in_(targets))}
+    current_stages = {deal_id: deal.stage_id for deal_id, deal in current.items()}
+    missing_deals = sorted(set(targets) - set(current_stages))
+    if missing_deals:
+        raise HTTPException(status_code=404, detail=f"Deals not found: {missing_deals}")
+
+    stages = {
+        stage.id: stage
+        for stage in db.query(Stage.id, Stage.pipeline_id, Stage.name, Stage.probability)
+        .filter(Stage.id.in_(set(targets.values()))).all()
+    }
+    missing_stages = sorted(set(targets.values()) - set(stages))
+    if missing_stages:
+        raise HTTPException(status_code=404, detail=f"Target stages not found: {missing_stages}")
+
+    # Require loss_reason when moving to closed_lost, as update_deal does
+    legacy = {deal_id: _legacy_stage(stages[stage_id]) for deal_id, stage_id in targets.items()}
+    reasons = {move.deal_id: move.loss_reason for move in payload.moves if move.loss_reason}
+    unexplained = sorted(
+        deal_id for deal_id, stage in legacy.items()
+        if stage == "closed_lost" and deal_id not in reasons and not current[deal_id].loss_reason
+    )
+    if unexplained:
+        raise HTTPException(
+            status_code=422, detail=f"loss_reason is required when stage is closed_lost: {unexplained}",
+        )
+
+    # Update all deals with one statement, keeping the legacy stage enum in step
+    stage_type = Deal.__table__.c.stage.type
+    values = {
+        "stage_id": case(targets, value=Deal.id),
+        "pipeline_id": case({deal_id: stages[stage_id].pipeline_id for deal_id, stage_id in targets.items()}, value=Deal.id),
+        "stage": case({deal_id: literal(stage, stage_type) for deal_id, stage in legacy.items()}, value=Deal.id),
+    }
+    if reasons:
+        values["loss_reason"] = case(reasons, value=Deal.id, else_=Deal.loss_reason)
+    db.execute(
+        update(Deal).where(Deal.id.in_(targets)).values(**values),
+        execution_options={"synchronize_session": False},
+    )
+
+    # Create History Records
+    now = datetime.now(timezone.utc)
+    db.execute(insert(StageChange), [
+        {
+            "deal_id": deal_id,
+            "from_stage_id": current_stages[deal_id],
+            "to_stage_id": stage_id,
+            "changed_at": now,
+            "changed_by": current_user.id,
+        }
+        for deal_id, stage_id in targets.items()
+    ])
+
     db.commit()
+    return {
+        "status": "moved",
+        "moved": [
+            {"deal_id": deal_id, "from_stage_id": current_stages[deal_id], "to_stage_id": stage_id}
+            for deal_id, stage_id in targets.items()
+        ],
+    }
 
 
 @router.post("/{deal_id}/move", status_code=200)
@@ -271,7 +397,7 @@ def get_deal_timeline(
             "id": note.id,
             "type": TimelineEventType.note,
             "timestamp": note.created_at,
-            "data": NoteResponse.model_validate(note).model_dump()
+            "data": row_dict(NoteResponse, note)
         })
 
     # 2. Activities (Directly linked to deal, added in Phase 5)
@@ -281,7 +407,7 @@ def get_deal_timeline(
             "id": activity.id,
             "type": TimelineEventType.activity,
             "timestamp": activity.date,
-            "data": ActivityResponse.model_validate(activity).model_dump()
+            "data": row_dict(ActivityResponse, activity)
         })
 
     # 3. Stage Changes
@@ -291,13 +417,13 @@ def get_deal_timeline(
             "id": change.id,
             "type": TimelineEventType.stage_change,
             "timestamp": change.changed_at,
-            "data": StageChangeResponse.model_validate(change).model_dump()
+            "data": row_dict(StageChangeResponse, change)
         })
 
     # Sort by timestamp descending
     events.sort(key=lambda x: x["timestamp"], reverse=True)
 
-    return events
+    return JSONResponse(events)
 
 
 # ── Deal Contacts ─────────────────────────────────────────────────────────────
@@ -393,7 +519,12 @@ def list_line_items(
     if not check_permissions(current_user, "deals.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
-    deal = db.query(Deal).filter(Deal.id == deal_id).first()
+    deal = (
+        db.query(Deal)
+        .options(selectinload(Deal.line_items).selectinload(DealLineItem.product))
+        .filter(Deal.id == deal_id)
+        .first()
+    )
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
 
@@ -0,0 +1,112 @@
+"""Admin-only diagnostics router."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app import memory
+from app.models import User
+from app.profiling import get_report, list_reports
+from app.auth import get_current_admin_user
+
+router = APIRouter(prefix="/api/debug", tags=["Debug"])
+
+
+@router.get("/profiles")
+def list_profiles(current_user: User = Depends(get_current_admin_user)):
+    """List stored request profiles, newest first (Admin only)."""
+    return list_reports()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|folded)$", description="'folded' for flamegraph tools"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get a stored request profile (Admin only)."""
+    report = get_report(profile_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse("\n".join(f"{s['stack']} {s['samples']}" for s in report["stacks"]) + "\n")
+    return report
+
+
+# ── Memory ───────────────────────────────────────────────────────────────────
+
+KEY_TYPE = Query("lineno", pattern="^(lineno|filename|traceback)$", description="How allocations are grouped")
+
+
+def _snapshot_or_404(snapshot_id: int):
+    snapshot = memory.get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return snapshot
+
+
+@router.get("/memory")
+def memory_status(current_user: User = Depends(get_current_admin_user)):
+    """Get the allocation tracing state (Admin only)."""
+    return memory.status()
+
+
+@router.post("/memory/start")
+def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="Stack frames kept per allocation"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Start tracing allocations (Admin only)."""
+    return memory.start(frames)
+
+
+@router.post("/memory/stop")
+def stop_memory_tracing(current_user: User = Depends(get_current_admin_user)):
+    """Stop tracing and discard snapshots and per-route data (Admin only)."""
+    return memory.stop()
+
+
+@router.post("/memory/snapshots", status_code=201)
+def take_memory_snapshot(current_user: User = Depends(get_current_admin_user)):
+    """Take an allocation snapshot (Admin only)."""
+    try:
+        return memory.take_snapshot()
+    except memory.TracingNotStarted:
+        raise HTTPException(status_code=409, detail="Memory tracing is not started")
+
+
+@router.get("/memory/snapshots")
+def list_memory_snapshots(current_user: User = Depends(get_current_admin_user)):
+    """List stored allocation snapshots (Admin only)."""
+    return memory.list_snapshots()
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+def get_memory_snapshot(
+    snapshot_id: int,
+    key_type: str = KEY_TYPE,
+    limit: int = Query(25, ge=1, le=500),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get the top allocation sites of a snapshot (Admin only)."""
+    return memory.top_allocations(_snapshot_or_404(snapshot_id), key_type, limit)
+
+
+@router.get("/memory/diff")
+def diff_memory_snapshots(
+    older: int = Query(..., alias="from"),
+    newer: int = Query(..., alias="to"),
+    key_type: str = KEY_TYPE,
+    limit: int = Query(25, ge=1, le=500),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Compare two snapshots, largest growth first (Admin only)."""
+    return memory.diff(_snapshot_or_404(older), _snapshot_or_404(newer), key_type, limit)
+
+
+@router.get("/memory/routes")
+def memory_by_route(
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get the top allocation sites per route from sampled requests (Admin only)."""
+    return memory.route_report(limit)
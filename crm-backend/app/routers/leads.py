@@ -2,18 +2,21 @@
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models import Lead, Contact, Account, Deal, User, Note, Activity
+from app.models import Lead, Contact, Account, Deal, User, Note, Activity, soft_delete
 from app.schemas import (
     LeadCreate, LeadUpdate, LeadResponse, LeadStatus,
     ContactCreate, AccountCreate, DealCreate, DealStage, LeadConvert, AssignOwner,
     TimelineEvent, TimelineEventType, NoteResponse, ActivityResponse
 )
 from app.auth import get_current_active_user, check_permissions
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
+from app.includes import include_description, included_response, parse_includes
+from app.serialization import JSONResponse, row_dict, rows_response
 
 router = APIRouter(prefix="/api/leads", tags=["Leads"])
 
@@ -58,16 +61,19 @@ def create_lead(
 
 @router.get("/", response_model=list[LeadResponse])
 def list_leads(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     status: LeadStatus = Query(None),
     search: str = Query(None, description="Search by name, email, or company"),
+    include: str = Query(None, description=include_description("lead")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all leads with optional filtering and search."""
     if not check_permissions(current_user, "leads.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("lead", include, current_user)
 
     query = db.query(Lead)
     
@@ -85,22 +91,38 @@ def list_leads(
             )
         )
         
-    return query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
+    leads = query.order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
+    if includes:
+        return included_response(request, db, "lead", LeadResponse, leads, includes)
+    etag = etag_for(leads)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    return rows_response(LeadResponse, leads, headers=cache_headers(etag))
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
 def get_lead(
     lead_id: int, 
+    request: Request,
+    response: Response,
+    include: str = Query(None, description=include_description("lead")),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a single lead by ID."""
     if not check_permissions(current_user, "leads.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
+    includes = parse_includes("lead", include, current_user)
 
     lead = db.query(Lead).filter(Lead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
+    if includes:
+        return included_response(request, db, "lead", LeadResponse, lead, includes)
+    etag = etag_for(lead)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return lead
 
 
@@ -150,7 +172,7 @@ def delete_lead(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete a lead."""
+    """Move a lead to the trash."""
     if not check_permissions(current_user, "leads.delete"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
@@ -158,7 +180,7 @@ def delete_lead(
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    db.delete(lead)
+    soft_delete(db, lead)
     db.commit()
 
 
@@ -320,7 +342,7 @@ def get_lead_timeline(
             "id": note.id,
             "type": TimelineEventType.note,
             "timestamp": note.created_at,
-            "data": NoteResponse.model_validate(note).model_dump()
+            "data": row_dict(NoteResponse, note)
         })
 
     # 2. Activities
@@ -330,10 +352,10 @@ def get_lead_timeline(
             "id": activity.id,
             "type": TimelineEventType.activity,
             "timestamp": activity.date,
-            "data": ActivityResponse.model_validate(activity).model_dump()
+            "data": row_dict(ActivityResponse, activity)
         })
 
     # Sort by timestamp descending
     events.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    return events
+
+    return JSONResponse(events)
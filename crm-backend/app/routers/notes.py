@@ -1,12 +1,13 @@
 """Notes CRUD router."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Note, User
 from app.schemas import NoteCreate, NoteUpdate, NoteResponse, RelatedToType
 from app.auth import get_current_active_user, check_permissions
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
 
 router = APIRouter(prefix="/api/notes", tags=["Notes"])
 
@@ -30,6 +31,8 @@ def create_note(
 
 @router.get("/", response_model=list[NoteResponse])
 def list_notes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     related_to_type: RelatedToType = Query(None, description="Filter by related entity type"),
@@ -48,12 +51,19 @@ def list_notes(
     if related_to_id:
         query = query.filter(Note.related_to_id == related_to_id)
 
-    return query.order_by(Note.created_at.desc()).offset(skip).limit(limit).all()
+    notes = query.order_by(Note.created_at.desc()).offset(skip).limit(limit).all()
+    etag = etag_for(notes)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
+    return notes
 
 
 @router.get("/{note_id}", response_model=NoteResponse)
 def get_note(
     note_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -64,6 +74,10 @@ def get_note(
     note = db.query(Note).filter(Note.id == note_id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
+    etag = etag_for(note)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return note
 
 
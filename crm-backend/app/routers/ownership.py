@@ -0,0 +1,67 @@
+"""Bulk ownership reassignment router."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Account, Contact, Deal, Lead, Note, User
+from app.schemas import OwnershipReassign, OwnershipReassignResponse
+from app.auth import get_current_admin_user
+
+router = APIRouter(prefix="/api/ownership", tags=["Ownership"])
+
+OWNED_MODELS = {
+    "contact": Contact,
+    "deal": Deal,
+    "lead": Lead,
+    "account": Account,
+}
+
+
+@router.post("/reassign", response_model=OwnershipReassignResponse)
+def reassign_owner(
+    payload: OwnershipReassign,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Move every record owned by one user to another (Admin only).
+    Runs one UPDATE per entity type plus one bulk insert of audit notes,
+    all in a single transaction.
+    """
+    if payload.from_user_id == payload.to_user_id:
+        raise HTTPException(status_code=400, detail="Source and target users must differ")
+
+    users = db.query(User.id).filter(User.id.in_([payload.from_user_id, payload.to_user_id])).all()
+    if len(users) != 2:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    content = f"Owner changed from {payload.from_user_id} to {payload.to_user_id} by {current_user.email}"
+    reassigned = {}
+    notes = []
+    for entity_type in dict.fromkeys(payload.entity_types):
+        model = OWNED_MODELS[entity_type.value]
+        ids = db.execute(
+            update(model)
+            .where(model.owner_id == payload.from_user_id)
+            .values(owner_id=payload.to_user_id)
+            .returning(model.id)
+        ).scalars().all()
+        reassigned[entity_type.value] = len(ids)
+        notes.extend(
+            {
+                "content": content,
+                "related_to_type": entity_type.value,
+                "related_to_id": record_id,
+                "created_by": current_user.id,
+            }
+            for record_id in ids
+        )
+
+    # Log the changes
+    if notes:
+        db.execute(insert(Note), notes)
+
+    db.commit()
+    return {"reassigned": reassigned}
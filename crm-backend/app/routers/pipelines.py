@@ -2,7 +2,8 @@
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import case, select, update
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -13,10 +14,18 @@ from app.schemas import (
     DealMove, StageChangeResponse
 )
 from app.auth import get_current_active_user, get_current_admin_user
+from app.cache import cached_pipelines, cached_stages, reference_cache
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
 
 router = APIRouter(prefix="/api/pipelines", tags=["Pipelines"])
 
 
+def _check_no_stage_history(db: Session, stage_ids) -> None:
+    """Deleting a stage that deals have moved into would drop their stage history."""
+    if db.query(StageChange.id).filter(StageChange.to_stage_id.in_(stage_ids)).first() is not None:
+        raise HTTPException(status_code=409, detail="Deals have moved into this stage; its stage history must be kept")
+
+
 # ── Pipelines CRUD ───────────────────────────────────────────────────────────
 
 
@@ -39,22 +48,31 @@ def create_pipeline(
     db_pipeline = Pipeline(**pipeline.model_dump())
     db.add(db_pipeline)
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(db_pipeline)
     return db_pipeline
 
 
 @router.get("/", response_model=list[PipelineResponse])
 def list_pipelines(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all pipelines."""
-    return db.query(Pipeline).order_by(Pipeline.name).all()
+    cached = cached_pipelines(db)
+    if not_modified(request, cached.etag):
+        return not_modified_response(cached.etag)
+    response.headers.update(cache_headers(cached.etag))
+    return cached.rows
 
 
 @router.get("/{pipeline_id}", response_model=PipelineResponse)
 def get_pipeline(
     pipeline_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -62,6 +80,10 @@ def get_pipeline(
     pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
     if not pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
+    etag = etag_for(pipeline)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return pipeline
 
 
@@ -86,6 +108,7 @@ def update_pipeline(
         setattr(pipeline, field, value)
 
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(pipeline)
     return pipeline
 
@@ -100,9 +123,11 @@ def delete_pipeline(
     pipeline = db.query(Pipeline).filter(Pipeline.id == pipeline_id).first()
     if not pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
-    
+    _check_no_stage_history(db, select(Stage.id).where(Stage.pipeline_id == pipeline_id))
+
     db.delete(pipeline)
     db.commit()
+    reference_cache.invalidate(db)
 
 
 # ── Stages CRUD ──────────────────────────────────────────────────────────────
@@ -123,6 +148,7 @@ def create_stage(
     db_stage = Stage(pipeline_id=pipeline_id, **stage.model_dump())
     db.add(db_stage)
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(db_stage)
     return db_stage
 
@@ -130,11 +156,17 @@ def create_stage(
 @router.get("/{pipeline_id}/stages/", response_model=list[StageResponse])
 def list_stages(
     pipeline_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List stages for a pipeline."""
-    return db.query(Stage).filter(Stage.pipeline_id == pipeline_id).order_by(Stage.order).all()
+    cached = cached_stages(db, pipeline_id)
+    if not_modified(request, cached.etag):
+        return not_modified_response(cached.etag)
+    response.headers.update(cache_headers(cached.etag))
+    return cached.rows
 
 
 @router.put("/{pipeline_id}/stages/reorder", status_code=204)
@@ -150,11 +182,23 @@ def reorder_stages(
     if not pipeline:
         raise HTTPException(status_code=404, detail="Pipeline not found")
 
-    # Update order
-    for index, stage_id in enumerate(reorder.stage_ids):
-        db.query(Stage).filter(Stage.id == stage_id, Stage.pipeline_id == pipeline_id).update({"order": index})
-    
+    # The submitted ids must be exactly this pipeline's stages
+    stage_ids = {row.id for row in db.query(Stage.id).filter(Stage.pipeline_id == pipeline_id).all()}
+    if len(reorder.stage_ids) != len(stage_ids) or set(reorder.stage_ids) != stage_ids:
+        raise HTTPException(status_code=400, detail="stage_ids must list every stage of the pipeline exactly once")
+
+    # Update order in a single statement so a reorder is never half-applied
+    if stage_ids:
+        new_order = {stage_id: index for index, stage_id in enumerate(reorder.stage_ids)}
+        db.execute(
+            update(Stage)
+            .where(Stage.pipeline_id == pipeline_id)
+            .values(order=case(new_order, value=Stage.id)),
+            execution_options={"synchronize_session": False},
+        )
+
     db.commit()
+    reference_cache.invalidate(db)
 
 
 @router.put("/{pipeline_id}/stages/{stage_id}", response_model=StageResponse)
@@ -175,6 +219,7 @@ def update_stage(
         setattr(stage, field, value)
 
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(stage)
     return stage
 
@@ -190,6 +235,8 @@ def delete_stage(
     stage = db.query(Stage).filter(Stage.id == stage_id, Stage.pipeline_id == pipeline_id).first()
     if not stage:
         raise HTTPException(status_code=404, detail="Stage not found")
+    _check_no_stage_history(db, [stage.id])
 
     db.delete(stage)
     db.commit()
+    reference_cache.invalidate(db)
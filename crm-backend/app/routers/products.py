@@ -1,18 +1,22 @@
 """Products CRUD router."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Product, User
 from app.schemas import ProductCreate, ProductUpdate, ProductResponse
 from app.auth import get_current_active_user, check_permissions
+from app.cache import cached_products, reference_cache
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
 
 @router.get("/", response_model=list[ProductResponse])
 def list_products(
+    request: Request,
+    response: Response,
     active_only: bool = Query(True, description="Return only active products"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -21,10 +25,11 @@ def list_products(
     if not check_permissions(current_user, "deals.read"):
         raise HTTPException(status_code=403, detail="Not enough privileges")
 
-    query = db.query(Product)
-    if active_only:
-        query = query.filter(Product.is_active == True)
-    return query.order_by(Product.name).all()
+    cached = cached_products(db, active_only)
+    if not_modified(request, cached.etag):
+        return not_modified_response(cached.etag)
+    response.headers.update(cache_headers(cached.etag))
+    return cached.rows
 
 
 @router.post("/", response_model=ProductResponse, status_code=201)
@@ -40,6 +45,7 @@ def create_product(
     db_product = Product(**product.model_dump())
     db.add(db_product)
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(db_product)
     return db_product
 
@@ -47,6 +53,8 @@ def create_product(
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
     product_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
@@ -57,6 +65,10 @@ def get_product(
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    etag = etag_for(product)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return product
 
 
@@ -79,6 +91,7 @@ def update_product(
         setattr(product, field, value)
 
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(product)
     return product
 
@@ -99,3 +112,4 @@ def delete_product(
 
     product.is_active = False
     db.commit()
+    reference_cache.invalidate(db)
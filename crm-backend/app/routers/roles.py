@@ -7,6 +7,7 @@ from app.database import get_db
 from app.models import Role, User
 from app.schemas import RoleCreate, RoleUpdate, RoleResponse
 from app.auth import get_current_admin_user
+from app.cache import reference_cache
 
 router = APIRouter(prefix="/api/roles", tags=["Roles"])
 
@@ -21,6 +22,7 @@ def create_role(role: RoleCreate, db: Session = Depends(get_db), current_user: U
     db_role = Role(**role.model_dump())
     db.add(db_role)
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(db_role)
     return db_role
 
@@ -62,6 +64,7 @@ def update_role(role_id: int, updates: RoleUpdate, db: Session = Depends(get_db)
         setattr(role, field, value)
 
     db.commit()
+    reference_cache.invalidate(db)
     db.refresh(role)
     return role
 
@@ -80,3 +83,4 @@ def delete_role(role_id: int, db: Session = Depends(get_db), current_user: User
 
     db.delete(role)
     db.commit()
+    reference_cache.invalidate(db)
@@ -1,4 +1,9 @@
-"""Global search router."""
+"""Global search router.
+
+Results back the search-as-you-type suggestions, so they are served from the
+shared cache for ``SEARCH_CACHE_SECONDS`` and dropped on writes to the
+searched tables.
+"""
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
@@ -7,16 +12,26 @@ from sqlalchemy import or_
 from app.database import get_db
 from app.models import Lead, Contact, Account, Deal, User
 from app.auth import get_current_active_user
+from app.cache import SEARCH_CACHE_SECONDS, cache
+from app.coalesce import coalesce
 
 router = APIRouter(prefix="/api/search", tags=["Search"])
 
 @router.get("/")
+@coalesce()
 def global_search(
     q: str = Query(..., min_length=1),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Search across multiple entities."""
+    return cache.get_or_set(
+        "search", q, lambda: _search(db, q), ttl=SEARCH_CACHE_SECONDS,
+        tags=("leads", "contacts", "accounts", "deals"),
+    )
+
+
+def _search(db: Session, q: str) -> list:
     search_term = f"%{q}%"
     
     results = []
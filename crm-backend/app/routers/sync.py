@@ -0,0 +1,162 @@
+"""Incremental delta-sync router.
+
+Changes are streamed in ``(timestamp, source, id)`` order across every synced
+entity type plus the ``deletions`` tombstone log. The continuation token is the
+position of the last change returned, so each call only touches rows that
+changed since the previous one (served by the ``updated_at`` indexes).
+
+Timestamps are set by the application before commit, so a transaction that
+stamped its rows before the token's position may only commit after the call
+that handed the token out. Once a client has caught up (``has_more`` false),
+its next call therefore re-reads the last ``SYNC_LAG_SECONDS`` before the
+token's position, then pages forward from there as usual. Changes in that
+window are delivered again; clients apply them keyed on ``(entity, id)``, which
+makes the repeats no-ops.
+
+Configuration (environment):
+    SYNC_LAG_SECONDS   overlap re-read once a client has caught up; keep it
+                       above the longest write transaction (default 60)
+"""
+
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+
+from app.database import get_db
+from app.models import Account, Contact, Deal, Deletion, Lead, Note, User
+from app.schemas import (
+    AccountResponse, ContactResponse, DealResponse, LeadResponse, NoteResponse,
+    SyncChangesResponse, SyncOperation,
+)
+from app.auth import get_current_active_user, check_permissions
+
+router = APIRouter(prefix="/api/sync", tags=["Sync"])
+
+SYNC_LAG_SECONDS = int(os.getenv("SYNC_LAG_SECONDS", "60"))
+
+TOMBSTONE_SOURCE = "tombstone"
+
+# entity -> (model, response schema, required permission, loader options)
+SYNC_ENTITIES = {
+    "account": (Account, AccountResponse, "accounts.read", []),
+    "contact": (Contact, ContactResponse, "contacts.read", [selectinload(Contact.account)]),
+    "deal": (
+        Deal, DealResponse, "deals.read",
+        [selectinload(Deal.contact), selectinload(Deal.account), selectinload(Deal.stage_rel)],
+    ),
+    "lead": (Lead, LeadResponse, "leads.read", []),
+    "note": (Note, NoteResponse, "notes.read", []),
+}
+
+
+def encode_token(timestamp: datetime, source: str, row_id: int, caught_up: bool = False) -> str:
+    raw = json.dumps([timestamp.isoformat(), source, row_id, caught_up]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str):
+    """Return ``((timestamp, source, id), caught_up)``, or ``(None, False)`` for an empty token.
+
+    Tokens issued before the overlap re-read have no ``caught_up`` flag and are
+    treated as caught up, so their next call re-reads the window too.
+    """
+    if not token:
+        return None, False
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, source, row_id, *rest = json.loads(base64.urlsafe_b64decode(padded))
+        caught_up = bool(rest[0]) if rest else True
+        return (datetime.fromisoformat(timestamp), str(source), int(row_id)), caught_up
+    except (ValueError, TypeError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def _after_cursor(ts_col, id_col, source: str, cursor):
+    """Filter for rows of ``source`` that sort strictly after ``cursor``."""
+    if cursor is None:
+        return ts_col.isnot(None)
+    cur_ts, cur_source, cur_id = cursor
+    if source > cur_source:
+        return ts_col >= cur_ts
+    if source < cur_source:
+        return ts_col > cur_ts
+    return or_(ts_col > cur_ts, and_(ts_col == cur_ts, id_col > cur_id))
+
+
+@router.get("/changes", response_model=SyncChangesResponse)
+def get_changes(
+    since: str = Query(None, description="Continuation token from the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Return records upserted or deleted since the given token, oldest first."""
+    cursor, caught_up = decode_token(since)
+    read_from = cursor
+    if cursor is not None and caught_up and SYNC_LAG_SECONDS:
+        # "" and 0 sort before every source and id, so this starts at the window's first row
+        read_from = (cursor[0] - timedelta(seconds=SYNC_LAG_SECONDS), "", 0)
+    readable = [
+        entity for entity, (_, _, permission, _) in SYNC_ENTITIES.items()
+        if check_permissions(current_user, permission)
+    ]
+
+    candidates = []
+    for entity in readable:
+        model, schema, _, options = SYNC_ENTITIES[entity]
+        rows = (
+            db.query(model)
+            .options(*options)
+            .filter(_after_cursor(model.updated_at, model.id, entity, read_from))
+            .order_by(model.updated_at, model.id)
+            .limit(limit + 1)
+            .all()
+        )
+        for row in rows:
+            candidates.append(((row.updated_at, entity, row.id), {
+                "entity": entity,
+                "op": SyncOperation.upsert,
+                "id": row.id,
+                "updated_at": row.updated_at,
+                "data": schema.model_validate(row).model_dump(),
+            }))
+
+    if readable:
+        tombstones = (
+            db.query(Deletion)
+            .filter(
+                Deletion.entity_type.in_(readable),
+                _after_cursor(Deletion.deleted_at, Deletion.id, TOMBSTONE_SOURCE, read_from),
+            )
+            .order_by(Deletion.deleted_at, Deletion.id)
+            .limit(limit + 1)
+            .all()
+        )
+        for tombstone in tombstones:
+            candidates.append(((tombstone.deleted_at, TOMBSTONE_SOURCE, tombstone.id), {
+                "entity": tombstone.entity_type,
+                "op": SyncOperation.delete,
+                "id": tombstone.entity_id,
+                "updated_at": tombstone.deleted_at,
+            }))
+
+    candidates.sort(key=lambda c: c[0])
+    page = candidates[:limit]
+    has_more = len(candidates) > limit
+
+    # Mid-window pages continue from their last change; once caught up, never move backwards
+    position = page[-1][0] if page else cursor
+    if not has_more and cursor is not None and cursor > position:
+        position = cursor
+    next_token = encode_token(*position, caught_up=not has_more) if position else ""
+
+    return {
+        "changes": [change for _, change in page],
+        "next_token": next_token,
+        "has_more": has_more,
+    }
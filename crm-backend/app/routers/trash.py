@@ -0,0 +1,91 @@
+"""Trash router: list, restore and permanently delete soft-deleted records."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Account, Contact, Deal, Lead, User, restore
+from app.purge import purge_rows
+from app.schemas import RelatedToType, TrashItem
+from app.auth import get_current_active_user, get_current_admin_user, check_permissions
+
+router = APIRouter(prefix="/api/trash", tags=["Trash"])
+
+# entity type -> (model, permission prefix, display name)
+TRASH_ENTITIES = {
+    RelatedToType.account: (Account, "accounts", lambda a: a.name),
+    RelatedToType.contact: (Contact, "contacts", lambda c: c.name),
+    RelatedToType.deal: (Deal, "deals", lambda d: d.title),
+    RelatedToType.lead: (Lead, "leads", lambda l: f"{l.first_name} {l.last_name}"),
+}
+
+
+def _trashed(db: Session, model):
+    return db.query(model).execution_options(include_deleted=True).filter(model.deleted_at.isnot(None))
+
+
+def _get_trashed_or_404(db: Session, entity_type: RelatedToType, entity_id: int):
+    model = TRASH_ENTITIES[entity_type][0]
+    obj = _trashed(db, model).filter(model.id == entity_id).first()
+    if not obj:
+        raise HTTPException(status_code=404, detail=f"{entity_type.value.title()} not found in trash")
+    return obj
+
+
+@router.get("/", response_model=list[TrashItem])
+def list_trash(
+    entity_type: RelatedToType = Query(None),
+    limit: int = Query(100, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List trashed records, most recently deleted first."""
+    if entity_type and not check_permissions(current_user, f"{TRASH_ENTITIES[entity_type][1]}.read"):
+        raise HTTPException(status_code=403, detail="Not enough privileges")
+
+    items = []
+    for kind in ([entity_type] if entity_type else list(TRASH_ENTITIES)):
+        model, prefix, display_name = TRASH_ENTITIES[kind]
+        if not check_permissions(current_user, f"{prefix}.read"):
+            continue
+        rows = _trashed(db, model).order_by(model.deleted_at.desc()).limit(limit).all()
+        items.extend(
+            {"entity_type": kind, "id": row.id, "name": display_name(row), "deleted_at": row.deleted_at}
+            for row in rows
+        )
+
+    items.sort(key=lambda item: item["deleted_at"], reverse=True)
+    return items[:limit]
+
+
+@router.post("/{entity_type}/{entity_id}/restore")
+def restore_from_trash(
+    entity_type: RelatedToType,
+    entity_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Restore a trashed record (a contact brings back the deals trashed with it)."""
+    if not check_permissions(current_user, f"{TRASH_ENTITIES[entity_type][1]}.delete"):
+        raise HTTPException(status_code=403, detail="Not enough privileges")
+
+    obj = _get_trashed_or_404(db, entity_type, entity_id)
+    if entity_type == RelatedToType.deal and not db.query(Contact.id).filter(Contact.id == obj.contact_id).first():
+        raise HTTPException(status_code=409, detail="Restore the deal's contact first")
+
+    restore(db, obj)
+    db.commit()
+    return {"status": "restored", "entity_type": entity_type, "id": entity_id}
+
+
+@router.delete("/{entity_type}/{entity_id}", status_code=204)
+def purge_from_trash(
+    entity_type: RelatedToType,
+    entity_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Permanently delete a trashed record without waiting for the purge job (Admin only)."""
+    obj = _get_trashed_or_404(db, entity_type, entity_id)
+    purge_rows(db, type(obj), [obj.id])
+    db.commit()
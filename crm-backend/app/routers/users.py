@@ -1,12 +1,13 @@
 """Users CRUD router."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User, Role
 from app.schemas import UserCreate, UserUpdate, UserResponse
 from app.auth import get_current_admin_user, get_password_hash, get_current_active_user
+from app.etags import cache_headers, etag_for, not_modified, not_modified_response
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -34,21 +35,32 @@ def create_user(user: UserCreate, db: Session = Depends(get_db), current_user: U
 
 @router.get("/", response_model=list[UserResponse])
 def list_users(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all users (Any active user can list for assignment)."""
-    return db.query(User).offset(skip).limit(limit).all()
+    users = db.query(User).offset(skip).limit(limit).all()
+    etag = etag_for(users)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
+    return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
+def get_user(user_id: int, request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
     """Get a user by ID (Admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    etag = etag_for(user)
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
     return user
 
 
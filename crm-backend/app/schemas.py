@@ -434,6 +434,16 @@ class StageChangeResponse(BaseModel):
 
 class DealMove(BaseModel):
     stage_id: int
+
+
+class DealMoveItem(BaseModel):
+    deal_id: int
+    stage_id: int
+    loss_reason: Optional[str] = Field(None, max_length=255)
+
+
+class DealMoveBatch(BaseModel):
+    moves: list[DealMoveItem] = Field(..., min_length=1, max_length=500)
 # ── Note Schemas ─────────────────────────────────────────────────────────────
 
 
@@ -566,3 +576,79 @@ class TokenData(BaseModel):
 
 class AssignOwner(BaseModel):
     user_id: int
+
+
+# ── Sync Schemas ─────────────────────────────────────────────────────────────
+
+
+class SyncOperation(str, Enum):
+    upsert = "upsert"
+    delete = "delete"
+
+
+class SyncChange(BaseModel):
+    entity: str
+    op: SyncOperation
+    id: int
+    updated_at: datetime
+    data: Optional[dict] = None  # Full object for upserts, omitted for tombstones
+
+
+class SyncChangesResponse(BaseModel):
+    changes: list[SyncChange]
+    next_token: str
+    has_more: bool
+
+
+# ── Ownership Schemas ────────────────────────────────────────────────────────
+
+
+class OwnershipReassign(BaseModel):
+    from_user_id: int
+    to_user_id: int
+    entity_types: list[RelatedToType] = Field(
+        default_factory=lambda: list(RelatedToType),
+        examples=[["contact", "deal"]],
+        description="Entity types to move (default: all)",
+    )
+
+
+class OwnershipReassignResponse(BaseModel):
+    reassigned: dict[str, int]
+
+
+# ── Trash Schemas ────────────────────────────────────────────────────────────
+
+
+class TrashItem(BaseModel):
+    entity_type: RelatedToType
+    id: int
+    name: str
+    deleted_at: datetime
+
+
+# ── Batch Schemas ────────────────────────────────────────────────────────────
+
+
+class BatchMethod(str, Enum):
+    GET = "GET"
+    POST = "POST"
+    PUT = "PUT"
+    PATCH = "PATCH"
+    DELETE = "DELETE"
+
+
+class BatchSubRequest(BaseModel):
+    method: BatchMethod = BatchMethod.GET
+    path: str = Field(..., examples=["/api/deals/1/line-items"], description="API path, with an optional query string")
+    body: Optional[object] = Field(None, description="JSON body for POST, PUT and PATCH")
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    headers: dict[str, str]
+    body: Optional[object] = None
@@ -0,0 +1,66 @@
+"""Fast-path JSON responses for read-heavy endpoints.
+
+A handler with ``response_model=list[XResponse]`` normally has FastAPI validate
+every returned ORM object against the schema (including ``EmailStr`` checks on
+each row) before dumping it. Rows loaded from our own database already satisfy
+the response schemas, so handlers can opt in to skipping that step:
+
+    return rows_response(DealResponse, query.all())
+
+The fields of the response schema are read straight from the ORM objects and
+encoded with orjson. The schema still documents the endpoint in OpenAPI, but
+is not enforced. Only opt in where the schema is flat (no nested models) and
+has no validators that reshape data on the way out.
+"""
+
+import typing
+from functools import lru_cache
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+_OPTIONS = orjson.OPT_UTC_Z
+
+
+class JSONResponse(Response):
+    """``application/json`` rendered with orjson (datetimes as ISO 8601, UTC as ``Z``)."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=_OPTIONS)
+
+
+def _is_float(annotation) -> bool:
+    return annotation is float or float in typing.get_args(annotation)
+
+
+@lru_cache(maxsize=None)
+def _plan(model: type[BaseModel]) -> tuple:
+    """(name, default, is_float) per field; required fields have no default."""
+    plan = []
+    for name, field in model.model_fields.items():
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel):
+            raise TypeError(f"{model.__name__}.{name} is a nested model; use response_model instead")
+        default = None if field.default is PydanticUndefined else field.default
+        plan.append((name, default, _is_float(field.annotation)))
+    return tuple(plan)
+
+
+def row_dict(model: type[BaseModel], row) -> dict:
+    """The fields of ``model`` read from an ORM object, without validation."""
+    plan = _plan(model)
+    data = {}
+    loaded = row.__dict__  # loaded column values; skips the instrumented descriptors
+    for name, default, is_float in plan:
+        value = loaded[name] if name in loaded else getattr(row, name, default)
+        if is_float and type(value) is int:
+            value = float(value)  # match pydantic's float output ("1.0", not "1")
+        data[name] = value
+    return data
+
+
+def rows_response(model: type[BaseModel], rows, headers: dict = None) -> JSONResponse:
+    return JSONResponse([row_dict(model, row) for row in rows], headers=headers)
@@ -0,0 +1,161 @@
+"""Slow request log with captured query plans.
+
+When a request takes longer than ``SLOW_REQUEST_MS`` it is logged as one JSON
+line: the route template, the shape of its parameters (names and types, never
+values), and every SQL statement with its duration. Statements slower than
+``SLOW_QUERY_MS`` also get their plan, captured after the response has been
+sent on a separate connection: ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on
+PostgreSQL, and ``EXPLAIN ANALYZE`` when ``ENVIRONMENT=staging``. Only SELECTs
+are explained, inside a transaction that is rolled back.
+
+Logging is sampled and rate-limited, and each statement shape is explained at
+most once per ``SLOW_LOG_EXPLAIN_TTL`` seconds, so it is safe to leave on in
+production.
+
+Configuration (environment):
+    SLOW_REQUEST_MS          log requests slower than this (default 1000; 0 disables)
+    SLOW_QUERY_MS            capture plans for statements slower than this (default 200)
+    SLOW_LOG_SAMPLE_RATE     fraction of slow requests logged (default 1.0)
+    SLOW_LOG_MAX_PER_MINUTE  log at most this many slow requests per minute (default 10)
+    SLOW_LOG_EXPLAIN_TTL     seconds before the same statement is explained again (default 600)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_LOG_SAMPLE_RATE = float(os.getenv("SLOW_LOG_SAMPLE_RATE", "1.0"))
+SLOW_LOG_MAX_PER_MINUTE = int(os.getenv("SLOW_LOG_MAX_PER_MINUTE", "10"))
+SLOW_LOG_EXPLAIN_TTL = float(os.getenv("SLOW_LOG_EXPLAIN_TTL", "600"))
+
+# At most this many plans are captured per logged request (slowest first)
+MAX_PLANS_PER_REQUEST = 3
+
+
+class _RateLimiter:
+    """Fixed one-minute window; cheap enough to consult on every slow request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._window = 0
+        self._count = 0
+
+    def allow(self, limit: int) -> bool:
+        window = int(time.monotonic() // 60)
+        with self._lock:
+            if window != self._window:
+                self._window, self._count = window, 0
+            if self._count >= limit:
+                return False
+            self._count += 1
+            return True
+
+
+_limiter = _RateLimiter()
+_explained = {}  # statement -> monotonic time of the last EXPLAIN
+
+
+def _type_name(value: str) -> str:
+    if value.lstrip("-").isdigit():
+        return "int"
+    if value.lower() in ("true", "false"):
+        return "bool"
+    return "str"
+
+
+def params_shape(scope) -> dict:
+    """Names and inferred types of the path and query parameters, without their values."""
+    query = {}
+    for pair in scope.get("query_string", b"").decode("latin-1").split("&"):
+        if not pair:
+            continue
+        name, _, value = pair.partition("=")
+        kind = _type_name(value)
+        query[name] = f"list[{kind}]" if name in query else kind
+    path = {name: _type_name(str(value)) for name, value in scope.get("path_params", {}).items()}
+    return {"path": path, "query": query}
+
+
+def _explain_prefix(dialect: str):
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    if dialect == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS) " if ENVIRONMENT == "staging" else "EXPLAIN "
+    return None
+
+
+def explain(engine, statement: str, parameters) -> list:
+    """Return the plan for a SELECT as a list of text lines (empty if it cannot be explained)."""
+    prefix = _explain_prefix(engine.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return []
+    with engine.connect() as conn:
+        try:
+            rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+        finally:
+            conn.rollback()
+    return [" | ".join(str(col) for col in row) for row in rows]
+
+
+def _should_explain(statement: str) -> bool:
+    now = time.monotonic()
+    last = _explained.get(statement)
+    if last is not None and now - last < SLOW_LOG_EXPLAIN_TTL:
+        return False
+    if len(_explained) > 1000:
+        _explained.clear()
+    _explained[statement] = now
+    return True
+
+
+def build_entry(scope, route: str, elapsed: float, stats) -> dict:
+    """Assemble the log entry, capturing plans for the slowest statements over the threshold."""
+    queries = [
+        {"sql": " ".join(statement.split()), "ms": round(duration * 1000, 2)}
+        for statement, _, duration, _ in stats.statements
+    ]
+    slow = sorted(
+        (i for i, (_, params, duration, engine) in enumerate(stats.statements)
+         if duration * 1000 >= SLOW_QUERY_MS and engine is not None and not isinstance(params, list)),
+        key=lambda i: stats.statements[i][2], reverse=True,
+    )
+    for i in slow[:MAX_PLANS_PER_REQUEST]:
+        statement, parameters, _, engine = stats.statements[i]
+        if not _should_explain(statement):
+            continue
+        try:
+            queries[i]["plan"] = explain(engine, statement, parameters)
+        except Exception as exc:  # a failed EXPLAIN must never break logging
+            queries[i]["plan_error"] = str(exc)
+
+    return {
+        "route": route,
+        "ms": round(elapsed * 1000, 1),
+        "params": params_shape(scope),
+        "query_count": stats.count,
+        "db_ms": round(stats.duration * 1000, 1),
+        "queries": queries,
+    }
+
+
+async def log_if_slow(scope, route: str, elapsed: float, stats) -> None:
+    """Log the request if it was slow, sampled and rate-limited; plans are captured off the event loop."""
+    if SLOW_REQUEST_MS <= 0 or elapsed * 1000 < SLOW_REQUEST_MS:
+        return
+    if random.random() >= SLOW_LOG_SAMPLE_RATE or not _limiter.allow(SLOW_LOG_MAX_PER_MINUTE):
+        return
+    try:
+        entry = await asyncio.to_thread(build_entry, scope, route, elapsed, stats)
+    except Exception:
+        logger.exception("Failed to build slow request log entry for %s", route)
+        return
+    logger.warning("Slow request %s", json.dumps(entry, default=str))
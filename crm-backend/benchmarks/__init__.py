@@ -0,0 +1 @@
+"""Performance benchmarks for the CRM backend (run from crm-backend/ with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,96 @@
+"""Benchmark: deleting an account with many activities.
+
+Compares the ``delete_account`` handler (database-level ON DELETE CASCADE) with
+the previous ORM cascade, which loaded every child row and deleted it one by one.
+
+Usage:
+    python -m benchmarks.bench_cascade_delete [--activities 50000] [--database-url URL]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Account, Activity, Contact, Note, Role, User
+from app.routers.accounts import delete_account
+
+
+def _populate(session, activities: int) -> tuple[int, User]:
+    role = Role(name="Admin", permissions=["*"])
+    admin = User(email="bench@crm.com", first_name="Bench", last_name="User", role=role)
+    account = Account(name="Big Account")
+    session.add_all([role, admin, account])
+    session.flush()
+    contact = Contact(name="Someone", email="someone@example.com", account_id=account.id)
+    session.add(contact)
+    session.flush()
+
+    batch = 10000
+    for start in range(0, activities, batch):
+        session.execute(insert(Activity), [
+            {"type": "call", "subject": f"Call {i}", "account_id": account.id, "contact_id": None}
+            for i in range(start, min(start + batch, activities))
+        ])
+    session.execute(insert(Note), [
+        {"content": f"Note {i}", "related_to_type": "account", "related_to_id": account.id}
+        for i in range(100)
+    ])
+    session.commit()
+    return account.id, admin
+
+
+def _delete_with_orm_cascade(session, account_id: int, admin: User) -> None:
+    """What ``cascade="all, delete-orphan"`` without passive deletes used to do."""
+    account = session.get(Account, account_id)
+    for activity in session.query(Activity).filter(Activity.account_id == account_id).all():
+        session.delete(activity)
+    session.delete(account)
+    session.commit()
+
+
+def _delete_with_handler(session, account_id: int, admin: User) -> None:
+    delete_account(account_id=account_id, db=session, current_user=admin)
+
+
+def run_case(database_url: str, activities: int, strategy) -> dict:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as session:
+        account_id, admin = _populate(session, activities)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        strategy(session, account_id, admin)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        remaining = session.query(Activity).count()
+    engine.dispose()
+    return {"seconds": round(elapsed, 3), "peak_mib": round(peak / 2**20, 1), "remaining_activities": remaining}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark account deletion with many activities")
+    parser.add_argument("--activities", type=int, default=50000)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(f"Deleting an account with {args.activities} activities")
+        for name, strategy in (("orm cascade", _delete_with_orm_cascade), ("db cascade", _delete_with_handler)):
+            result = run_case(url, args.activities, strategy)
+            print(f"  {name:<12} {result['seconds']:>8.3f}s  peak {result['peak_mib']:>7.1f} MiB  "
+                  f"remaining activities: {result['remaining_activities']}")
+
+
+if __name__ == "__main__":
+    main()
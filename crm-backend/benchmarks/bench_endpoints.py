@@ -0,0 +1,241 @@
+"""Benchmark suite: hot router functions against a fixed generated dataset.
+
+Each case calls a router function directly (no HTTP; handlers that build their
+own ``app.serialization`` response include serialization, the others do not) on
+the ``benchmarks.datagen`` profile ``BENCH_PROFILE`` and measures:
+
+* ``best_ms``: fastest of ``BENCH_ROUNDS`` runs after a warm-up (the minimum is
+  far less sensitive to a noisy machine than the median, which is also reported);
+* ``queries``: SQL statements executed, which is deterministic for a dataset;
+* ``peak_kb``: peak traced allocations during one extra run under tracemalloc.
+
+Results are compared with ``benchmarks/baseline.json``. A case fails when it
+issues more queries than the baseline, or when its peak memory exceeds the
+baseline by more than the tolerance (growth under ``BENCH_MEMORY_FLOOR_KB`` is
+ignored). Both are stable from run to run. Wall time is not: a slowdown beyond
+the tolerance and ``BENCH_TIME_FLOOR_MS`` is reported as a warning, and only
+fails the case with ``BENCH_FAIL_ON_TIME=1`` (for a quiet, dedicated machine). Every case runs in a transaction that is
+rolled back, so writes such as lead conversion can be repeated, and starts
+with an empty ``app.cache``, so cached handlers are measured on the miss path.
+
+Timings depend on the machine: regenerate the baseline on the machine that
+runs the suite, and commit it together with the change it reflects.
+
+Usage:
+    python -m pytest benchmarks/bench_endpoints.py -v
+    BENCH_UPDATE_BASELINE=1 python -m pytest benchmarks/bench_endpoints.py
+
+Configuration (environment):
+    BENCH_PROFILE            dataset profile (default small)
+    BENCH_ROUNDS             timed runs per case (default 10)
+    BENCH_TIME_TOLERANCE     allowed slowdown as a fraction (default 0.30)
+    BENCH_TIME_FLOOR_MS      slowdowns smaller than this are never reported (default 20)
+    BENCH_FAIL_ON_TIME       "1" fails cases on reported slowdowns instead of warning
+    BENCH_MEMORY_TOLERANCE   allowed peak-memory growth as a fraction (default 0.20)
+    BENCH_MEMORY_FLOOR_KB    peak-memory growth smaller than this is never a failure (default 64)
+    BENCH_UPDATE_BASELINE    "1" rewrites the baseline instead of comparing
+"""
+import contextlib
+import gc
+import inspect
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+from fastapi import Request, Response, params
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.cache import cache
+from app.models import Activity, Lead, StageChange, User
+from app.query_stats import count_queries
+from app.routers import accounts, activities, contacts, dashboard, deals, leads, search
+from benchmarks import datagen
+
+BENCH_PROFILE = os.getenv("BENCH_PROFILE", "small")
+BENCH_ROUNDS = int(os.getenv("BENCH_ROUNDS", "10"))
+BENCH_TIME_TOLERANCE = float(os.getenv("BENCH_TIME_TOLERANCE", "0.30"))
+BENCH_TIME_FLOOR_MS = float(os.getenv("BENCH_TIME_FLOOR_MS", "20"))
+BENCH_FAIL_ON_TIME = os.getenv("BENCH_FAIL_ON_TIME") == "1"
+BENCH_MEMORY_TOLERANCE = float(os.getenv("BENCH_MEMORY_TOLERANCE", "0.20"))
+BENCH_MEMORY_FLOOR_KB = float(os.getenv("BENCH_MEMORY_FLOOR_KB", "64"))
+BENCH_UPDATE_BASELINE = os.getenv("BENCH_UPDATE_BASELINE") == "1"
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+def call(function, **kwargs):
+    """Call a router function directly, resolving its ``Query(...)`` defaults and
+    passing a bare request (no conditional headers) where it asks for one."""
+    for name, parameter in inspect.signature(function).parameters.items():
+        if name in kwargs:
+            continue
+        if isinstance(parameter.default, params.Param):
+            kwargs[name] = parameter.default.default
+        elif parameter.annotation is Request:
+            kwargs[name] = Request({"type": "http", "method": "GET", "headers": []})
+        elif parameter.annotation is Response:
+            kwargs[name] = Response()
+    return function(**kwargs)
+
+
+# name -> function(db, user, ids); ids are picked from the dataset in ``dataset``
+CASES = {
+    "list_contacts": lambda db, user, ids: call(contacts.list_contacts, db=db, current_user=user),
+    "search_contacts": lambda db, user, ids: call(contacts.list_contacts, search="acme", db=db, current_user=user),
+    "get_contact_timeline": lambda db, user, ids: call(
+        contacts.get_contact_timeline, contact_id=ids["contact"], db=db, current_user=user),
+    "get_account_timeline": lambda db, user, ids: call(
+        accounts.get_account_timeline, account_id=ids["account"], db=db, current_user=user),
+    "list_deals": lambda db, user, ids: call(deals.list_deals, db=db, current_user=user),
+    "get_deal_timeline": lambda db, user, ids: call(
+        deals.get_deal_timeline, deal_id=ids["deal"], db=db, current_user=user),
+    "list_leads": lambda db, user, ids: call(leads.list_leads, db=db, current_user=user),
+    "convert_lead": lambda db, user, ids: call(leads.convert_lead, lead_id=ids["lead"], db=db, current_user=user),
+    "list_activities": lambda db, user, ids: call(
+        activities.list_activities, account_id=ids["account"], db=db, current_user=user),
+    "global_search": lambda db, user, ids: call(search.global_search, q="acme", db=db, current_user=user),
+    "get_dashboard": lambda db, user, ids: call(dashboard.get_dashboard, db=db, current_user=user),
+    "get_summary": lambda db, user, ids: call(dashboard.get_summary, db=db, current_user=user),
+    "get_funnel": lambda db, user, ids: call(dashboard.get_funnel, db=db, current_user=user),
+    "get_activity_stats": lambda db, user, ids: call(dashboard.get_activity_stats, db=db, current_user=user),
+}
+
+
+def _busiest(db, column):
+    """The id with the most rows in ``column``'s table; ties go to the lowest id."""
+    return db.execute(
+        select(column).where(column.isnot(None)).group_by(column)
+        .order_by(func.count().desc(), column).limit(1)
+    ).scalar_one()
+
+
+def _use_real_transactions(engine) -> None:
+    """pysqlite defers BEGIN until the first write, so a handler's commit would escape
+    the rolled-back outer transaction; take over transaction control instead."""
+
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        datagen.build(database_url, datagen.PROFILES[BENCH_PROFILE])
+        engine = create_engine(database_url)
+        _use_real_transactions(engine)
+        with Session(engine) as db:
+            ids = {
+                "contact": _busiest(db, Activity.contact_id),
+                "account": _busiest(db, Activity.account_id),
+                "deal": _busiest(db, StageChange.deal_id),
+                "lead": db.scalar(select(func.min(Lead.id)).where(Lead.status != "Converted")),
+            }
+            assert None not in ids.values(), "the benchmark profile is missing data"
+        yield engine, ids
+        engine.dispose()
+
+
+def _run(engine, case, ids, probe=contextlib.nullcontext) -> float:
+    """Run one case inside ``probe()`` in a transaction that is rolled back afterwards."""
+    cache.clear()
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            admin = db.scalar(select(User).where(User.email == "admin@crm.com"))
+            gc.collect()
+            with probe():
+                started = time.perf_counter()
+                case(db, admin, ids)
+                return time.perf_counter() - started
+        finally:
+            db.close()
+            transaction.rollback()
+
+
+def measure(engine, case, ids) -> dict:
+    _run(engine, case, ids)  # warm-up: connection pool, statement caches
+    timings = [_run(engine, case, ids) for _ in range(BENCH_ROUNDS)]
+    result = {
+        "best_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+    @contextlib.contextmanager
+    def queries():
+        with count_queries(engine) as stats:
+            yield
+        result["queries"] = stats.count
+
+    @contextlib.contextmanager
+    def allocations():
+        tracemalloc.start()
+        try:
+            yield
+            result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    _run(engine, case, ids, queries)
+    _run(engine, case, ids, allocations)
+    return result
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    stored = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results = {}
+    yield stored.get(BENCH_PROFILE, {}), results
+    if BENCH_UPDATE_BASELINE and results:
+        stored[BENCH_PROFILE] = {**stored.get(BENCH_PROFILE, {}), **results}
+        BASELINE_PATH.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+
+def slowdown(result: dict, expected: dict):
+    """A description of the slowdown if it is past both the tolerance and the floor, else None."""
+    slower = result["best_ms"] - expected["best_ms"]
+    if slower > expected["best_ms"] * BENCH_TIME_TOLERANCE and slower > BENCH_TIME_FLOOR_MS:
+        return f"time {expected['best_ms']} ms -> {result['best_ms']} ms"
+    return None
+
+
+def regressions(result: dict, expected: dict) -> list:
+    problems = []
+    if result["queries"] > expected["queries"]:
+        problems.append(f"queries {expected['queries']} -> {result['queries']}")
+    growth = result["peak_kb"] - expected["peak_kb"]
+    if growth > expected["peak_kb"] * BENCH_MEMORY_TOLERANCE and growth > BENCH_MEMORY_FLOOR_KB:
+        problems.append(f"peak memory {expected['peak_kb']} KiB -> {result['peak_kb']} KiB")
+    return problems
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_endpoint(name, dataset, baseline):
+    engine, ids = dataset
+    expected, results = baseline
+    result = measure(engine, CASES[name], ids)
+    results[name] = result
+    if BENCH_UPDATE_BASELINE:
+        return
+    if name not in expected:
+        pytest.skip(f"no baseline for {name}; run with BENCH_UPDATE_BASELINE=1")
+    problems = regressions(result, expected[name])
+    slower = slowdown(result, expected[name])
+    if slower and BENCH_FAIL_ON_TIME:
+        problems.append(slower)
+    elif slower:
+        warnings.warn(f"{name} is slower than the baseline: {slower}")
+    assert not problems, f"{name} regressed: " + "; ".join(problems)
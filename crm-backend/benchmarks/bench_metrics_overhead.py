@@ -0,0 +1,126 @@
+"""Benchmark: request overhead of the Prometheus instrumentation.
+
+Drives the full ASGI stack in-process (no sockets) against a temporary SQLite
+database, alternating between the app with and without the metrics middleware
+and query hooks, and compares median latency per endpoint and over the mix.
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead [--requests 2000] [--budget 2.0]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import metrics  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Contact, Role, User  # noqa: E402
+
+PATHS = ["/api/contacts/?limit=20", "/api/health"]
+
+
+def _seed() -> str:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        role = Role(name="Admin", permissions=["*"])
+        db.add_all([role, User(email="bench@crm.com", first_name="Bench", last_name="User", role=role)])
+        db.flush()
+        db.execute(insert(Contact), [{"name": f"Contact {i}", "email": f"c{i}@example.com"} for i in range(50)])
+        db.commit()
+    return create_access_token({"sub": "bench@crm.com"})
+
+
+def _build_stack(with_metrics: bool):
+    saved = app.user_middleware
+    if not with_metrics:
+        app.user_middleware = [m for m in saved if m.cls is not metrics.MetricsMiddleware]
+    try:
+        return app.build_middleware_stack()
+    finally:
+        app.user_middleware = saved
+
+
+async def _call(stack, path: str, token: str) -> None:
+    route, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": route, "raw_path": route.encode(), "root_path": "",
+        "query_string": query.encode(), "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "state": {},
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await stack(scope, receive, send)
+    assert status == 200, f"{path} returned {status}"
+
+
+async def _run(requests: int) -> dict:
+    token = _seed()
+    stacks = {True: _build_stack(True), False: _build_stack(False)}
+    timings = {(enabled, path): [] for enabled in stacks for path in PATHS}
+
+    for _ in range(50):  # warm up both stacks
+        for stack in stacks.values():
+            for path in PATHS:
+                await _call(stack, path, token)
+
+    for i in range(requests // len(PATHS)):
+        for path in PATHS:
+            # Alternate which side goes first so drift (GC, warm caches) hits both equally
+            for enabled in ((True, False) if i % 2 else (False, True)):
+                metrics.METRICS_ENABLED = enabled
+                started = time.perf_counter()
+                await _call(stacks[enabled], path, token)
+                timings[enabled, path].append(time.perf_counter() - started)
+    metrics.METRICS_ENABLED = True
+
+    result = {}
+    for path in PATHS:
+        on = statistics.median(timings[True, path])
+        off = statistics.median(timings[False, path])
+        result[path] = {"on_ms": on * 1000, "off_ms": off * 1000, "overhead_pct": (on - off) / off * 100}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure metrics instrumentation overhead")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--budget", type=float, default=2.0, help="Maximum acceptable overhead in percent")
+    args = parser.parse_args()
+
+    result = asyncio.run(_run(args.requests))
+    for path, stats in result.items():
+        print(f"  {path:<28} off {stats['off_ms']:.3f} ms  on {stats['on_ms']:.3f} ms  "
+              f"(+{(stats['on_ms'] - stats['off_ms']) * 1000:.0f} us, {stats['overhead_pct']:+.2f}%)")
+
+    # The budget applies to the request mix; a no-op endpoint like /api/health
+    # magnifies the fixed few-microsecond cost into a large percentage.
+    off = sum(stats["off_ms"] for stats in result.values())
+    on = sum(stats["on_ms"] for stats in result.values())
+    overhead = (on - off) / off * 100
+    print(f"  request mix overhead {overhead:+.2f}% (budget {args.budget}%): "
+          f"{'ok' if overhead <= args.budget else 'EXCEEDED'}")
+    sys.exit(0 if overhead <= args.budget else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark: serializing 100-row list pages and a timeline, response_model vs fast path.
+
+Loads pages from a generated ``tiny`` dataset in a temporary SQLite database,
+then times only the serialization of rows that are already loaded:
+
+* ``response_model``: FastAPI's own path for a ``response_model=list[X]`` route
+  (validate every ORM object against the schema, then dump to JSON bytes); for
+  the timeline, the previous ``model_validate(...).model_dump()`` per event
+  followed by validation against ``list[TimelineEvent]``;
+* ``fast path``: ``app.serialization`` (read the schema fields off the ORM
+  objects and encode with orjson).
+
+Usage:
+    python -m benchmarks.bench_serialization [--rounds 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from functools import lru_cache
+
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Account, Activity, Contact, Deal, Lead, StageChange
+from app.schemas import (
+    AccountResponse, ActivityResponse, ContactResponse, DealResponse, LeadResponse, StageChangeResponse,
+    TimelineEvent, TimelineEventType,
+)
+from app.serialization import JSONResponse, row_dict, rows_response
+from benchmarks import datagen
+
+PAGE = 100
+
+
+@lru_cache(maxsize=None)
+def _field(annotation):
+    return create_model_field(name="Response", type_=annotation, mode="serialization")
+
+
+def _response_model(annotation, content) -> bytes:
+    """What FastAPI's ``serialize_response`` does for a route with ``response_model=annotation``."""
+    field = _field(annotation)
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return field.serialize_json(value)
+
+
+def _load(db) -> dict:
+    deals = (
+        db.query(Deal)
+        .options(selectinload(Deal.contact), selectinload(Deal.account), selectinload(Deal.stage_rel))
+        .order_by(Deal.created_at.desc()).limit(PAGE).all()
+    )
+    return {
+        "accounts": (AccountResponse, db.query(Account).order_by(Account.created_at.desc()).limit(PAGE).all()),
+        "contacts": (ContactResponse, db.query(Contact).order_by(Contact.created_at.desc()).limit(PAGE).all()),
+        "deals": (DealResponse, deals),
+        "leads": (LeadResponse, db.query(Lead).order_by(Lead.created_at.desc()).limit(PAGE).all()),
+        "activities": (ActivityResponse, db.query(Activity).order_by(Activity.date.desc()).limit(PAGE).all()),
+    }
+
+
+def _timeline_rows(db) -> list:
+    half = PAGE // 2
+    activities = db.query(Activity).order_by(Activity.date.desc()).limit(half).all()
+    changes = db.query(StageChange).order_by(StageChange.changed_at.desc()).limit(half).all()
+    return [(TimelineEventType.activity, ActivityResponse, row, row.date) for row in activities] + [
+        (TimelineEventType.stage_change, StageChangeResponse, row, row.changed_at) for row in changes
+    ]
+
+
+def _timeline_response_model(rows) -> bytes:
+    events = [
+        {"id": row.id, "type": kind, "timestamp": at, "data": schema.model_validate(row).model_dump()}
+        for kind, schema, row, at in rows
+    ]
+    events.sort(key=lambda x: x["timestamp"], reverse=True)
+    return _response_model(list[TimelineEvent], events)
+
+
+def _timeline_fast(rows) -> bytes:
+    events = [
+        {"id": row.id, "type": kind, "timestamp": at, "data": row_dict(schema, row)}
+        for kind, schema, row, at in rows
+    ]
+    events.sort(key=lambda x: x["timestamp"], reverse=True)
+    return JSONResponse(events).body
+
+
+def _time(function, rounds: int) -> float:
+    function()  # warm-up: lazy loads, schema and adapter caches
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        datagen.build(database_url, datagen.PROFILES["tiny"])
+        engine = create_engine(database_url)
+        with Session(engine) as db:
+            cases = {
+                name: (lambda m=model, r=rows: _response_model(list[m], r), lambda m=model, r=rows: rows_response(m, r).body)
+                for name, (model, rows) in _load(db).items()
+            }
+            timeline = _timeline_rows(db)
+            cases["timeline"] = (lambda: _timeline_response_model(timeline), lambda: _timeline_fast(timeline))
+
+            print(f"{'page of ' + str(PAGE):<14} {'response_model':>16} {'fast path':>12} {'speedup':>9}")
+            for name, (slow, fast) in cases.items():
+                assert json.loads(slow()) == json.loads(fast()), f"{name}: outputs differ"
+                before, after = _time(slow, args.rounds), _time(fast, args.rounds)
+                print(f"{name:<14} {before:>13.3f} ms {after:>9.3f} ms {before / after:>8.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""Synthetic CRM datasets for performance work.
+
+Generates users, accounts, contacts, deals with their stage histories, leads
+and activities into an empty database, with distributions that look like a
+real tenant rather than uniform noise:
+
+* record ownership is Zipf-skewed, so a few reps own most of the book;
+* account size follows a power law; contacts, deals and activities cluster on
+  the same large accounts;
+* every deal has a stage history that mostly walks forward through the
+  pipeline, sometimes slips back, and stops at Won or Lost.
+
+Rows are written with bulk Core inserts (``COPY`` on PostgreSQL) with explicit
+ids, in batches, and everything is derived from ``--seed`` and a fixed anchor
+date, so the same arguments always produce the same database. Passwords are
+hashed once: every generated user logs in with ``password``, and
+``admin@crm.com`` with ``admin123``.
+
+Usage:
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --profile small
+    python -m benchmarks.datagen --database-url postgresql://... --profile large --seed 7
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --contacts 1000000 --activities 0
+"""
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+
+from app.auth import get_password_hash
+from app.database import Base
+from app.models import Account, Activity, Contact, Deal, Lead, Pipeline, Role, Stage, StageChange, User
+
+# Timestamps are spread over the two years before this date
+ANCHOR = datetime(2026, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+FIRST_NAMES = ["Alex", "Maria", "James", "Priya", "Chen", "Fatima", "Lucas", "Olga", "Noah", "Aisha",
+               "Tom", "Sofia", "Ravi", "Emma", "Kenji", "Laura", "Omar", "Ines", "David", "Zoe"]
+LAST_NAMES = ["Smith", "Garcia", "Kim", "Patel", "Nguyen", "Muller", "Rossi", "Novak", "Silva", "Cohen",
+              "Brown", "Tanaka", "Ali", "Dubois", "Jensen", "Lopez", "Khan", "Berg", "Walsh", "Costa"]
+COMPANY_WORDS = ["Acme", "Global", "North", "Tech", "Blue", "Summit", "Pioneer", "Vertex", "Harbor", "Atlas",
+                 "Nimbus", "Quantum", "Cedar", "Orbit", "Prime", "Silver", "Apex", "Delta", "Nova", "Iron"]
+COMPANY_SUFFIXES = ["Inc", "Ltd", "Group", "Labs", "Holdings", "Systems", "Partners", "Industries"]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Manufacturing", "Education", "Energy"]
+LEAD_SOURCES = ["Website", "Referral", "Event", "Cold Call", "Partner", "Advertisement"]
+
+# Pipeline stage name, probability and the legacy ``Deal.stage`` value it maps to
+STAGES = [
+    ("Prospecting", 10, "prospecting"),
+    ("Qualification", 25, "qualification"),
+    ("Proposal", 50, "proposal"),
+    ("Negotiation", 75, "negotiation"),
+    ("Won", 100, "closed_won"),
+    ("Lost", 0, "closed_lost"),
+]
+WON, LOST = 4, 5
+
+SALES_REP_PERMISSIONS = [
+    "contacts.read", "contacts.create", "contacts.update",
+    "deals.read", "deals.create", "deals.update", "deals.move",
+    "leads.read", "leads.create", "leads.update", "leads.convert",
+    "accounts.read", "accounts.create", "accounts.update",
+    "activities.read", "activities.create", "activities.update",
+    "notes.read", "notes.create", "notes.update",
+]
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Row counts per entity. ``stage_changes`` sets the mean history length; walks that
+    reach Won or Lost stop early, so the generated count comes out somewhat lower."""
+
+    users: int
+    accounts: int
+    contacts: int
+    deals: int
+    leads: int
+    activities: int
+    stage_changes: int
+
+
+PROFILES = {
+    "tiny": Profile(users=5, accounts=50, contacts=500, deals=300, leads=200, activities=3_000, stage_changes=1_200),
+    "small": Profile(users=50, accounts=1_000, contacts=10_000, deals=5_000, leads=5_000,
+                     activities=50_000, stage_changes=20_000),
+    "medium": Profile(users=1_000, accounts=20_000, contacts=1_000_000, deals=100_000, leads=100_000,
+                      activities=500_000, stage_changes=400_000),
+    "large": Profile(users=10_000, accounts=200_000, contacts=1_000_000, deals=2_000_000, leads=500_000,
+                     activities=5_000_000, stage_changes=20_000_000),
+}
+
+
+# ── Distributions ────────────────────────────────────────────────────────────
+
+
+class Sampler:
+    """Draws 1-based ids with fixed relative weights (bisect over cumulative weights)."""
+
+    def __init__(self, rng: random.Random, weights: list):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(weights))
+        self.total = self.cumulative[-1] if self.cumulative else 0
+
+    def __call__(self) -> int:
+        return bisect.bisect(self.cumulative, self.rng.random() * self.total) + 1
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def pareto_weights(rng: random.Random, n: int, alpha: float = 1.2) -> list:
+    return [rng.paretovariate(alpha) for _ in range(n)]
+
+
+def timestamp(rng: random.Random, after: datetime = None) -> datetime:
+    """A random moment in the span, later than ``after`` when given."""
+    start = ANCHOR - timedelta(seconds=SPAN_SECONDS)
+    if after is not None and after > start:
+        start = after
+    seconds = max(int((ANCHOR - start).total_seconds()), 1)
+    return start + timedelta(seconds=rng.randrange(seconds))
+
+
+def stage_walk(rng: random.Random, transitions: int) -> list:
+    """Stage indexes a deal passes through: mostly forward, sometimes back, ending at Won or Lost."""
+    path = [0]
+    for _ in range(max(transitions - 1, 0)):
+        current = path[-1]
+        if current in (WON, LOST):
+            break
+        roll = rng.random()
+        if current == 3 and roll < 0.5:
+            path.append(WON if rng.random() < 0.45 else LOST)
+        elif roll < 0.12:
+            path.append(LOST)
+        elif roll < 0.25 and current > 0:
+            path.append(current - 1)
+        else:
+            path.append(current + 1)
+    return path
+
+
+# ── Writing ──────────────────────────────────────────────────────────────────
+
+
+class BulkWriter:
+    """Buffers rows per table and writes them in batches, parents before children."""
+
+    def __init__(self, conn, batch_size: int, use_copy: bool):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.buffers = {}
+        self.counts = Counter()
+
+    def add(self, model, row: dict) -> None:
+        rows = self.buffers.setdefault(model.__table__, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for table in Base.metadata.sorted_tables:
+            rows = self.buffers.get(table)
+            if rows:
+                self._copy(table, rows) if self.use_copy else self.conn.execute(insert(table), rows)
+                self.counts[table.name] += len(rows)
+                rows.clear()
+
+    def _copy(self, table, rows: list) -> None:
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        cursor = self.conn.connection.dbapi_connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.close()
+
+
+def _reset_sequences(conn) -> None:
+    """Explicit ids bypass the PostgreSQL sequences; move them past the generated rows."""
+    for table in Base.metadata.sorted_tables:
+        if "id" in table.c and table.c.id.autoincrement:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+            ))
+
+
+# ── Generation ───────────────────────────────────────────────────────────────
+
+
+def _company(rng: random.Random) -> str:
+    return f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+
+
+def _person(rng: random.Random) -> tuple:
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def generate(conn, profile: Profile, seed: int = 42, batch_size: int = 10_000) -> Counter:
+    """Write ``profile`` into the empty schema behind ``conn``; returns row counts per table."""
+    rng = random.Random(seed)
+    use_copy = conn.dialect.name == "postgresql"
+    writer = BulkWriter(conn, batch_size, use_copy)
+
+    # Reference data is small and contains JSON, so it always goes through Core
+    origin = ANCHOR - timedelta(seconds=SPAN_SECONDS)
+    start = {"created_at": origin, "updated_at": origin}
+    conn.execute(insert(Role), [
+        {"id": 1, "name": "Admin", "permissions": ["*"], **start},
+        {"id": 2, "name": "Sales Rep", "permissions": SALES_REP_PERMISSIONS, **start},
+        {"id": 3, "name": "Viewer", "permissions": [p for p in SALES_REP_PERMISSIONS if p.endswith(".read")], **start},
+    ])
+    conn.execute(insert(Pipeline), [{"id": 1, "name": "Sales", "is_default": 1, **start}])
+    conn.execute(insert(Stage), [
+        {"id": i + 1, "pipeline_id": 1, "name": name, "order": i, "probability": probability, **start}
+        for i, (name, probability, _) in enumerate(STAGES)
+    ])
+
+    admin_hash, user_hash = get_password_hash("admin123"), get_password_hash("password")
+    for user_id in range(1, profile.users + 1):
+        first, last = _person(rng)
+        admin = user_id == 1
+        created = timestamp(rng)
+        writer.add(User, {
+            "id": user_id, "email": "admin@crm.com" if admin else f"user{user_id}@crm.example.com",
+            "first_name": first, "last_name": last, "password_hash": admin_hash if admin else user_hash,
+            "auth_provider": "local", "role_id": 1 if admin else 2, "is_active": True,
+            "created_at": created, "updated_at": created,
+        })
+    owner = Sampler(rng, zipf_weights(profile.users))
+    account_weights = pareto_weights(rng, profile.accounts)
+    pick_account = Sampler(rng, account_weights)
+
+    account_created = [None]
+    for account_id in range(1, profile.accounts + 1):
+        created = timestamp(rng)
+        account_created.append(created)
+        writer.add(Account, {
+            "id": account_id, "name": _company(rng), "industry": rng.choice(INDUSTRIES),
+            "account_type": rng.choice(["Prospect", "Customer", "Partner"]),
+            "annual_revenue": round(account_weights[account_id - 1] * 250_000, 2),
+            "employee_count": int(account_weights[account_id - 1] * 40),
+            "owner_id": owner(), "created_at": created, "updated_at": created,
+        })
+
+    contacts_by_account = [[] for _ in range(profile.accounts + 1)]
+    contact_account = [None]
+    for contact_id in range(1, profile.contacts + 1):
+        account_id = pick_account() if profile.accounts and rng.random() < 0.9 else None
+        if account_id:
+            contacts_by_account[account_id].append(contact_id)
+        contact_account.append(account_id)
+        first, last = _person(rng)
+        created = timestamp(rng, account_created[account_id] if account_id else None)
+        writer.add(Contact, {
+            "id": contact_id, "name": f"{first} {last}", "email": f"{first}.{last}.{contact_id}@example.com".lower(),
+            "phone": f"+1-555-{contact_id % 10_000:04d}", "company": _company(rng), "account_id": account_id,
+            "owner_id": owner(), "created_at": created, "updated_at": created,
+        })
+
+    deals_by_account = [[] for _ in range(profile.accounts + 1)]
+    change_id = 0
+    changes_per_deal = profile.stage_changes / profile.deals if profile.deals else 0
+    for deal_id in range(1, profile.deals + 1):
+        account_id = pick_account() if profile.accounts else None
+        candidates = contacts_by_account[account_id] if account_id else ()
+        contact_id = rng.choice(candidates) if candidates else rng.randint(1, profile.contacts)
+        account_id = contact_account[contact_id]
+        if account_id:
+            deals_by_account[account_id].append(deal_id)
+
+        created = timestamp(rng)
+        path = stage_walk(rng, round(rng.expovariate(1 / changes_per_deal)) if changes_per_deal else 0)
+        final = path[-1]
+        writer.add(Deal, {
+            "id": deal_id, "title": f"{_company(rng)} - {rng.choice(['Renewal', 'Expansion', 'New business'])}",
+            "value": round(rng.lognormvariate(9, 1.2), 2), "stage": STAGES[final][2],
+            "contact_id": contact_id, "account_id": account_id, "pipeline_id": 1, "stage_id": final + 1,
+            "owner_id": owner(), "created_at": created, "updated_at": created,
+        })
+        if changes_per_deal:
+            changed_at, previous = created, None
+            for stage_index in path:
+                change_id += 1
+                writer.add(StageChange, {
+                    "id": change_id, "deal_id": deal_id, "from_stage_id": previous, "to_stage_id": stage_index + 1,
+                    "changed_at": changed_at, "changed_by": owner(),
+                })
+                previous = stage_index + 1
+                changed_at = timestamp(rng, changed_at)
+
+    statuses = ["New"] * 4 + ["Contacted"] * 3 + ["Qualified"] * 2 + ["Dead"]
+    for lead_id in range(1, profile.leads + 1):
+        first, last = _person(rng)
+        created = timestamp(rng)
+        writer.add(Lead, {
+            "id": lead_id, "first_name": first, "last_name": last,
+            "email": f"{first}.{last}.lead{lead_id}@example.com".lower(), "company": _company(rng),
+            "status": rng.choice(statuses), "source": rng.choice(LEAD_SOURCES), "lead_score": rng.randint(0, 100),
+            "industry": rng.choice(INDUSTRIES), "owner_id": owner(), "created_at": created, "updated_at": created,
+        })
+
+    # Activity volume per account follows the same power law as account size
+    for activity_id in range(1, profile.activities + 1):
+        account_id = pick_account() if profile.accounts else None
+        contacts = contacts_by_account[account_id] if account_id else ()
+        deals = deals_by_account[account_id] if account_id else ()
+        kind = rng.choice(["call", "email", "email", "meeting", "task"])
+        when = timestamp(rng, account_created[account_id] if account_id else None)
+        writer.add(Activity, {
+            "id": activity_id, "type": kind, "subject": f"{kind.title()} #{activity_id}",
+            "date": when, "account_id": account_id,
+            "contact_id": rng.choice(contacts) if contacts else None,
+            "deal_id": rng.choice(deals) if deals and rng.random() < 0.6 else None,
+            "is_task": kind == "task", "assigned_to_id": owner(), "created_at": when,
+        })
+
+    writer.flush()
+    if use_copy:
+        _reset_sequences(conn)
+    return writer.counts
+
+
+def build(database_url: str, profile: Profile, seed: int = 42, batch_size: int = 10_000) -> Counter:
+    """Create the schema on an empty database and fill it."""
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    try:
+        with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            return generate(conn, profile, seed, batch_size)
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CRM dataset into an empty database")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    for field in fields(Profile):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=int, help=f"Override the profile's {field.name}")
+    args = parser.parse_args()
+
+    overrides = {f.name: getattr(args, f.name) for f in fields(Profile) if getattr(args, f.name) is not None}
+    profile = replace(PROFILES[args.profile], **overrides)
+    started = time.perf_counter()
+    counts = build(args.database_url, profile, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    for table, n in sorted(counts.items()):
+        print(f"  {table:<16} {n:>12,}")
+    print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
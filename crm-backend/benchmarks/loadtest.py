@@ -0,0 +1,328 @@
+"""Load test: replay weighted CRM scenarios against a running server.
+
+By default a local uvicorn instance is started on a fresh SQLite database
+filled by ``benchmarks.datagen``. Pass ``--base-url`` to target a server that is
+already running (the credentials must belong to a user allowed to create leads
+and move deals).
+
+Each virtual user repeatedly picks a scenario by weight and performs the
+requests the frontend makes for it; scenario choice is driven by ``--seed``, so
+two runs issue the same request sequence. The report has throughput, p50/p95/p99
+and error rates per endpoint and per scenario. It is written as JSON together with the
+git commit and the run configuration, and ``--compare`` prints the p95 change
+against an earlier report.
+
+Usage:
+    python -m benchmarks.loadtest [--concurrency 20] [--duration 60] [--output loadtest.json]
+    python -m benchmarks.loadtest --profile medium --database-url postgresql://...
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --email admin@crm.com --password admin123
+    python -m benchmarks.loadtest --compare main.json --output branch.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks import datagen
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+SEARCH_TERMS = ["acme", "global", "north", "smith", "tech"]
+
+
+# ── Local server ─────────────────────────────────────────────────────────────
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "PURGE_ENABLED": "false"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health").status_code == 200:
+                return process, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+
+
+class Recorder:
+    """Latencies and failures per endpoint (method + route template) and per scenario."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.scenarios = {}
+        self.recording = False
+
+    def add(self, table: dict, name: str, elapsed: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        entry = table.setdefault(name, {"latencies": [], "errors": 0})
+        entry["latencies"].append(elapsed)
+        if not ok:
+            entry["errors"] += 1
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, context: dict, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.context = context
+        self.rng = rng
+        self.ok = True
+
+    async def request(self, method: str, endpoint: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.add(self.recorder.endpoints, f"{method} {endpoint}", time.perf_counter() - started, ok)
+        self.ok = self.ok and ok
+        return response
+
+    async def dashboard_open(self):
+        await self.request("GET", "/api/dashboard", "/api/dashboard")
+
+    async def kanban_board(self):
+        await self.request("GET", "/api/pipelines/", "/api/pipelines/")
+        pipeline_id = self.context["pipeline_id"]
+        await asyncio.gather(
+            self.request("GET", "/api/pipelines/{pipeline_id}/stages/", f"/api/pipelines/{pipeline_id}/stages/"),
+            self.request("GET", "/api/deals/", "/api/deals/"),
+        )
+
+    async def deal_detail(self):
+        deal_id = self.rng.choice(self.context["deal_ids"])
+        await self.request("GET", "/api/deals/{deal_id}", f"/api/deals/{deal_id}")
+        await asyncio.gather(
+            self.request("GET", "/api/deals/{deal_id}/timeline", f"/api/deals/{deal_id}/timeline"),
+            self.request("GET", "/api/deals/{deal_id}/contacts", f"/api/deals/{deal_id}/contacts"),
+            self.request("GET", "/api/deals/{deal_id}/line-items", f"/api/deals/{deal_id}/line-items"),
+        )
+
+    async def search_typing(self):
+        # The search box fires on each keystroke after the first two characters
+        term = self.rng.choice(SEARCH_TERMS)
+        for end in range(2, len(term) + 1):
+            await self.request("GET", "/api/search/", "/api/search/", params={"q": term[:end]})
+
+    async def lead_creation(self):
+        n = self.rng.getrandbits(48)
+        await self.request("POST", "/api/leads/", "/api/leads/", json={
+            "first_name": "Load", "last_name": f"Lead {n}", "email": f"lead{n}@loadtest.example.com",
+            "company": self.rng.choice(SEARCH_TERMS).title(), "source": "Website",
+        })
+
+    async def stage_move(self):
+        deal_id = self.rng.choice(self.context["deal_ids"])
+        stage_id = self.rng.choice(self.context["stage_ids"])
+        await self.request("POST", "/api/deals/{deal_id}/move", f"/api/deals/{deal_id}/move", json={"stage_id": stage_id})
+
+
+# Roughly the mix seen in production: mostly reads, one write in five
+SCENARIOS = {
+    "dashboard_open": 20,
+    "kanban_board": 20,
+    "deal_detail": 25,
+    "search_typing": 15,
+    "lead_creation": 10,
+    "stage_move": 10,
+}
+
+
+async def _user_loop(user: VirtualUser, stop_at: float, think: float) -> None:
+    names, weights = list(SCENARIOS), list(SCENARIOS.values())
+    while time.monotonic() < stop_at:
+        name = user.rng.choices(names, weights)[0]
+        user.ok = True
+        started = time.perf_counter()
+        await getattr(user, name)()
+        user.recorder.add(user.recorder.scenarios, name, time.perf_counter() - started, user.ok)
+        if think:
+            await asyncio.sleep(user.rng.expovariate(1 / think))
+
+
+async def _discover(client: httpx.AsyncClient) -> dict:
+    pipelines = (await client.get("/api/pipelines/")).raise_for_status().json()
+    pipeline = next((p for p in pipelines if p.get("is_default")), pipelines[0])
+    stages = (await client.get(f"/api/pipelines/{pipeline['id']}/stages/")).raise_for_status().json()
+    deals = (await client.get("/api/deals/", params={"limit": 100})).raise_for_status().json()
+    if not stages or not deals:
+        raise RuntimeError("The target needs a pipeline with stages and at least one deal")
+    return {
+        "pipeline_id": pipeline["id"],
+        "stage_ids": [s["id"] for s in stages],
+        "deal_ids": [d["id"] for d in deals],
+    }
+
+
+async def run(base_url: str, email: str, password: str, concurrency: int, duration: float,
+              warmup: float, think: float, seed_value: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency * 3)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        login = await client.post("/api/auth/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        context = await _discover(client)
+
+        recorder = Recorder()
+        users = [VirtualUser(client, recorder, context, random.Random(seed_value * 1000 + i))
+                 for i in range(concurrency)]
+        loop = asyncio.get_running_loop()
+        # Warm-up requests run the same loop but are not recorded
+        loop.call_later(warmup, setattr, recorder, "recording", True)
+        started = time.monotonic() + warmup
+        await asyncio.gather(*(_user_loop(user, started + duration, think) for user in users))
+        elapsed = time.monotonic() - started
+    return {"elapsed": elapsed, "endpoints": recorder.endpoints, "scenarios": recorder.scenarios}
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(table: dict, elapsed: float) -> dict:
+    summary = {}
+    for name, entry in sorted(table.items()):
+        latencies = sorted(entry["latencies"])
+        summary[name] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "error_rate": round(entry["errors"] / len(latencies), 4) if latencies else 0.0,
+        }
+    return summary
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def build_report(result: dict, config: dict) -> dict:
+    endpoints = summarize(result["endpoints"], result["elapsed"])
+    total = sum(e["requests"] for e in endpoints.values())
+    errors = sum(result["endpoints"][name]["errors"] for name in endpoints)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git": {"commit": _git("rev-parse", "HEAD"), "branch": _git("rev-parse", "--abbrev-ref", "HEAD")},
+        "python": platform.python_version(),
+        "config": config,
+        "elapsed_s": round(result["elapsed"], 2),
+        "total": {
+            "requests": total,
+            "throughput_rps": round(total / result["elapsed"], 2),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+        },
+        "endpoints": endpoints,
+        "scenarios": summarize(result["scenarios"], result["elapsed"]),
+    }
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    total = report["total"]
+    print(f"{total['requests']} requests in {report['elapsed_s']}s: "
+          f"{total['throughput_rps']} req/s, {total['error_rate']:.2%} errors")
+    for section in ("scenarios", "endpoints"):
+        print(f"\n  {section:<44} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+        for name, stats in report[section].items():
+            line = (f"  {name:<44} {stats['throughput_rps']:>8} {stats['p50_ms']:>8} "
+                    f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['error_rate']:>7.2%}")
+            before = (baseline or {}).get(section, {}).get(name)
+            if before and before["p95_ms"]:
+                line += f"  p95 {(stats['p95_ms'] - before['p95_ms']) / before['p95_ms']:+.1%}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay weighted CRM scenarios and report latency percentiles")
+    parser.add_argument("--base-url", help="Target an already running server instead of starting one")
+    parser.add_argument("--email", default="admin@crm.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unrecorded seconds before measuring")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between scenarios per user")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--profile", choices=sorted(datagen.PROFILES), default="small", help="Dataset for the local server")
+    parser.add_argument("--database-url", help="Generate into and serve this (empty) database instead of a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest.json")
+    parser.add_argument("--compare", help="Earlier report to compare p95 latencies against")
+    args = parser.parse_args()
+
+    process, tmp = None, None
+    base_url = args.base_url
+    if base_url is None:
+        database_url = args.database_url
+        if database_url is None:
+            tmp = tempfile.TemporaryDirectory()
+            database_url = f"sqlite:///{os.path.join(tmp.name, 'loadtest.db')}"
+        datagen.build(database_url, datagen.PROFILES[args.profile], args.seed)
+        process, base_url = start_server(database_url, args.workers)
+
+    try:
+        result = asyncio.run(run(
+            base_url, args.email, args.password, args.concurrency, args.duration,
+            args.warmup, args.think_ms / 1000, args.seed,
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if tmp is not None:
+            tmp.cleanup()
+
+    config = {key: value for key, value in vars(args).items() if key not in ("password", "output", "compare")}
+    report = build_report(result, config)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
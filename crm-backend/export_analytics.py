@@ -0,0 +1,34 @@
+"""Export the CRM dataset to date-partitioned Parquet/Arrow files for analytics.
+
+Usage:
+    python export_analytics.py --out ./exports            # incremental run
+    python export_analytics.py --out ./exports --full     # ignore watermarks
+    python export_analytics.py --out ./exports --tables deals stage_changes --format arrow
+"""
+import argparse
+
+from app.database import engine
+from app.export import EXPORT_LAG_SECONDS, EXPORT_TABLES, FORMATS, run_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES), help="Tables to export (default: all)")
+    parser.add_argument("--format", dest="fmt", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--full", action="store_true", help="Rescan everything instead of exporting past the last watermark")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--lag-seconds", type=int, default=EXPORT_LAG_SECONDS,
+                        help="Re-read this window before the last watermark to catch late commits")
+    args = parser.parse_args()
+
+    summary = run_export(
+        engine, args.out, tables=args.tables, fmt=args.fmt,
+        full=args.full, batch_size=args.batch_size, lag_seconds=args.lag_seconds,
+    )
+    for name, stats in summary.items():
+        print(f"  {name}: {stats['rows']} rows, {len(stats['files'])} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""P2 performance migration — adds tables and indexes to an existing database.
+
+Works against both SQLite and PostgreSQL through the configured DATABASE_URL.
+New tables are created by ``Base.metadata.create_all``; this script covers the
+indexes, columns and ``ON DELETE`` rules that ``create_all`` does not add to
+existing tables. SQLite cannot alter constraints, so tables whose rules changed
+are rebuilt there (new table, copy rows, drop, rename) with foreign keys off.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+
+from app.database import engine, Base
+from app.models import SOFT_DELETE_MODELS
+
+INDEXES = [
+    # Delta sync scans by updated_at
+    ("ix_accounts_updated_at", "accounts", "updated_at"),
+    ("ix_contacts_updated_at", "contacts", "updated_at"),
+    ("ix_deals_updated_at", "deals", "updated_at"),
+    ("ix_leads_updated_at", "leads", "updated_at"),
+    ("ix_notes_updated_at", "notes", "updated_at"),
+    # Analytics export watermark
+    ("ix_activities_updated_at", "activities", "updated_at"),
+    # Foreign keys followed by ON DELETE CASCADE / SET NULL
+    ("ix_contacts_account_id", "contacts", "account_id"),
+    ("ix_deals_contact_id", "deals", "contact_id"),
+    ("ix_deals_account_id", "deals", "account_id"),
+    ("ix_activities_contact_id", "activities", "contact_id"),
+    ("ix_activities_deal_id", "activities", "deal_id"),
+    ("ix_activities_lead_id", "activities", "lead_id"),
+    ("ix_activities_account_id", "activities", "account_id"),
+    ("ix_stage_changes_deal_id", "stage_changes", "deal_id"),
+    ("ix_deal_line_items_deal_id", "deal_line_items", "deal_id"),
+    ("ix_accounts_owner_id", "accounts", "owner_id"),
+    ("ix_contacts_owner_id", "contacts", "owner_id"),
+    ("ix_deals_owner_id", "deals", "owner_id"),
+    ("ix_leads_owner_id", "leads", "owner_id"),
+    ("ix_deals_pipeline_id", "deals", "pipeline_id"),
+    ("ix_deals_stage_id", "deals", "stage_id"),
+    ("ix_activities_assigned_to_id", "activities", "assigned_to_id"),
+    ("ix_stage_changes_from_stage_id", "stage_changes", "from_stage_id"),
+    ("ix_stage_changes_to_stage_id", "stage_changes", "to_stage_id"),
+]
+
+
+def _rebuild_sqlite_table(conn, table):
+    """SQLite cannot alter constraints: recreate ``table`` from the model and copy its rows over."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    columns = ", ".join(c.name for c in table.columns if c.name in existing)
+    staging = f"{table.name}__migrate"
+    ddl = str(CreateTable(table).compile(conn)).strip()
+    conn.execute(text(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {staging} ", 1)))
+    conn.execute(text(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def migrate_foreign_keys(conn):
+    """
+    Bring existing foreign keys in line with the ON DELETE rules declared on the
+    models. SQLite tables are rebuilt, so run this with ``PRAGMA foreign_keys=OFF``.
+    """
+    inspector = inspect(conn)
+    rebuild = []
+    for table in Base.metadata.sorted_tables:
+        existing = inspector.get_foreign_keys(table.name)
+        for fk in table.foreign_key_constraints:
+            if not fk.ondelete:
+                continue
+            columns = [c.name for c in fk.columns]
+            current = next((e for e in existing if e["constrained_columns"] == columns), None)
+            if current is None or (current["options"].get("ondelete") or "").upper() == fk.ondelete:
+                continue
+
+            print(f"  + {table.name}({', '.join(columns)}) ON DELETE {fk.ondelete}")
+            if conn.dialect.name != "postgresql":
+                if table not in rebuild:
+                    rebuild.append(table)
+                continue
+
+            ref_table = fk.elements[0].column.table.name
+            ref_columns = ", ".join(e.column.name for e in fk.elements)
+            conn.execute(text(
+                f'ALTER TABLE {table.name} DROP CONSTRAINT "{current["name"]}", '
+                f'ADD CONSTRAINT "{current["name"]}" FOREIGN KEY ({", ".join(columns)}) '
+                f"REFERENCES {ref_table} ({ref_columns}) ON DELETE {fk.ondelete}"
+            ))
+
+    for table in rebuild:
+        _rebuild_sqlite_table(conn, table)
+        print(f"  + rebuilt table {table.name}")
+
+
+def add_soft_delete_columns(conn):
+    """Add ``deleted_at`` and its partial indexes to tables created before soft delete."""
+    inspector = inspect(conn)
+    for model in SOFT_DELETE_MODELS:
+        table = model.__table__
+        if "deleted_at" not in {c["name"] for c in inspector.get_columns(table.name)}:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN deleted_at TIMESTAMP"))
+            print(f"  + column {table.name}.deleted_at")
+        for index in table.indexes:
+            if "deleted_at" in index.name or "_live_" in index.name:
+                index.create(conn, checkfirst=True)
+                print(f"  + index {index.name}")
+
+
+def add_activity_updated_at(conn):
+    """Add ``activities.updated_at``, backfilled from ``created_at`` (the export's old watermark)."""
+    if "updated_at" not in {c["name"] for c in inspect(conn).get_columns("activities")}:
+        conn.execute(text("ALTER TABLE activities ADD COLUMN updated_at TIMESTAMP"))
+        conn.execute(text("UPDATE activities SET updated_at = created_at"))
+        print("  + column activities.updated_at")
+
+
+def run(bind=engine):
+    Base.metadata.create_all(bind=bind)
+
+    sqlite = bind.dialect.name == "sqlite"
+    with bind.connect() as conn:
+        if sqlite:
+            # Table rebuilds must not trip (or cascade through) the constraints they replace
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.commit()
+
+        with conn.begin():
+            add_soft_delete_columns(conn)
+            add_activity_updated_at(conn)
+            migrate_foreign_keys(conn)
+
+            for name, table, columns in INDEXES:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+                print(f"  + index {name}")
+
+        if sqlite:
+            for table, _, parent, _ in conn.exec_driver_sql("PRAGMA foreign_key_check").fetchall():
+                print(f"  ! {table} has rows referencing missing {parent} rows")
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            conn.commit()
+
+    print("\nMigration complete.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,30 @@
+"""Permanently delete records that have been in the trash longer than the retention period.
+
+Usage:
+    python purge_deleted.py                       # PURGE_RETENTION_DAYS / PURGE_BATCH_SIZE from env
+    python purge_deleted.py --retention-days 7 --batch-size 200
+"""
+import argparse
+from datetime import timedelta
+
+from app.database import SessionLocal
+from app.purge import PURGE_BATCH_SIZE, PURGE_RETENTION_DAYS, purge_deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=PURGE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    purged = purge_deleted(
+        SessionLocal, retention=timedelta(days=args.retention_days),
+        batch_size=args.batch_size, pause=args.pause,
+    )
+    for entity_type, count in purged.items():
+        print(f"  {entity_type}: {count} purged")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,124 @@
-"""Shared test fixtures: in-memory SQLite database and FastAPI test client."""
+"""Shared test fixtures: test database and FastAPI test client.
+
+The schema is created and seeded once per session. Each test runs inside a
+transaction on a single connection that is rolled back afterwards; sessions
+join it through SAVEPOINTs, so handlers can commit and roll back as usual.
+
+Configuration (environment):
+    TEST_DATABASE_URL  database to test against (default in-memory SQLite); under
+                       pytest-xdist each worker appends its id (``_gw0``...) to the
+                       database name, and non-SQLite databases must already exist
+"""
+
+import os
 
 import pytest
-import json
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app.database import Base, get_db, request_session
 from app.main import app
 from app.models import Role, User
-from app.auth import get_password_hash
+from app.auth import get_password_hash, pwd_context
+from app.cache import cache
+from app.query_stats import count_queries
+
+# The minimum bcrypt cost: hashing at the production cost dominated test time
+pwd_context.update(bcrypt__rounds=4)
+ADMIN_PASSWORD_HASH = get_password_hash("admin123")
+
 
-# In-memory SQLite for fast, isolated testing
+def _test_database_url() -> str:
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        return "sqlite://"
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not worker:
+        return url
+    url = make_url(url)
+    if url.database and url.database.endswith(".db"):
+        return url.set(database=f"{url.database[:-3]}_{worker}.db").render_as_string(hide_password=False)
+    return url.set(database=f"{url.database}_{worker}").render_as_string(hide_password=False)
+
+
+_url = make_url(_test_database_url())
+_sqlite = _url.get_backend_name() == "sqlite"
+
+# One shared connection, so code that uses the engine directly sees (and stays
+# inside) the current test's transaction
 TEST_ENGINE = create_engine(
-    "sqlite://",
-    connect_args={"check_same_thread": False},
+    _url,
+    connect_args={"check_same_thread": False} if _sqlite else {},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=TEST_ENGINE)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=TEST_ENGINE, join_transaction_mode="create_savepoint",
+)
 
+if _sqlite:
+    # pysqlite defers BEGIN until the first write and commits before DDL, which
+    # would let a test escape its rolled-back transaction; emit BEGIN ourselves
+    # unless the shared connection already has a transaction open.
+    @event.listens_for(TEST_ENGINE, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
 
-def override_get_db():
-    db = TestingSessionLocal()
+    @event.listens_for(TEST_ENGINE, "begin")
+    def _begin(conn):
+        if not conn.connection.dbapi_connection.in_transaction:
+            _execute_uncounted(conn, "BEGIN")
+
+
+def _execute_uncounted(conn, statement: str) -> None:
+    """Run transaction control on the raw cursor: production sessions don't issue
+    these SAVEPOINTs, so they must not show up in query counts."""
+    cursor = conn.connection.cursor()
     try:
-        yield db
+        cursor.execute(statement)
     finally:
-        db.close()
+        cursor.close()
+
+
+def _commit(dbapi_connection):
+    """While a test runs, commits and rollbacks outside the session (code using
+    ``TEST_ENGINE`` directly, connection resets) must not end its transaction."""
+    if not _in_test:
+        _do_commit(dbapi_connection)
+
+
+def _rollback(dbapi_connection):
+    if not _in_test:
+        _do_rollback(dbapi_connection)
+
+
+_in_test = False
+_dialect = TEST_ENGINE.dialect
+_do_commit, _do_rollback = _dialect.do_commit, _dialect.do_rollback
+_dialect.do_commit, _dialect.do_rollback = _commit, _rollback
+_dialect.do_savepoint = lambda conn, name: _execute_uncounted(
+    conn, f"SAVEPOINT {name}")
+_dialect.do_release_savepoint = lambda conn, name: _execute_uncounted(
+    conn, f"RELEASE SAVEPOINT {name}")
+_dialect.do_rollback_to_savepoint = lambda conn, name: _execute_uncounted(
+    conn, f"ROLLBACK TO SAVEPOINT {name}")
+
+
+def override_get_db():
+    yield from request_session(TestingSessionLocal)
 
 
 app.dependency_overrides[get_db] = override_get_db
 
 
-@pytest.fixture(autouse=True)
-def setup_database():
-    """Create all tables and seed roles before each test."""
+@pytest.fixture(scope="session", autouse=True)
+def database_schema():
+    """Create all tables and seed roles and the admin once per session."""
+    Base.metadata.drop_all(bind=TEST_ENGINE)
     Base.metadata.create_all(bind=TEST_ENGINE)
-    
+
     # Seed default roles
     db = TestingSessionLocal()
     roles = [
@@ -62,15 +144,46 @@ def setup_database():
         email="admin@crm.com",
         first_name="Admin",
         last_name="User",
-        password_hash=get_password_hash("admin123"),
+        password_hash=ADMIN_PASSWORD_HASH,
         role=admin_role # Use relationship instead of ID
     )
     db.add(admin_user)
     db.commit()
     db.close()
-    
+
     yield
     Base.metadata.drop_all(bind=TEST_ENGINE)
+    TEST_ENGINE.dispose()
+
+
+@pytest.fixture(autouse=True)
+def setup_database(database_schema):
+    """Run each test in a transaction that is rolled back afterwards."""
+    global _in_test
+    cache.clear()
+    connection = TEST_ENGINE.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    _in_test = True
+    try:
+        yield
+    finally:
+        _in_test = False
+        TestingSessionLocal.configure(bind=TEST_ENGINE)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture()
+def query_counter():
+    """
+    Count statements run against the test database inside a ``with`` block:
+
+        with query_counter() as queries:
+            client.get("/api/deals/", headers=admin_headers)
+        assert queries.count <= 5
+    """
+    return lambda: count_queries(TEST_ENGINE)
 
 
 @pytest.fixture()
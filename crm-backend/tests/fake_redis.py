@@ -0,0 +1,87 @@
+"""A minimal in-memory server speaking enough RESP for ``RedisBackend``.
+
+Implements PING, AUTH, SELECT, GET, MGET, SET (PX, NX), DEL, INCR and
+FLUSHDB, with one keyspace shared by all connections.
+"""
+
+import socketserver
+import threading
+import time
+
+
+def _read_command(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    assert line.startswith(b"*"), line
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int(stream.readline()[1:-2])
+        args.append(stream.read(length + 2)[:-2])
+    return args
+
+
+def _bulk(value) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.data = {}  # key -> (value, expires_at or None)
+        self.lock = threading.Lock()
+        self.commands = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+    def execute(self, name: str, args: list) -> bytes:
+        self.commands.append(name)
+        with self.lock:
+            if name in ("PING", "AUTH", "SELECT"):
+                return b"+OK\r\n"
+            if name == "GET":
+                return _bulk(self._get(args[0]))
+            if name == "MGET":
+                return b"*%d\r\n" % len(args) + b"".join(_bulk(self._get(key)) for key in args)
+            if name == "SET":
+                key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+                if b"NX" in options and self._get(key) is not None:
+                    return _bulk(None)
+                expires_at = None
+                if b"PX" in options:
+                    expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+                self.data[key] = (value, expires_at)
+                return b"+OK\r\n"
+            if name == "DEL":
+                return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in args)
+            if name == "INCR":
+                value = int(self._get(args[0]) or 0) + 1
+                self.data[args[0]] = (str(value).encode(), None)
+                return b":%d\r\n" % value
+            if name == "FLUSHDB":
+                self.data.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            command = _read_command(self.rfile)
+            if command is None:
+                return
+            self.wfile.write(self.server.execute(command[0].decode().upper(), command[1:]))
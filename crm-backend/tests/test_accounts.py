@@ -54,6 +54,33 @@ def test_delete_account(client, admin_headers):
     get_res = client.get(f"/api/accounts/{account_id}", headers=admin_headers)
     assert get_res.status_code == 404
 
+def test_delete_account_detaches_contacts(client, admin_headers):
+    account_id = client.post(
+        "/api/accounts/",
+        json={"name": "Parent", "industry": "Tech"},
+        headers=admin_headers
+    ).json()["id"]
+    contact = client.post(
+        "/api/contacts/",
+        json={"name": "Child", "email": "child@test.com", "account_id": account_id},
+        headers=admin_headers
+    ).json()
+    client.post(
+        "/api/activities/",
+        json={"type": "call", "subject": "Account call", "account_id": account_id},
+        headers=admin_headers
+    )
+
+    assert client.delete(f"/api/accounts/{account_id}", headers=admin_headers).status_code == 204
+    assert client.get(f"/api/accounts/{account_id}", headers=admin_headers).status_code == 404
+    assert client.get(f"/api/contacts/{contact['id']}", headers=admin_headers).status_code == 200
+
+    assert client.delete(f"/api/trash/account/{account_id}", headers=admin_headers).status_code == 204
+    kept = client.get(f"/api/contacts/{contact['id']}", headers=admin_headers)
+    assert kept.status_code == 200
+    assert kept.json()["account_id"] is None
+    assert client.get("/api/activities/", headers=admin_headers).json() == []
+
 def test_account_relationships(client, admin_headers):
     # Create Account
     acc_res = client.post(
@@ -120,3 +120,16 @@ class TestDeleteActivity:
     def test_delete_nonexistent(self, client, admin_headers):
         response = client.delete("/api/activities/9999", headers=admin_headers)
         assert response.status_code == 404
+
+    def test_delete_assigned_user(self, client, sample_contact, admin_headers):
+        user = client.post("/api/users/", json={
+            "email": "rep@crm.com", "first_name": "Sales", "last_name": "Rep", "password": "rep12345", "role_id": 2,
+        }, headers=admin_headers).json()
+        task = client.post("/api/activities/", json={
+            "type": "task", "subject": "Follow up", "contact_id": sample_contact["id"], "assigned_to_id": user["id"],
+        }, headers=admin_headers).json()
+        assert task["assigned_to_name"] == "Sales Rep"
+
+        assert client.delete(f"/api/users/{user['id']}", headers=admin_headers).status_code == 204
+        kept = client.get(f"/api/activities/{task['id']}", headers=admin_headers).json()
+        assert (kept["assigned_to_id"], kept["assigned_to_name"]) == (None, None)
@@ -0,0 +1,61 @@
+"""Tests for the batch endpoint: several API calls in one round trip."""
+
+
+def test_batch_returns_each_response_in_order(client, admin_headers, sample_deal, query_counter):
+    deal_id = sample_deal["id"]
+    with query_counter() as queries:
+        response = client.post("/api/batch", json={"requests": [
+            {"path": f"/api/deals/{deal_id}"},
+            {"path": f"/api/deals/{deal_id}/contacts"},
+            {"path": f"/api/deals/{deal_id}/line-items"},
+            {"path": "/api/deals/999999"},
+            {"path": "/api/contacts/?limit=1"},
+        ]}, headers=admin_headers)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["status"] for r in results] == [200, 200, 200, 404, 200]
+    assert results[0]["body"] == client.get(f"/api/deals/{deal_id}", headers=admin_headers).json()
+    assert results[0]["headers"]["etag"]
+    assert results[3]["body"] == {"detail": "Deal not found"}
+    assert len(results[4]["body"]) == 1
+    # One user lookup for the whole batch
+    assert sum("FROM users" in statement for statement, *_ in queries.statements) == 1
+
+
+def test_batch_writes_share_the_session(client, admin_headers):
+    response = client.post("/api/batch", json={"requests": [
+        {"method": "POST", "path": "/api/accounts/", "body": {"name": "Acme"}},
+        {"method": "POST", "path": "/api/accounts/", "body": {"name": ""}},
+        {"path": "/api/accounts/"},
+    ]}, headers=admin_headers)
+
+    created, invalid, listed = response.json()
+    assert (created["status"], invalid["status"], listed["status"]) == (201, 422, 200)
+    assert [a["name"] for a in listed["body"]] == ["Acme"]
+    assert client.get("/api/accounts/", headers=admin_headers).json() == listed["body"]
+
+
+def test_sub_requests_keep_their_permission_checks(client, admin_headers):
+    client.post("/api/users/", json={
+        "email": "viewer@crm.com", "first_name": "View", "last_name": "Er", "password": "viewer123", "role_id": 3,
+    }, headers=admin_headers)
+    token = client.post("/api/auth/login", data={"username": "viewer@crm.com", "password": "viewer123"}).json()
+    viewer = {"Authorization": f"Bearer {token['access_token']}"}
+
+    response = client.post("/api/batch", json={"requests": [
+        {"path": "/api/contacts/"},
+        {"method": "POST", "path": "/api/contacts/", "body": {"name": "A", "email": "a@example.com"}},
+        {"path": "/api/debug/profiles"},
+    ]}, headers=viewer)
+    assert [r["status"] for r in response.json()] == [200, 403, 403]
+
+
+def test_rejected_batches(client, admin_headers):
+    assert client.post("/api/batch", json={"requests": [{"path": "/api/contacts/"}]}).status_code == 401
+    for path in ("/api/batch", "/metrics", "http://example.com/api/contacts/"):
+        response = client.post("/api/batch", json={"requests": [{"path": path}]}, headers=admin_headers)
+        assert response.status_code == 400
+    too_many = {"requests": [{"path": "/api/contacts/"}] * 21}
+    assert client.post("/api/batch", json=too_many, headers=admin_headers).status_code == 400
+    assert client.post("/api/batch", json={"requests": []}, headers=admin_headers).status_code == 422
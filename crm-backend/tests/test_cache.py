@@ -0,0 +1,85 @@
+"""Tests for the write-invalidated reference data cache."""
+
+from app.cache import ReferenceCache, cached_pipelines
+from app.models import Pipeline
+from tests.conftest import TestingSessionLocal
+
+
+def _viewer_headers(client, admin_headers):
+    client.post("/api/users/", json={
+        "email": "viewer@crm.com", "first_name": "View", "last_name": "Er", "password": "viewer123", "role_id": 3,
+    }, headers=admin_headers)
+    token = client.post("/api/auth/login", data={"username": "viewer@crm.com", "password": "viewer123"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_lists_are_served_from_cache_until_a_write(client, admin_headers, query_counter):
+    client.post("/api/pipelines/", json={"name": "Sales"}, headers=admin_headers)
+    client.get("/api/pipelines/", headers=admin_headers)
+
+    with query_counter() as queries:
+        assert [p["name"] for p in client.get("/api/pipelines/", headers=admin_headers).json()] == ["Sales"]
+    assert not any("FROM pipelines" in statement for statement, *_ in queries.statements)
+
+    client.post("/api/pipelines/", json={"name": "Renewals"}, headers=admin_headers)
+    names = [p["name"] for p in client.get("/api/pipelines/", headers=admin_headers).json()]
+    assert names == ["Renewals", "Sales"]
+
+
+def test_role_changes_apply_to_permission_checks(client, admin_headers):
+    viewer = _viewer_headers(client, admin_headers)
+    assert client.post("/api/contacts/", json={"name": "A", "email": "a@example.com"}, headers=viewer).status_code == 403
+
+    client.put("/api/roles/3", json={"permissions": ["contacts.read", "contacts.create"]}, headers=admin_headers)
+    assert client.post("/api/contacts/", json={"name": "A", "email": "a@example.com"}, headers=viewer).status_code == 201
+
+
+def test_new_deals_follow_a_new_default_pipeline(client, admin_headers, sample_contact):
+    def create_deal():
+        return client.post("/api/deals/", json={
+            "title": "D", "value": 1.0, "contact_id": sample_contact["id"],
+        }, headers=admin_headers).json()
+
+    first = client.post("/api/pipelines/", json={"name": "First", "is_default": True}, headers=admin_headers).json()
+    assert create_deal()["pipeline_id"] == first["id"]
+
+    second = client.post("/api/pipelines/", json={"name": "Second", "is_default": True}, headers=admin_headers).json()
+    stage = client.post(
+        f"/api/pipelines/{second['id']}/stages/", json={"name": "Open", "order": 0}, headers=admin_headers
+    ).json()
+    deal = create_deal()
+    assert (deal["pipeline_id"], deal["stage_id"]) == (second["id"], stage["id"])
+
+
+def test_multi_instance_invalidation_through_version_row(monkeypatch):
+    instance_a = ReferenceCache(multi_instance=True, check_seconds=0)
+    instance_b = ReferenceCache(multi_instance=True, check_seconds=0)
+    db = TestingSessionLocal()
+    try:
+        monkeypatch.setattr("app.cache.reference_cache", instance_a)
+        assert cached_pipelines(db).rows == []
+
+        db.add(Pipeline(name="Sales"))
+        db.commit()
+        assert cached_pipelines(db).rows == []  # still cached on instance A
+
+        instance_b.invalidate(db)
+        assert [p["name"] for p in cached_pipelines(db).rows] == ["Sales"]
+        instance_b.invalidate(db)  # the version row exists now: a plain increment
+        assert [p["name"] for p in cached_pipelines(db).rows] == ["Sales"]
+    finally:
+        db.close()
+
+
+def test_dashboard_and_search_are_cached_until_a_write(client, admin_headers, sample_contact, query_counter):
+    client.get("/api/dashboard/summary", headers=admin_headers)
+    client.get("/api/search/", params={"q": "Globex"}, headers=admin_headers)
+
+    with query_counter() as queries:
+        assert client.get("/api/dashboard/summary", headers=admin_headers).json()["accounts"] == 0
+        assert client.get("/api/search/", params={"q": "Globex"}, headers=admin_headers).json() == []
+    assert not any("count(" in statement or "LIKE" in statement.upper() for statement, *_ in queries.statements)
+
+    client.post("/api/accounts/", json={"name": "Globex"}, headers=admin_headers)
+    assert client.get("/api/dashboard/summary", headers=admin_headers).json()["accounts"] == 1
+    assert [r["title"] for r in client.get("/api/search/", params={"q": "Globex"}, headers=admin_headers).json()] == ["Globex"]
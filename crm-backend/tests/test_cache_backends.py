@@ -0,0 +1,102 @@
+"""Tests for the cache backends and the shared cache on top of them."""
+
+import threading
+import time
+
+import pytest
+
+from app.cache import Cache
+from app.cache_backends import CacheBackendError, LocalBackend, RedisBackend
+from app.metrics import CACHE_EVENTS
+from tests.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["local", "redis"])
+def backend(request):
+    if request.param == "local":
+        yield LocalBackend()
+        return
+    server = request.getfixturevalue("fake_redis")
+    backend = RedisBackend(server.url)
+    yield backend
+    backend.close()
+
+
+def test_backend_operations(backend):
+    assert backend.set("a", b"1") and backend.set("b", b"2", ttl=0.05)
+    assert backend.get_many(["a", "b", "c"]) == [b"1", b"2", None]
+    assert not backend.set("a", b"x", only_if_absent=True)
+    assert backend.incr("n") == 1 and backend.incr("n") == 2
+    backend.delete("a")
+    time.sleep(0.06)
+    assert backend.get_many(["a", "b", "n"]) == [None, None, b"2"]
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get_many(["a"])
+    backend.set("c", b"3")
+    assert backend.get_many(["a", "b", "c"]) == [b"1", None, b"3"]
+
+
+def test_tags_invalidate_across_instances(fake_redis):
+    instance_a, instance_b = Cache(RedisBackend(fake_redis.url)), Cache(RedisBackend(fake_redis.url))
+    loads = []
+
+    def load(value):
+        loads.append(value)
+        return {"value": value}
+
+    assert instance_a.get_or_set("t", "k", lambda: load(1), tags=("deals",)) == {"value": 1}
+    assert instance_b.get_or_set("t", "k", lambda: load(2), tags=("deals",)) == {"value": 1}
+    instance_b.invalidate("deals")
+    assert instance_a.get_or_set("t", "k", lambda: load(3), tags=("deals",)) == {"value": 3}
+    instance_a.invalidate("contacts")
+    assert instance_b.get_or_set("t", "k", lambda: load(4), tags=("deals",)) == {"value": 3}
+    assert loads == [1, 3]
+
+
+def test_concurrent_misses_load_once(fake_redis):
+    # Two "instances" with four threads each, all missing the same key at once
+    caches = [Cache(RedisBackend(fake_redis.url)), Cache(RedisBackend(fake_redis.url))]
+    loads, results = [], []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    threads = [
+        threading.Thread(target=lambda c=c: results.append(c.get_or_set("t", "slow", load, ttl=10)))
+        for c in caches for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert results == [[1, 2, 3]] * 8
+
+
+def test_unreachable_backend_falls_back_to_loader(fake_redis):
+    url = fake_redis.url
+    fake_redis.shutdown()
+    fake_redis.server_close()
+    cache = Cache(RedisBackend(url, timeout=0.1))
+
+    before = CACHE_EVENTS.value("t", "error")
+    assert cache.get_or_set("t", "k", lambda: "computed") == "computed"
+    cache.invalidate("deals")
+    assert CACHE_EVENTS.value("t", "error") == before + 1
+    with pytest.raises(CacheBackendError):
+        cache.backend.get_many(["k"])
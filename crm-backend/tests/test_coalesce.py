@@ -0,0 +1,108 @@
+"""Tests for single-flight coalescing of identical concurrent handler calls."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.coalesce import SingleFlight, coalesce
+from app.metrics import COALESCED_CALLS
+from app.models import User
+
+
+def _wait_for_followers(route: str, count: int, before: float) -> None:
+    deadline = time.monotonic() + 5
+    while COALESCED_CALLS.value(route, "follower") - before < count:
+        assert time.monotonic() < deadline, "followers never joined"
+        time.sleep(0.005)
+
+
+def test_threadpool_calls_share_one_computation():
+    release, calls = threading.Event(), []
+
+    @coalesce(flights=SingleFlight())
+    def summary(q: str, current_user: User):
+        calls.append(q)
+        release.wait(5)
+        return {"q": q}
+
+    before = COALESCED_CALLS.value("test_coalesce.summary", "follower")
+    viewer, other_viewer, manager = User(id=1, role_id=3), User(id=2, role_id=3), User(id=3, role_id=2)
+    with ThreadPoolExecutor(8) as pool:
+        same = [pool.submit(summary, q="a", current_user=u) for u in (viewer, other_viewer) * 3]
+        distinct = [pool.submit(summary, q="a", current_user=manager), pool.submit(summary, q="b", current_user=viewer)]
+        _wait_for_followers("test_coalesce.summary", 5, before)
+        release.set()
+        assert [f.result() for f in same] == [{"q": "a"}] * 6
+        assert [f.result() for f in distinct] == [{"q": "a"}, {"q": "b"}]
+    assert sorted(calls) == ["a", "a", "b"]  # one per (params, role)
+
+
+def test_user_scope_keys_on_the_caller():
+    flights, calls = SingleFlight(), []
+    release = threading.Event()
+
+    @coalesce(scope="user", flights=flights)
+    def mine(current_user: User):
+        calls.append(current_user.id)
+        release.wait(5)
+        return current_user.id
+
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(mine, current_user=User(id=i, role_id=3)) for i in (1, 2)]
+        deadline = time.monotonic() + 5
+        while flights.in_flight() < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+        release.set()
+        assert [f.result() for f in futures] == [1, 2]
+
+
+def test_async_callers_follow_threadpool_and_async_leaders():
+    flights, calls = SingleFlight(), []
+    release = threading.Event()
+
+    @coalesce(flights=flights)
+    def blocking(q: str):
+        calls.append("sync")
+        release.wait(5)
+        return q.upper()
+
+    @coalesce(flights=flights)
+    async def stats(q: str):
+        calls.append("async")
+        await asyncio.sleep(0.05)
+        return q * 2
+
+    async def main():
+        leader = asyncio.get_running_loop().run_in_executor(None, lambda: blocking(q="x"))
+        while flights.in_flight() == 0:
+            await asyncio.sleep(0.005)
+        key = next(iter(flights._calls))
+        follower = asyncio.ensure_future(flights.do_async(key, None))
+        await asyncio.sleep(0.02)
+        release.set()
+        return await leader, await follower, await asyncio.gather(*(stats(q="ab") for _ in range(5)))
+
+    assert asyncio.run(main()) == ("X", "X", ["abab"] * 5)
+    assert calls == ["sync", "async"]
+
+
+def test_followers_get_the_leaders_exception():
+    release = threading.Event()
+
+    @coalesce(flights=SingleFlight())
+    def failing(q: str):
+        release.wait(5)
+        raise ValueError(q)
+
+    before = COALESCED_CALLS.value("test_coalesce.failing", "follower")
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(failing, q="boom") for _ in range(3)]
+        _wait_for_followers("test_coalesce.failing", 2, before)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
@@ -0,0 +1,88 @@
+"""Tests for the response compression middleware."""
+
+import asyncio
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, accepted_encodings
+
+
+def _stream_app(chunks, media_type="application/x-ndjson"):
+    app = FastAPI()
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(chunks), media_type=media_type)
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse("x" * 4096, media_type="image/png")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    return TestClient(app)
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=0.5, br;q=0, identity") == {"gzip", "identity"}
+    assert accepted_encodings("") == set()
+
+
+def test_large_json_is_gzipped(client, admin_headers):
+    for i in range(30):
+        client.post("/api/contacts/", json={"name": f"Contact {i}", "email": f"c{i}@example.com"}, headers=admin_headers)
+
+    response = client.get("/api/contacts/", headers={**admin_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()) == 30
+
+
+def test_small_or_unaccepted_responses_are_untouched(client, admin_headers):
+    assert "content-encoding" not in client.get("/api/health", headers={"Accept-Encoding": "gzip"}).headers
+
+    response = client.get("/api/roles/", headers={**admin_headers, "Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_chunks_are_flushed_individually():
+    chunks = [f'{{"row": {i}, "pad": "{"x" * 60}"}}\n'.encode() for i in range(10)]
+    response = _stream_app(chunks).get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == b"".join(chunks)
+
+
+def test_stream_flush_makes_each_chunk_decodable():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        await send({"type": "http.response.body", "body": b"a" * 200, "more_body": True})
+        await send({"type": "http.response.body", "body": b"b" * 200, "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+
+    first, second = (m["body"] for m in sent[1:])
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(first) == b"a" * 200  # readable before the stream ends
+    assert decoder.decompress(second) == b"b" * 200 and decoder.eof
+
+
+def test_small_stream_and_other_types_pass_through():
+    client = _stream_app([b"tiny", b"rows"])
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"tinyrows"
+
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers
+    assert len(image.content) == 4096
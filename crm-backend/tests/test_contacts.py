@@ -114,6 +114,23 @@ class TestDeleteContact:
         assert response.status_code == 204
         assert client.get(f"/api/contacts/{sample_contact['id']}", headers=admin_headers).status_code == 404
 
+    def test_purge_cascades_to_deals_activities_and_notes(self, client, sample_deal, sample_activity, sample_contact, admin_headers):
+        client.post("/api/notes/", json={
+            "content": "Deal note", "related_to_type": "deal", "related_to_id": sample_deal["id"],
+        }, headers=admin_headers)
+        client.post("/api/notes/", json={
+            "content": "Contact note", "related_to_type": "contact", "related_to_id": sample_contact["id"],
+        }, headers=admin_headers)
+
+        response = client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+        assert response.status_code == 204
+        assert client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).status_code == 404
+
+        response = client.delete(f"/api/trash/contact/{sample_contact['id']}", headers=admin_headers)
+        assert response.status_code == 204
+        assert client.get(f"/api/activities/{sample_activity['id']}", headers=admin_headers).status_code == 404
+        assert client.get("/api/notes/", headers=admin_headers).json() == []
+
     def test_delete_nonexistent(self, client, admin_headers):
         response = client.delete("/api/contacts/9999", headers=admin_headers)
         assert response.status_code == 404
@@ -0,0 +1,35 @@
+"""Tests for the dashboard widgets and the combined dashboard payload."""
+
+from datetime import datetime
+
+
+def test_combined_payload_matches_widget_endpoints(client, admin_headers, sample_deal, sample_activity):
+    combined = client.get("/api/dashboard", headers=admin_headers)
+    assert combined.status_code == 200
+    assert combined.json() == {
+        "summary": client.get("/api/dashboard/summary", headers=admin_headers).json(),
+        "funnel": client.get("/api/dashboard/funnel", headers=admin_headers).json(),
+        "activity_stats": client.get("/api/dashboard/activity-stats", headers=admin_headers).json(),
+    }
+
+    summary = combined.json()["summary"]
+    assert (summary["contacts"], summary["deals"], summary["total_value"]) == (1, 1, sample_deal["value"])
+    trend = combined.json()["activity_stats"]["trend"]
+    assert len(trend) == 7
+    assert trend[-1] == {"date": datetime.now().strftime("%b %d"), "count": 1}
+
+
+def test_widget_selector(client, admin_headers, query_counter):
+    with query_counter() as queries:
+        response = client.get("/api/dashboard", params={"widgets": "funnel, summary"}, headers=admin_headers)
+    assert list(response.json()) == ["summary", "funnel"]
+    assert not any("activities" in statement for statement, *_ in queries.statements)
+
+    response = client.get("/api/dashboard", params={"widgets": "summary,pipeline"}, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown widgets: pipeline"
+    assert client.get("/api/dashboard", params={"widgets": ","}, headers=admin_headers).status_code == 400
+
+
+def test_requires_authentication(client):
+    assert client.get("/api/dashboard").status_code == 401
@@ -69,6 +69,44 @@ class TestListDeals:
         response = client.get("/api/deals/", params={"contact_id": 9999}, headers=admin_headers)
         assert len(response.json()) == 0
 
+    def test_list_query_count_does_not_grow_with_deals(self, client, admin_headers, query_counter):
+        account = client.post("/api/accounts/", json={"name": "Acme"}, headers=admin_headers).json()
+        for i in range(5):
+            contact = client.post("/api/contacts/", json={
+                "name": f"C{i}", "email": f"c{i}@example.com", "account_id": account["id"],
+            }, headers=admin_headers).json()
+            client.post("/api/deals/", json={
+                "title": f"D{i}", "value": 100.0, "contact_id": contact["id"], "account_id": account["id"],
+            }, headers=admin_headers)
+
+        with query_counter() as queries:
+            response = client.get("/api/deals/", headers=admin_headers)
+        assert len(response.json()) == 5
+        assert queries.count <= 6
+        assert response.headers["X-DB-Queries"] == str(queries.count)
+        assert "Server-Timing" in response.headers
+
+    def test_line_items_load_products_in_one_query(self, client, sample_deal, admin_headers, query_counter):
+        for i in range(5):
+            product = client.post("/api/products/", json={"name": f"P{i}", "unit_price": 10.0}, headers=admin_headers).json()
+            client.post(f"/api/deals/{sample_deal['id']}/line-items", json={
+                "product_id": product["id"], "quantity": 2,
+            }, headers=admin_headers)
+
+        with query_counter() as queries:
+            response = client.get(f"/api/deals/{sample_deal['id']}/line-items", headers=admin_headers)
+        assert len(response.json()) == 5
+        assert queries.count <= 5
+
+
+    def test_delete_product_used_on_a_line_item(self, client, sample_deal, admin_headers):
+        product = client.post("/api/products/", json={"name": "P", "unit_price": 10.0}, headers=admin_headers).json()
+        client.post(f"/api/deals/{sample_deal['id']}/line-items", json={"product_id": product["id"]}, headers=admin_headers)
+
+        assert client.delete(f"/api/products/{product['id']}", headers=admin_headers).status_code == 204
+        items = client.get(f"/api/deals/{sample_deal['id']}/line-items", headers=admin_headers).json()
+        assert [(i["product"]["id"], i["product"]["is_active"]) for i in items] == [(product["id"], False)]
+
 
 class TestGetDeal:
     def test_get_existing(self, client, sample_deal, admin_headers):
@@ -122,3 +160,85 @@ class TestDeleteDeal:
     def test_delete_nonexistent(self, client, admin_headers):
         response = client.delete("/api/deals/9999", headers=admin_headers)
         assert response.status_code == 404
+
+
+class TestMoveDealsBatch:
+    def _stages(self, client, admin_headers):
+        pipeline = client.post("/api/pipelines/", json={"name": "Batch Pipeline"}, headers=admin_headers).json()
+        return [
+            client.post(
+                f"/api/pipelines/{pipeline['id']}/stages/",
+                json={"name": name, "order": i},
+                headers=admin_headers,
+            ).json()
+            for i, name in enumerate(["Qualification", "Closed Won", "Custom Step"])
+        ]
+
+    def test_batch_move(self, client, sample_deal, sample_contact, admin_headers):
+        qualification, closed_won, custom = self._stages(client, admin_headers)
+        other = client.post("/api/deals/", json={
+            "title": "Second", "value": 10.0, "contact_id": sample_contact["id"],
+        }, headers=admin_headers).json()
+
+        response = client.post("/api/deals/move:batch", json={"moves": [
+            {"deal_id": sample_deal["id"], "stage_id": closed_won["id"]},
+            {"deal_id": other["id"], "stage_id": custom["id"]},
+        ]}, headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()["moved"]) == 2
+
+        moved = client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).json()
+        assert moved["stage_id"] == closed_won["id"]
+        assert moved["stage"] == "closed_won"
+        # Stage names without a legacy equivalent map by probability (0 here)
+        custom_moved = client.get(f"/api/deals/{other['id']}", headers=admin_headers).json()
+        assert custom_moved["stage_id"] == custom["id"]
+        assert custom_moved["stage"] == "prospecting"
+
+        history = client.get(f"/api/deals/{sample_deal['id']}/stage-history", headers=admin_headers).json()
+        assert len(history) == 1
+        assert history[0]["from_stage_id"] == sample_deal["stage_id"]
+        assert history[0]["to_stage_id"] == closed_won["id"]
+
+    def test_batch_move_missing_deal(self, client, sample_deal, admin_headers):
+        qualification, _, _ = self._stages(client, admin_headers)
+        response = client.post("/api/deals/move:batch", json={"moves": [
+            {"deal_id": 9999, "stage_id": qualification["id"]},
+        ]}, headers=admin_headers)
+        assert response.status_code == 404
+
+    def test_batch_move_to_closed_lost_requires_loss_reason(self, client, sample_deal, admin_headers):
+        pipeline = client.post("/api/pipelines/", json={"name": "Lost Pipeline"}, headers=admin_headers).json()
+        lost = client.post(f"/api/pipelines/{pipeline['id']}/stages/", json={"name": "Closed Lost"},
+                           headers=admin_headers).json()
+        move = {"deal_id": sample_deal["id"], "stage_id": lost["id"]}
+
+        response = client.post("/api/deals/move:batch", json={"moves": [move]}, headers=admin_headers)
+        assert response.status_code == 422
+        assert client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).json()["stage"] == "prospecting"
+
+        response = client.post("/api/deals/move:batch", json={"moves": [{**move, "loss_reason": "Price"}]},
+                               headers=admin_headers)
+        assert response.status_code == 200
+        deal = client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).json()
+        assert (deal["stage"], deal["loss_reason"]) == ("closed_lost", "Price")
+
+    def test_batch_move_maps_custom_stages_by_probability(self, client, sample_deal, admin_headers):
+        pipeline = client.post("/api/pipelines/", json={"name": "Custom Pipeline"}, headers=admin_headers).json()
+        signed, review = [
+            client.post(f"/api/pipelines/{pipeline['id']}/stages/", json={"name": name, "probability": probability},
+                        headers=admin_headers).json()
+            for name, probability in [("Signed", 100), ("Legal Review", 60)]
+        ]
+        for stage, legacy in [(signed, "closed_won"), (review, "proposal")]:
+            client.post("/api/deals/move:batch", json={"moves": [{"deal_id": sample_deal["id"], "stage_id": stage["id"]}]},
+                        headers=admin_headers)
+            assert client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).json()["stage"] == legacy
+
+    def test_batch_move_duplicate_deal(self, client, sample_deal, admin_headers):
+        qualification, closed_won, _ = self._stages(client, admin_headers)
+        response = client.post("/api/deals/move:batch", json={"moves": [
+            {"deal_id": sample_deal["id"], "stage_id": qualification["id"]},
+            {"deal_id": sample_deal["id"], "stage_id": closed_won["id"]},
+        ]}, headers=admin_headers)
+        assert response.status_code == 422
@@ -0,0 +1,59 @@
+"""Tests for weak ETags and conditional GET."""
+
+
+def _conditional_get(client, path, headers):
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    again = client.get(path, headers={**headers, "If-None-Match": etag})
+    return etag, again
+
+
+def test_detail_not_modified_until_updated(client, admin_headers, sample_deal):
+    path = f"/api/deals/{sample_deal['id']}"
+    etag, again = _conditional_get(client, path, admin_headers)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    client.put(path, json={"title": "Renamed"}, headers=admin_headers)
+    changed = client.get(path, headers={**admin_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Renamed"
+    assert changed.headers["etag"] != etag
+
+
+def test_list_etag_tracks_page_and_related_rows(client, admin_headers, sample_deal):
+    etag, again = _conditional_get(client, "/api/deals/", admin_headers)
+    assert again.status_code == 304
+
+    # contact_name comes from the contact, so renaming it changes the deals' ETag
+    client.put(f"/api/contacts/{sample_deal['contact_id']}", json={"name": "Renamed"}, headers=admin_headers)
+    after_rename = client.get("/api/deals/", headers={**admin_headers, "If-None-Match": etag})
+    assert after_rename.status_code == 200
+    assert after_rename.json()[0]["contact_name"] == "Renamed"
+
+    client.delete(f"/api/deals/{sample_deal['id']}", headers=admin_headers)
+    emptied = client.get("/api/deals/", headers={**admin_headers, "If-None-Match": after_rename.headers["etag"]})
+    assert emptied.status_code == 200
+    assert emptied.json() == []
+
+
+def test_if_none_match_lists_and_wildcard(client, admin_headers, sample_contact):
+    path = f"/api/contacts/{sample_contact['id']}"
+    etag = client.get(path, headers=admin_headers).headers["etag"]
+    listed = client.get(path, headers={**admin_headers, "If-None-Match": f'W/"other", {etag}'})
+    assert listed.status_code == 304
+    strong = client.get(path, headers={**admin_headers, "If-None-Match": etag.removeprefix("W/")})
+    assert strong.status_code == 304
+    assert client.get(path, headers={**admin_headers, "If-None-Match": "*"}).status_code == 304
+    assert client.get(path, headers={**admin_headers, "If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_reference_lists(client, admin_headers):
+    pipeline = client.post("/api/pipelines/", json={"name": "Sales"}, headers=admin_headers).json()
+    for path in ["/api/pipelines/", f"/api/pipelines/{pipeline['id']}/stages/", "/api/products/", "/api/users/"]:
+        _, again = _conditional_get(client, path, admin_headers)
+        assert again.status_code == 304, path
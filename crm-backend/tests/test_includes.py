@@ -0,0 +1,87 @@
+"""Tests for relationship expansion (``include=``) on entity reads."""
+
+DEAL_INCLUDES = "contact,account,line_items,related_contacts,stage_history"
+
+
+def _add_deals(client, headers, count: int) -> None:
+    account = client.post("/api/accounts/", json={"name": f"Account {count}"}, headers=headers).json()
+    product = client.post("/api/products/", json={"name": f"Product {count}", "unit_price": 10.0}, headers=headers).json()
+    for i in range(count):
+        contact = client.post("/api/contacts/", json={
+            "name": f"Contact {count}-{i}", "email": f"c{count}-{i}@example.com", "account_id": account["id"],
+        }, headers=headers).json()
+        deal = client.post("/api/deals/", json={
+            "title": f"Deal {count}-{i}", "value": 100.0, "contact_id": contact["id"], "account_id": account["id"],
+        }, headers=headers).json()
+        client.post(f"/api/deals/{deal['id']}/line-items", json={"product_id": product["id"]}, headers=headers)
+        client.post(f"/api/deals/{deal['id']}/contacts", json={"contact_id": contact["id"]}, headers=headers)
+
+
+def test_deal_includes_match_the_sub_resource_endpoints(client, admin_headers, sample_deal):
+    _add_deals(client, admin_headers, 1)
+    response = client.get("/api/deals/", params={"include": DEAL_INCLUDES}, headers=admin_headers)
+    assert response.status_code == 200
+
+    plain = client.get("/api/deals/", headers=admin_headers).json()
+    for deal, base in zip(response.json(), plain):
+        assert {key: deal[key] for key in base} == base
+        get = lambda path: client.get(f"/api/deals/{deal['id']}{path}", headers=admin_headers).json()
+        assert deal["line_items"] == get("/line-items")
+        assert deal["related_contacts"] == get("/contacts")
+        assert deal["stage_history"] == get("/stage-history")
+        assert deal["contact"] == client.get(f"/api/contacts/{base['contact_id']}", headers=admin_headers).json()
+
+    with_account, without_account = response.json()
+    assert with_account["account"]["name"] == "Account 1"
+    assert len(with_account["line_items"]) == len(with_account["related_contacts"]) == 1
+    assert without_account["account"] is None and without_account["line_items"] == []
+
+    detail = client.get(f"/api/deals/{with_account['id']}", params={"include": DEAL_INCLUDES}, headers=admin_headers)
+    assert detail.json() == with_account
+
+
+def test_query_count_does_not_grow_with_the_page(client, admin_headers, query_counter):
+    counts = []
+    for size in (2, 10):
+        _add_deals(client, admin_headers, size - len(counts) * 2)
+        with query_counter() as queries:
+            response = client.get("/api/deals/", params={"include": DEAL_INCLUDES}, headers=admin_headers)
+        assert len(response.json()) == size
+        counts.append(queries.count)
+    assert counts[0] == counts[1]
+
+
+def test_account_contact_and_lead_includes(client, admin_headers):
+    _add_deals(client, admin_headers, 2)
+    accounts = client.get("/api/accounts/", params={"include": "deals,contacts"}, headers=admin_headers).json()
+    assert [len(accounts[0]["deals"]), len(accounts[0]["contacts"])] == [2, 2]
+
+    contact = accounts[0]["contacts"][0]
+    expanded = client.get(f"/api/contacts/{contact['id']}", params={"include": "account,deals"}, headers=admin_headers)
+    assert expanded.json()["account"]["id"] == accounts[0]["id"]
+    assert [deal["contact_id"] for deal in expanded.json()["deals"]] == [contact["id"]]
+
+    client.post("/api/leads/", json={"first_name": "Lee", "last_name": "Ad", "email": "lee@example.com"}, headers=admin_headers)
+    leads = client.get("/api/leads/", params={"include": "contact,account,deal"}, headers=admin_headers).json()
+    assert (leads[0]["contact"], leads[0]["account"], leads[0]["deal"]) == (None, None, None)
+
+
+def test_unknown_include_is_rejected(client, admin_headers, sample_deal):
+    response = client.get("/api/deals/", params={"include": "contact,owner"}, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown include: owner"
+    assert client.get(f"/api/contacts/{sample_deal['contact_id']}", params={"include": "line_items"},
+                      headers=admin_headers).status_code == 400
+
+
+def test_etag_covers_included_rows(client, admin_headers, sample_deal):
+    url, params = f"/api/deals/{sample_deal['id']}", {"include": "related_contacts"}
+    first = client.get(url, params=params, headers=admin_headers)
+    etag = first.headers["ETag"]
+    assert etag != client.get(url, headers=admin_headers).headers["ETag"]
+    assert client.get(url, params=params, headers={**admin_headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(f"{url}/contacts", json={"contact_id": sample_deal["contact_id"]}, headers=admin_headers)
+    second = client.get(url, params=params, headers={**admin_headers, "If-None-Match": etag})
+    assert second.status_code == 200
+    assert len(second.json()["related_contacts"]) == 1
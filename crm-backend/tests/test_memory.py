@@ -0,0 +1,56 @@
+"""Tests for the tracemalloc debug endpoints and per-request peak memory."""
+
+import pytest
+
+from app import memory
+from app.metrics import REQUEST_PEAK_MEMORY
+
+
+@pytest.fixture
+def tracing(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_ROUTE_SAMPLE_RATE", 1.0)
+    assert client.post("/api/debug/memory/start", headers=admin_headers).json()["tracing"] is True
+    yield
+    client.post("/api/debug/memory/stop", headers=admin_headers)
+
+
+def test_snapshot_requires_tracing(client, admin_headers):
+    response = client.post("/api/debug/memory/snapshots", headers=admin_headers)
+    assert response.status_code == 409
+
+
+def test_snapshots_and_diff(client, admin_headers, tracing):
+    first = client.post("/api/debug/memory/snapshots", headers=admin_headers).json()
+    retained = [bytearray(64 * 1024) for _ in range(8)]
+    second = client.post("/api/debug/memory/snapshots", headers=admin_headers).json()
+
+    listed = client.get("/api/debug/memory/snapshots", headers=admin_headers).json()
+    assert [s["id"] for s in listed] == [first["id"], second["id"]]
+
+    top = client.get(f"/api/debug/memory/snapshots/{second['id']}", headers=admin_headers).json()
+    assert top and {"site", "size_kb", "count"} <= set(top[0])
+
+    diff = client.get(
+        "/api/debug/memory/diff", params={"from": first["id"], "to": second["id"]}, headers=admin_headers
+    ).json()
+    assert any("test_memory.py" in row["site"] and row["size_diff_kb"] >= 500 for row in diff)
+    del retained
+
+    missing = client.get("/api/debug/memory/diff", params={"from": first["id"], "to": 999}, headers=admin_headers)
+    assert missing.status_code == 404
+
+
+def test_peak_memory_and_route_sites(client, admin_headers, sample_contact, tracing):
+    before = REQUEST_PEAK_MEMORY.count("GET", "/api/contacts/")
+    assert client.get("/api/contacts/", headers=admin_headers).status_code == 200
+    assert REQUEST_PEAK_MEMORY.count("GET", "/api/contacts/") == before + 1
+
+    routes = client.get("/api/debug/memory/routes", headers=admin_headers).json()
+    assert routes["GET /api/contacts/"]["sampled_requests"] == 1
+
+    stopped = client.post("/api/debug/memory/stop", headers=admin_headers).json()
+    assert stopped["tracing"] is False and stopped["snapshots"] == []
+
+
+def test_memory_endpoints_are_admin_only(client):
+    assert client.get("/api/debug/memory").status_code == 401
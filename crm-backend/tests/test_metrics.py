@@ -0,0 +1,61 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from app.metrics import AUTH_FAILURES, HTTP_LATENCY, HTTP_REQUESTS, Histogram, REGISTRY
+
+
+def test_request_metrics_use_route_templates(client, sample_contact, admin_headers):
+    before = HTTP_REQUESTS.value("GET", "/api/contacts/{contact_id}", "200")
+    client.get(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+    client.get("/api/does-not-exist")
+
+    assert HTTP_REQUESTS.value("GET", "/api/contacts/{contact_id}", "200") == before + 1
+    assert HTTP_REQUESTS.value("GET", "unmatched", "404") >= 1
+    assert HTTP_LATENCY.count("GET", "/api/contacts/{contact_id}") >= 1
+
+
+def test_auth_failures_are_counted(client):
+    before = AUTH_FAILURES.value("bad_credentials")
+    client.post("/api/auth/login", data={"username": "admin@crm.com", "password": "wrong"})
+    client.get("/api/contacts/", headers={"Authorization": "Bearer garbage"})
+
+    assert AUTH_FAILURES.value("bad_credentials") == before + 1
+    assert AUTH_FAILURES.value("invalid_token") >= 1
+
+
+def test_metrics_endpoint_exposition(client, admin_headers):
+    client.get("/api/contacts/", headers=admin_headers)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/contacts/",status="200"}' in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert "http_requests_in_flight " in body
+    assert "db_queries_total " in body
+
+
+def test_metrics_endpoint_token(client, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_need_a_token_outside_development(client, monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    assert client.get("/metrics").status_code == 401
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_latency_seconds", "Test histogram", ("route",), buckets=(0.1, 1.0))
+    REGISTRY.remove(histogram)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/x")
+
+    lines = histogram.collect()
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{route="/x"} 4' in lines
@@ -0,0 +1,42 @@
+"""Tests for the P2 migration's foreign key upgrade on SQLite."""
+
+import re
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.schema import CreateTable
+
+import migrate_p2
+from app.models import Activity
+
+
+def test_sqlite_tables_are_rebuilt_with_delete_rules(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    migrate_p2.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # An activities table from before ON DELETE rules and updated_at, with a user and an assigned task
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        old_ddl = re.sub(r" ON DELETE \w+( NULL)?", "", str(CreateTable(Activity.__table__).compile(conn)))
+        old_ddl = re.sub(r",\s*updated_at DATETIME", "", old_ddl)
+        conn.execute(text("DROP TABLE activities"))
+        conn.execute(text(old_ddl))
+        conn.execute(text("INSERT INTO roles (id, name, permissions) VALUES (1, 'Sales Rep', '[]')"))
+        conn.execute(text(
+            "INSERT INTO users (id, email, first_name, last_name, auth_provider, role_id, is_active) "
+            "VALUES (7, 'rep@crm.com', 'Sales', 'Rep', 'local', 1, 1)"
+        ))
+        conn.execute(text(
+            "INSERT INTO activities (id, type, subject, date, is_task, assigned_to_id, created_at) "
+            "VALUES (1, 'task', 'Follow up', '2024-01-01', 1, 7, '2024-01-01 09:00:00')"
+        ))
+
+    migrate_p2.run(engine)
+
+    rules = {fk["constrained_columns"][0]: fk["options"].get("ondelete") for fk in inspect(engine).get_foreign_keys("activities")}
+    assert rules["assigned_to_id"] == "SET NULL"
+    indexes = {i["name"] for i in inspect(engine).get_indexes("activities")}
+    assert {"ix_activities_assigned_to_id", "ix_activities_updated_at"} <= indexes
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE id = 7"))  # foreign keys are on again
+        assert conn.execute(text("SELECT assigned_to_id FROM activities WHERE id = 1")).scalar_one_or_none() is None
+        assert conn.execute(text("SELECT COUNT(*) FROM activities")).scalar() == 1
+        assert conn.execute(text("SELECT updated_at FROM activities")).scalar() == "2024-01-01 09:00:00"
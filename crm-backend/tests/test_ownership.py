@@ -0,0 +1,66 @@
+"""Tests for bulk ownership reassignment."""
+
+import pytest
+
+
+@pytest.fixture()
+def other_user(client, admin_headers):
+    roles = client.get("/api/roles/", headers=admin_headers).json()
+    rep_role = next(r for r in roles if r["name"] == "Sales Rep")
+    response = client.post("/api/users/", json={
+        "email": "rep@crm.com",
+        "first_name": "Sales",
+        "last_name": "Rep",
+        "password": "secret123",
+        "role_id": rep_role["id"],
+    }, headers=admin_headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _admin_id(client, admin_headers):
+    return client.get("/api/auth/me", headers=admin_headers).json()["id"]
+
+
+def test_reassign_all_entities(client, admin_headers, sample_deal, sample_contact, other_user):
+    client.post("/api/leads/", json={"first_name": "L", "last_name": "One", "email": "l1@example.com"}, headers=admin_headers)
+
+    response = client.post("/api/ownership/reassign", json={
+        "from_user_id": _admin_id(client, admin_headers),
+        "to_user_id": other_user["id"],
+    }, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["reassigned"] == {"contact": 1, "deal": 1, "lead": 1, "account": 0}
+
+    notes = client.get("/api/notes/", params={"related_to_type": "deal", "related_to_id": sample_deal["id"]}, headers=admin_headers).json()
+    assert len(notes) == 1
+    assert "Owner changed" in notes[0]["content"]
+
+
+def test_reassign_subset_of_entity_types(client, admin_headers, sample_deal, other_user):
+    response = client.post("/api/ownership/reassign", json={
+        "from_user_id": _admin_id(client, admin_headers),
+        "to_user_id": other_user["id"],
+        "entity_types": ["deal"],
+    }, headers=admin_headers)
+    assert response.json()["reassigned"] == {"deal": 1}
+
+    notes = client.get("/api/notes/", params={"related_to_type": "contact"}, headers=admin_headers).json()
+    assert notes == []
+
+
+def test_reassign_unknown_user(client, admin_headers):
+    response = client.post("/api/ownership/reassign", json={
+        "from_user_id": _admin_id(client, admin_headers),
+        "to_user_id": 9999,
+    }, headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_reassign_same_user(client, admin_headers):
+    admin_id = _admin_id(client, admin_headers)
+    response = client.post("/api/ownership/reassign", json={
+        "from_user_id": admin_id,
+        "to_user_id": admin_id,
+    }, headers=admin_headers)
+    assert response.status_code == 400
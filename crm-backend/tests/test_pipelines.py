@@ -92,3 +92,43 @@ def test_reorder_stages(client, admin_headers):
     stages = client.get(f"/api/pipelines/{p_id}/stages/", headers=admin_headers).json()
     assert stages[0]["id"] == s2["id"]
     assert stages[1]["id"] == s1["id"]
+
+def test_reorder_stages_requires_every_stage(client, admin_headers):
+    pipeline = create_pipeline_helper(client, admin_headers)
+    p_id = pipeline["id"]
+
+    s1 = client.post(f"/api/pipelines/{p_id}/stages/", json={"name": "S1", "order": 0}, headers=admin_headers).json()
+    s2 = client.post(f"/api/pipelines/{p_id}/stages/", json={"name": "S2", "order": 1}, headers=admin_headers).json()
+
+    for stage_ids in ([s2["id"]], [s2["id"], s2["id"]], [s2["id"], s1["id"], 9999]):
+        response = client.put(
+            f"/api/pipelines/{p_id}/stages/reorder",
+            json={"stage_ids": stage_ids},
+            headers=admin_headers
+        )
+        assert response.status_code == 400
+
+    stages = client.get(f"/api/pipelines/{p_id}/stages/", headers=admin_headers).json()
+    assert [s["id"] for s in stages] == [s1["id"], s2["id"]]
+
+
+def test_delete_stage_with_history(client, admin_headers, sample_contact):
+    pipeline = create_pipeline_helper(client, admin_headers)
+    first, second = (
+        client.post(f"/api/pipelines/{pipeline['id']}/stages/", json={"name": name, "order": i}, headers=admin_headers).json()
+        for i, name in enumerate(("First", "Second"))
+    )
+    deal = client.post("/api/deals/", json={
+        "title": "Mover", "value": 1.0, "contact_id": sample_contact["id"],
+        "pipeline_id": pipeline["id"], "stage_id": first["id"],
+    }, headers=admin_headers).json()
+    client.post(f"/api/deals/{deal['id']}/move", json={"stage_id": second["id"]}, headers=admin_headers)
+
+    # Deals moved into the second stage: deleting it (or its pipeline) would lose that history
+    assert client.delete(f"/api/pipelines/{pipeline['id']}/stages/{second['id']}", headers=admin_headers).status_code == 409
+    assert client.delete(f"/api/pipelines/{pipeline['id']}", headers=admin_headers).status_code == 409
+
+    # The first stage is only a starting point, which the history forgets
+    assert client.delete(f"/api/pipelines/{pipeline['id']}/stages/{first['id']}", headers=admin_headers).status_code == 204
+    history = client.get(f"/api/deals/{deal['id']}/stage-history", headers=admin_headers).json()
+    assert [(h["from_stage_id"], h["to_stage_id"]) for h in history] == [(None, second["id"])]
@@ -0,0 +1,67 @@
+"""Tests for on-demand request profiling."""
+
+from app import profiling
+from app.profiling import _categorize
+
+
+def _login(client, email, password):
+    token = client.post("/api/auth/login", data={"username": email, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_admin_gets_stored_profile(client, sample_deal, admin_headers):
+    response = client.get(
+        f"/api/deals/{sample_deal['id']}/timeline", headers={**admin_headers, "X-Profile": "1"}
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert "prof-sql;dur=" in response.headers["Server-Timing"]
+
+    report = client.get(f"/api/debug/profiles/{profile_id}", headers=admin_headers).json()
+    assert report["route"] == "/api/deals/{deal_id}/timeline"
+    assert set(report["breakdown_ms"]) == {"sql", "orm_hydration", "serialization", "handler"}
+    assert report["breakdown_ms"]["sql"] > 0
+    assert [p["id"] for p in client.get("/api/debug/profiles", headers=admin_headers).json()][0] == profile_id
+
+    folded = client.get(f"/api/debug/profiles/{profile_id}", params={"format": "folded"}, headers=admin_headers)
+    assert folded.headers["content-type"].startswith("text/plain")
+
+
+def test_non_admin_profile_is_discarded(client, admin_headers):
+    role_id = next(r["id"] for r in client.get("/api/roles/", headers=admin_headers).json() if r["name"] == "Viewer")
+    client.post("/api/users/", json={
+        "email": "viewer@crm.com", "first_name": "View", "last_name": "Er",
+        "password": "viewer123", "role_id": role_id,
+    }, headers=admin_headers)
+    headers = _login(client, "viewer@crm.com", "viewer123")
+
+    response = client.get("/api/contacts/", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/api/debug/profiles", headers=headers).status_code == 403
+
+
+def test_sampler_starts_only_for_admins(client, admin_headers, monkeypatch):
+    started = []
+    monkeypatch.setattr(profiling._sampler, "add", started.append)
+    client.post("/api/users/", json={
+        "email": "viewer@crm.com", "first_name": "View", "last_name": "Er", "password": "viewer123", "role_id": 3,
+    }, headers=admin_headers)
+    viewer = _login(client, "viewer@crm.com", "viewer123")
+
+    for headers in (viewer, {"Authorization": "Bearer garbage"}, {"Authorization": "garbage"}, {}):
+        client.get("/api/contacts/", headers={**headers, "X-Profile": "1"})
+    assert started == []
+
+    client.get("/api/contacts/", headers={**admin_headers, "X-Profile": "1"})
+    assert len(started) == 1
+
+
+def test_sample_categories():
+    sql = [("/x/sqlalchemy/orm/loading.py", 1, "instances"), ("/x/sqlalchemy/engine/default.py", 1, "do_execute")]
+    orm = [("/x/fastapi/routing.py", 1, "run_endpoint"), ("/x/sqlalchemy/orm/loading.py", 1, "_instance")]
+    serialization = [("/x/fastapi/routing.py", 1, "serialize_response"), ("/x/pydantic/main.py", 1, "validate")]
+    assert _categorize(sql) == "sql"
+    assert _categorize(orm) == "orm_hydration"
+    assert _categorize(serialization) == "serialization"
+    assert _categorize([("/app/routers/deals.py", 1, "get_deal")]) == "handler"
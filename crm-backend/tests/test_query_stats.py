@@ -0,0 +1,25 @@
+"""Tests for the per-request query counter and N+1 warnings."""
+
+import logging
+
+from app.query_stats import QueryStats, _warn_if_excessive
+
+
+def test_repeated_statement_shapes_are_reported(caplog):
+    stats = QueryStats()
+    for _ in range(12):
+        stats.record("SELECT products.id FROM products WHERE products.id = ?", 0.001)
+    stats.record("SELECT deals.id FROM deals", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        _warn_if_excessive("GET /api/deals/{deal_id}/line-items", stats)
+
+    assert stats.count == 13
+    assert "Possible N+1 on GET /api/deals/{deal_id}/line-items: statement ran 12 times" in caplog.text
+    assert "FROM deals" not in caplog.text
+
+
+def test_health_check_reports_zero_queries(client):
+    response = client.get("/api/health")
+    assert response.headers["X-DB-Queries"] == "0"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
@@ -0,0 +1,40 @@
+"""Tests for the fast-path list serialization: same JSON as the response_model routes."""
+
+import pytest
+from pydantic import BaseModel
+
+from app.serialization import row_dict
+from app.schemas import DealResponse
+
+
+@pytest.mark.parametrize("path", ["/api/contacts", "/api/deals", "/api/activities"])
+def test_list_matches_detail(client, admin_headers, sample_deal, sample_activity, path):
+    listed = client.get(f"{path}/", headers=admin_headers)
+    assert listed.headers["content-type"] == "application/json"
+    for item in listed.json():
+        assert item == client.get(f"{path}/{item['id']}", headers=admin_headers).json()
+
+
+def test_lead_and_account_lists_match_detail(client, admin_headers):
+    account = client.post("/api/accounts/", json={"name": "Acme", "annual_revenue": 1000}, headers=admin_headers).json()
+    lead = client.post("/api/leads/", json={
+        "first_name": "Ann", "last_name": "Lee", "email": "ann@example.com", "lead_score": 80,
+    }, headers=admin_headers).json()
+
+    assert client.get("/api/accounts/", headers=admin_headers).json() == [account]
+    assert client.get("/api/leads/", headers=admin_headers).json() == [lead]
+    assert account["annual_revenue"] == 1000.0
+
+
+def test_timeline_data_matches_detail(client, admin_headers, sample_contact, sample_activity):
+    timeline = client.get(f"/api/contacts/{sample_contact['id']}/timeline", headers=admin_headers).json()
+    assert timeline[0]["type"] == "activity"
+    assert timeline[0]["data"] == client.get(f"/api/activities/{sample_activity['id']}", headers=admin_headers).json()
+
+
+def test_row_dict_rejects_nested_models():
+    class Nested(BaseModel):
+        deal: DealResponse
+
+    with pytest.raises(TypeError):
+        row_dict(Nested, object())
@@ -0,0 +1,51 @@
+"""Tests for the slow request log."""
+
+import json
+import logging
+
+import pytest
+
+from app import slow_log
+
+
+@pytest.fixture()
+def log_everything(monkeypatch):
+    monkeypatch.setattr(slow_log, "SLOW_REQUEST_MS", 0.001)
+    monkeypatch.setattr(slow_log, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(slow_log, "SLOW_LOG_MAX_PER_MINUTE", 1000)
+    monkeypatch.setattr(slow_log, "_limiter", slow_log._RateLimiter())
+    monkeypatch.setattr(slow_log, "_explained", {})
+
+
+def _entries(caplog):
+    return [
+        json.loads(record.getMessage().split(" ", 2)[2])
+        for record in caplog.records if record.name == "app.slow_log"
+    ]
+
+
+def test_slow_request_logs_statements_and_plans(client, sample_contact, admin_headers, log_everything, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.slow_log"):
+        client.get(f"/api/contacts/{sample_contact['id']}", params={"verbose": "true"}, headers=admin_headers)
+
+    entry = _entries(caplog)[-1]
+    assert entry["route"] == "GET /api/contacts/{contact_id}"
+    assert entry["params"] == {"path": {"contact_id": "int"}, "query": {"verbose": "bool"}}
+    assert entry["query_count"] == len(entry["queries"])
+    contact_query = next(q for q in entry["queries"] if "FROM contacts" in q["sql"])
+    assert contact_query["plan"]
+    assert sample_contact["email"] not in json.dumps(entry)
+
+
+def test_slow_log_is_rate_limited(client, admin_headers, log_everything, monkeypatch, caplog):
+    monkeypatch.setattr(slow_log, "SLOW_LOG_MAX_PER_MINUTE", 1)
+    with caplog.at_level(logging.WARNING, logger="app.slow_log"):
+        client.get("/api/contacts/", headers=admin_headers)
+        client.get("/api/contacts/", headers=admin_headers)
+    assert len(_entries(caplog)) == 1
+
+
+def test_fast_requests_are_not_logged(client, admin_headers, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.slow_log"):
+        client.get("/api/health")
+    assert _entries(caplog) == []
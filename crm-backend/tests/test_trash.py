@@ -0,0 +1,131 @@
+"""Tests for soft delete, the trash API and the purge job."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.purge import purge_deleted, window_end
+from tests.conftest import TestingSessionLocal
+
+
+def test_trashed_records_are_hidden_everywhere(client, sample_deal, sample_contact, admin_headers):
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+
+    assert client.get("/api/contacts/", headers=admin_headers).json() == []
+    assert client.get("/api/deals/", headers=admin_headers).json() == []
+    assert client.get("/api/search/", params={"q": "Enterprise"}, headers=admin_headers).json() == []
+    summary = client.get("/api/dashboard/summary", headers=admin_headers).json()
+    assert summary["contacts"] == 0
+    assert summary["deals"] == 0
+    assert summary["total_value"] == 0
+
+
+def test_list_and_restore(client, sample_deal, sample_contact, admin_headers):
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+
+    trash = client.get("/api/trash/", headers=admin_headers).json()
+    assert {(i["entity_type"], i["id"]) for i in trash} == {
+        ("contact", sample_contact["id"]), ("deal", sample_deal["id"]),
+    }
+
+    response = client.post(f"/api/trash/contact/{sample_contact['id']}/restore", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get(f"/api/contacts/{sample_contact['id']}", headers=admin_headers).status_code == 200
+    assert client.get(f"/api/deals/{sample_deal['id']}", headers=admin_headers).status_code == 200
+    assert client.get("/api/trash/", headers=admin_headers).json() == []
+
+
+def test_restore_deal_requires_live_contact(client, sample_deal, sample_contact, admin_headers):
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+    response = client.post(f"/api/trash/deal/{sample_deal['id']}/restore", headers=admin_headers)
+    assert response.status_code == 409
+
+
+def test_trashed_contact_email_is_reserved(client, sample_contact, admin_headers):
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+    response = client.post("/api/contacts/", json={
+        "name": "Someone Else", "email": sample_contact["email"],
+    }, headers=admin_headers)
+    assert response.status_code == 400
+    assert "trash" in response.json()["detail"]
+
+
+def test_purge_respects_retention(client, sample_deal, sample_contact, admin_headers):
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+
+    assert purge_deleted(TestingSessionLocal, retention=timedelta(days=30)) == {
+        "deal": 0, "lead": 0, "contact": 0, "account": 0,
+    }
+    assert len(client.get("/api/trash/", headers=admin_headers).json()) == 2
+
+    purged = purge_deleted(TestingSessionLocal, retention=timedelta(0), batch_size=1)
+    assert purged["contact"] == 1
+    assert purged["deal"] == 1
+    assert client.get("/api/trash/", headers=admin_headers).json() == []
+
+
+def test_purge_window():
+    night = datetime(2026, 1, 1, 3, 30, tzinfo=timezone.utc)
+    assert window_end(night, "02:00-05:00") == datetime(2026, 1, 1, 5, 0, tzinfo=timezone.utc)
+    assert window_end(night.replace(hour=12), "02:00-05:00") is None
+    assert window_end(night.replace(hour=23), "22:00-04:00") == datetime(2026, 1, 2, 4, 0, tzinfo=timezone.utc)
+
+
+def test_deleting_owner_stage_and_pipeline_with_trashed_dependents(client, sample_contact, admin_headers):
+    rep = client.post("/api/users/", json={
+        "email": "rep@crm.com", "first_name": "Sales", "last_name": "Rep", "password": "rep12345", "role_id": 2,
+    }, headers=admin_headers).json()
+    token = client.post("/api/auth/login", data={"username": "rep@crm.com", "password": "rep12345"}).json()
+    rep_headers = {"Authorization": f"Bearer {token['access_token']}"}
+    owned = client.post("/api/contacts/", json={"name": "Owned", "email": "owned@example.com"}, headers=rep_headers).json()
+    client.delete(f"/api/contacts/{owned['id']}", headers=admin_headers)
+    assert client.delete(f"/api/users/{rep['id']}", headers=admin_headers).status_code == 204
+
+    pipeline = client.post("/api/pipelines/", json={"name": "Trash Pipeline"}, headers=admin_headers).json()
+    stages = [
+        client.post(f"/api/pipelines/{pipeline['id']}/stages/", json={"name": name, "order": i}, headers=admin_headers).json()
+        for i, name in enumerate(("Lead", "Won"))
+    ]
+    deals = [
+        client.post("/api/deals/", json={
+            "title": f"In {stage['name']}", "value": 1.0, "contact_id": sample_contact["id"],
+            "pipeline_id": pipeline["id"], "stage_id": stage["id"],
+        }, headers=admin_headers).json()
+        for stage in stages
+    ]
+    for deal in deals:
+        client.delete(f"/api/deals/{deal['id']}", headers=admin_headers)
+    assert client.delete(f"/api/pipelines/{pipeline['id']}/stages/{stages[0]['id']}", headers=admin_headers).status_code == 204
+    assert client.delete(f"/api/pipelines/{pipeline['id']}", headers=admin_headers).status_code == 204
+
+    restored = client.post(f"/api/trash/contact/{owned['id']}/restore", headers=admin_headers)
+    assert restored.status_code == 200
+    client.post(f"/api/trash/deal/{deals[0]['id']}/restore", headers=admin_headers)
+    restored = client.get(f"/api/deals/{deals[0]['id']}", headers=admin_headers).json()
+    assert (restored["pipeline_id"], restored["stage_id"]) == (None, None)
+
+
+def test_activities_and_notes_of_trashed_records_are_hidden(client, sample_deal, sample_contact, sample_activity, admin_headers):
+    deal_task = client.post("/api/activities/", json={
+        "type": "task", "subject": "Send quote", "deal_id": sample_deal["id"],
+    }, headers=admin_headers).json()
+    note = client.post("/api/notes/", json={
+        "content": "Call back", "related_to_type": "deal", "related_to_id": sample_deal["id"],
+    }, headers=admin_headers).json()
+    other = client.post("/api/accounts/", json={"name": "Live"}, headers=admin_headers).json()
+    kept = client.post("/api/notes/", json={
+        "content": "Keep", "related_to_type": "account", "related_to_id": other["id"],
+    }, headers=admin_headers).json()
+    assert client.get("/api/dashboard/activity-stats", headers=admin_headers).json()["types"] != []
+
+    client.delete(f"/api/contacts/{sample_contact['id']}", headers=admin_headers)
+
+    assert client.get("/api/activities/", headers=admin_headers).json() == []
+    for activity in (sample_activity, deal_task):
+        assert client.get(f"/api/activities/{activity['id']}", headers=admin_headers).status_code == 404
+    assert [n["id"] for n in client.get("/api/notes/", headers=admin_headers).json()] == [kept["id"]]
+    assert client.get(f"/api/notes/{note['id']}", headers=admin_headers).status_code == 404
+    stats = client.get("/api/dashboard/activity-stats", headers=admin_headers).json()
+    assert stats["types"] == [] and sum(day["count"] for day in stats["trend"]) == 0
+
+    client.post(f"/api/trash/contact/{sample_contact['id']}/restore", headers=admin_headers)
+    assert len(client.get("/api/activities/", headers=admin_headers).json()) == 2
+    assert len(client.get("/api/notes/", headers=admin_headers).json()) == 2
@@ -30,6 +30,18 @@ async function request(path, options = {}) {
     return res.json();
 }
 
+// Several GETs in one round trip; resolves to their bodies in order
+export async function batchGet(paths) {
+    const results = await request('/batch', {
+        method: 'POST',
+        body: JSON.stringify({ requests: paths.map((path) => ({ method: 'GET', path: `${API_BASE}${path}` })) }),
+    });
+    return results.map(({ status, body }) => {
+        if (status >= 400) throw new Error(body?.detail || `HTTP ${status}`);
+        return body;
+    });
+}
+
 // Auth
 export const authApi = {
     login: (username, password) => {
@@ -175,6 +187,7 @@ export const leadsApi = {
 };
 
 export const dashboardApi = {
+    getDashboard: (widgets) => request(`/dashboard${widgets ? '?widgets=' + widgets.join(',') : ''}`),
     getSummary: () => request('/dashboard/summary'),
     getFunnel: () => request('/dashboard/funnel'),
     getActivityStats: () => request('/dashboard/activity-stats'),
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
-import { accountsApi } from '../api';
+import { accountsApi, batchGet } from '../api';
 import AssignOwner from '../components/AssignOwner';
 import Timeline from '../components/Timeline';
 
@@ -15,10 +15,10 @@ export default function AccountDetailPage() {
 
     const fetchData = async () => {
         try {
-            const [accData, contactsData, dealsData] = await Promise.all([
-                accountsApi.get(id),
-                accountsApi.getContacts(id),
-                accountsApi.getDeals(id)
+            const [accData, contactsData, dealsData] = await batchGet([
+                `/accounts/${id}`,
+                `/accounts/${id}/contacts`,
+                `/accounts/${id}/deals`
             ]);
             setAccount(accData);
             setContacts(contactsData);
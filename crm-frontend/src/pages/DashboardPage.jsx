@@ -18,14 +18,10 @@ export default function DashboardPage() {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [s, f, a] = await Promise.all([
-                    dashboardApi.getSummary(),
-                    dashboardApi.getFunnel(),
-                    dashboardApi.getActivityStats()
-                ]);
-                setSummary(s);
-                setFunnel(f);
-                setActivityStats(a);
+                const data = await dashboardApi.getDashboard();
+                setSummary(data.summary);
+                setFunnel(data.funnel);
+                setActivityStats(data.activity_stats);
             } catch (err) {
                 console.error("Dashboard fetch failed:", err);
             } finally {
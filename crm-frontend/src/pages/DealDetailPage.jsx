@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
-import { dealsApi, contactsApi, productsApi } from '../api';
+import { dealsApi, batchGet } from '../api';
 import DealForm from '../components/DealForm';
 import Timeline from '../components/Timeline';
 import AssignOwner from '../components/AssignOwner';
@@ -42,13 +42,13 @@ export default function DealDetailPage() {
     };
 
     const fetchContacts = async () => {
-        const [rc, ac] = await Promise.all([dealsApi.getContacts(id), contactsApi.list()]);
+        const [rc, ac] = await batchGet([`/deals/${id}/contacts`, '/contacts/']);
         setRelatedContacts(rc);
         setAllContacts(ac);
     };
 
     const fetchLineItems = async () => {
-        const [items, prods] = await Promise.all([dealsApi.getLineItems(id), productsApi.list()]);
+        const [items, prods] = await batchGet([`/deals/${id}/line-items`, '/products/']);
         setLineItems(items);
         setProducts(prods);
     };